@@ -79,7 +79,7 @@ if errorlevel 1 (
     color 0C
     echo.
     echo  [ERRO] O programa encerrou com um erro.
-    echo  Verifique se maps_scraper_v2.py esta na mesma pasta que este .bat
+    echo  Verifique se maps_scraper_v2.py e maps_scraper_gui.py estao na mesma pasta que este .bat
     echo.
     pause
 )
\ No newline at end of file
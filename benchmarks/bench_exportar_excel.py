@@ -0,0 +1,139 @@
+"""
+Benchmark — exportação da planilha: modo normal do openpyxl × write-only.
+
+"normal" é a implementação anterior de _exportar_excel (Workbook inteiro em
+memória, Font/Fill/Border/Alignment atribuídos célula a célula, Resumo por
+fórmulas). "write-only" é MapsScraper._exportar_excel atual. Os registros
+vêm de um gerador, como na leitura do .jsonl de saída.
+
+Só precisa do openpyxl: o MapsScraper é montado sem __init__ (nada de
+Chrome, requests ou scraper_historico.db).
+
+    python benchmarks/bench_exportar_excel.py                 # 10k, 100k, 500k
+    python benchmarks/bench_exportar_excel.py 10000 50000
+    python benchmarks/bench_exportar_excel.py --normal-ate 500000
+
+O modo normal só roda até --normal-ate linhas (padrão 100k): acima disso
+leva minutos e vários GB.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import maps_scraper_v2 as ms  # noqa: E402
+
+try:
+    import openpyxl  # noqa: E402
+except ImportError:
+    sys.exit("falta o openpyxl: pip install openpyxl")
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side  # noqa: E402
+from openpyxl.utils import get_column_letter  # noqa: E402
+
+
+def registros(n, semente=0):
+    rng = random.Random(semente)
+    for i in range(n):
+        site = f"https://empresa{i}.com.br" if rng.random() < 0.6 else ""
+        tel  = f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        yield {
+            "Nome":       f"Empresa {i}",
+            "E-mail":     f"contato@empresa{i}.com.br" if site and rng.random() < 0.5 else "",
+            "Telefone":   tel,
+            "WhatsApp":   f"https://wa.me/55119{i:08d}" if rng.random() < 0.7 else "",
+            "Categoria":  rng.choice(["Padaria", "Restaurante", "Oficina", "Academia"]),
+            "Endereço":   f"Rua {i}, {rng.randint(1, 999)} - Centro, São Paulo - SP",
+            "Site":       site,
+            "Estrelas":   round(rng.uniform(3.5, 5.0), 1),
+            "Avaliações": rng.randint(10, 5000),
+            "Keyword":    "benchmark",
+            "URL Maps":   f"https://www.google.com/maps/place/Empresa+{i}",
+        }
+
+
+def exportar_normal(path, regs):
+    """Cópia da implementação anterior (modo normal, estilo por célula)."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Empresas"
+    hdr_fill  = PatternFill("solid", start_color="1a237e")
+    hdr_font  = Font(bold=True, color="FFFFFF", name="Arial", size=11)
+    alt_fill  = PatternFill("solid", start_color="e8eaf6")
+    wht_fill  = PatternFill("solid", start_color="FFFFFF")
+    link_font = Font(color="1565C0", underline="single", name="Arial", size=10)
+    norm_font = Font(name="Arial", size=10)
+    center    = Alignment(horizontal="center", vertical="center")
+    left      = Alignment(horizontal="left", vertical="center", wrap_text=False)
+    borda     = Border(bottom=Side(style="thin", color="CCCCCC"),
+                       right =Side(style="thin", color="CCCCCC"))
+    colunas = ms.COLUNAS_SAIDA
+    for c, (col, larg) in enumerate(zip(colunas, ms.MapsScraper.LARGURAS_EXCEL), 1):
+        cell = ws.cell(row=1, column=c, value=col)
+        cell.fill = hdr_fill; cell.font = hdr_font; cell.alignment = center
+        ws.column_dimensions[get_column_letter(c)].width = larg
+    ws.freeze_panes = "A2"
+    n = 0
+    for ri, emp in enumerate(regs, 2):
+        n += 1
+        fill = wht_fill if ri % 2 == 0 else alt_fill
+        for ci, key in enumerate(colunas, 1):
+            val  = emp.get(key, "")
+            cell = ws.cell(row=ri, column=ci, value=val)
+            cell.fill = fill; cell.border = borda; cell.alignment = left
+            if key in ("WhatsApp", "Site", "URL Maps") and str(val).startswith("http"):
+                cell.hyperlink = val; cell.font = link_font
+            elif key == "E-mail" and "@" in str(val):
+                cell.hyperlink = f"mailto:{val}"; cell.font = link_font
+            else:
+                cell.font = norm_font
+    ws2 = wb.create_sheet("Resumo")
+    ws2.cell(row=1, column=1, value="Total de empresas")
+    ws2.cell(row=1, column=2, value=f"=COUNTA(Empresas!A2:A{n+1})")
+    wb.save(path)
+
+
+def medir(fn, n):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn(path, registros(n))
+        dt = time.perf_counter() - t0
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tamanho = os.path.getsize(path)
+    return dt, pico, tamanho
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("linhas", nargs="*", type=int, default=[10_000, 100_000, 500_000])
+    ap.add_argument("--normal-ate", type=int, default=100_000)
+    args = ap.parse_args()
+
+    # _exportar_excel só usa log e results; __init__ abriria o histórico
+    scraper = ms.MapsScraper.__new__(ms.MapsScraper)
+    scraper.log = lambda *a, **k: None
+    scraper.results = []
+    modos = {
+        "normal":     exportar_normal,
+        "write-only": lambda path, regs: scraper._exportar_excel(path, regs),
+    }
+
+    print(f"{'linhas':>9}  {'modo':<11}{'tempo':>9}{'pico mem.':>12}{'arquivo':>11}")
+    for n in args.linhas:
+        for nome, fn in modos.items():
+            if nome == "normal" and n > args.normal_ate:
+                print(f"{n:>9}  {nome:<11}{'(pulado)':>9}")
+                continue
+            dt, pico, tamanho = medir(fn, n)
+            print(f"{n:>9}  {nome:<11}{dt:>8.1f}s{pico / 2**20:>10.1f}MB{tamanho / 2**20:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark — fichas abertas por registro aprovado: fila FIFO × fila por score.
+
+Simula o estágio de fichas sem Chrome: a lista de resultados chega em
+páginas de cards (como no scroll), o pré-filtro dos cards é aplicado nos
+dois cenários e o ficha worker abre um link por vez até bater a meta.
+O que muda é só a ordem de visita: FIFO (ordem do scroll) ou FilaLinks
+com MapsScraper._score_card.
+
+    python benchmarks/bench_fila_prioridade.py
+"""
+import math
+import queue
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from maps_scraper_v2 import FilaLinks, MapsScraper  # noqa: E402
+
+MIN_STARS     = 4.3
+MIN_REVIEWS   = 30
+META          = 50
+LUGARES       = 1500
+CARDS_POR_PAG = 20
+FICHAS_POR_PAG = 8       # o scroll entrega uma página a cada N fichas abertas
+RODADAS       = 40
+
+
+def gerar_lugares(rng):
+    lugares = []
+    for i in range(LUGARES):
+        stars   = round(min(5.0, max(1.0, rng.gauss(4.2, 0.5))), 1)
+        reviews = int(math.exp(rng.gauss(3.5, 1.6)))
+        card = {
+            "url": f"p{i}",
+            # Nem todo card mostra nota/avaliações
+            "stars":   stars if rng.random() < 0.75 else 0.0,
+            "reviews": reviews if rng.random() < 0.65 else 0,
+        }
+        lugares.append({
+            "card": card, "stars": stars, "reviews": reviews,
+            "na_regiao": rng.random() < 0.8,
+            "historico": rng.random() < 0.1,
+        })
+    return lugares
+
+
+def aprovado(lugar):
+    if lugar["historico"] or not lugar["na_regiao"]:
+        return False
+    if 0 < lugar["stars"] < MIN_STARS:
+        return False
+    if 0 < lugar["reviews"] < MIN_REVIEWS:
+        return False
+    return True
+
+
+def simular(lugares, prioridade):
+    fila = FilaLinks() if prioridade else queue.Queue()
+    por_url = {l["card"]["url"]: l for l in lugares}
+    pendentes = [l for l in lugares
+                 if not MapsScraper._card_reprovado(l["card"], MIN_STARS, MIN_REVIEWS)]
+    abertas = aprovados = 0
+    while aprovados < META:
+        if abertas % FICHAS_POR_PAG == 0 and pendentes:
+            pagina, pendentes = pendentes[:CARDS_POR_PAG], pendentes[CARDS_POR_PAG:]
+            for l in pagina:
+                if prioridade:
+                    fila.put(l["card"]["url"],
+                             score=MapsScraper._score_card(l["card"], l["historico"]))
+                else:
+                    fila.put(l["card"]["url"])
+        try:
+            url = fila.get_nowait()
+        except queue.Empty:
+            break
+        lugar = por_url[url]
+        if lugar["historico"]:
+            continue            # descartado sem abrir a página
+        abertas += 1
+        aprovados += aprovado(lugar)
+    return abertas, aprovados
+
+
+def main():
+    resultados = {"FIFO": [], "score": []}
+    for rodada in range(RODADAS):
+        lugares = gerar_lugares(random.Random(rodada))
+        for nome, prioridade in (("FIFO", False), ("score", True)):
+            abertas, aprov = simular(lugares, prioridade)
+            resultados[nome].append(abertas / max(1, aprov))
+
+    print(f"meta={META}  min_stars={MIN_STARS}  min_reviews={MIN_REVIEWS}  rodadas={RODADAS}")
+    print(f"{'fila':<8}{'fichas/aprovado':>18}{'p90':>10}")
+    for nome, vals in resultados.items():
+        p90 = sorted(vals)[int(len(vals) * 0.9) - 1]
+        print(f"{nome:<8}{statistics.mean(vals):>18.2f}{p90:>10.2f}")
+    ganho = 1 - statistics.mean(resultados["score"]) / statistics.mean(resultados["FIFO"])
+    print(f"redução de fichas abertas: {ganho:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark — tempo de partida a frio do módulo (python -X importtime).
+
+Roda `import maps_scraper_v2` em processos novos, lê o relatório do
+-X importtime no stderr e mostra o tempo acumulado do módulo, as
+importações mais caras e quais dependências pesadas foram carregadas
+(nenhuma deveria: selenium, openpyxl, requests, bs4, pyarrow e tkinter
+só sobem no primeiro uso). Mede também a partida de um comando que não
+raspa (`exportar --help`) de ponta a ponta, ao lado da partida do próprio
+interpretador (`python -c pass`, que inclui o site e os .pth instalados):
+  - via -m: usa o bytecode do __pycache__ — é o número comparado à meta;
+  - como script (python maps_scraper_v2.py): o Python nunca guarda bytecode
+    do __main__, então cada partida recompila o arquivo inteiro.
+
+    python benchmarks/bench_importtime.py
+    python benchmarks/bench_importtime.py --rodadas 20 --top 15
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ    = Path(__file__).resolve().parent.parent
+PESADOS = ("selenium", "webdriver_manager", "openpyxl", "requests", "bs4", "pyarrow", "tkinter")
+META_MS = 100
+
+
+def importtime():
+    """Um processo novo → ({módulo: (self µs, acumulado µs)}, módulos pesados carregados)."""
+    codigo = ("import sys, maps_scraper_v2; "
+              f"print(','.join(m for m in {PESADOS!r} if m in sys.modules))")
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                       cwd=RAIZ, capture_output=True, text=True, check=True)
+    tempos = {}
+    for linha in r.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = (int(proprio), int(acumulado))
+    carregados = [m for m in r.stdout.strip().split(",") if m]
+    return tempos, carregados
+
+
+def partida(*args):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=RAIZ, capture_output=True, check=True)
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rodadas", type=int, default=10)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    importtime()        # aquece o __pycache__ e o cache de disco
+    modulo, amostras, carregados = [], [], set()
+    for _ in range(args.rodadas):
+        tempos, pesados = importtime()
+        modulo.append(tempos["maps_scraper_v2"][1] / 1000)
+        amostras.append(tempos)
+        carregados.update(pesados)
+    vazio  = [partida("-c", "pass") for _ in range(args.rodadas)]
+    cli    = [partida("-m", "maps_scraper_v2", "exportar", "--help") for _ in range(args.rodadas)]
+    script = [partida("maps_scraper_v2.py", "exportar", "--help") for _ in range(args.rodadas)]
+    med = statistics.median
+
+    print(f"import maps_scraper_v2          mediana {med(modulo):6.1f} ms   "
+          f"(min {min(modulo):.1f} / max {max(modulo):.1f})")
+    print(f"python -c pass (interpretador)  mediana {med(vazio):6.1f} ms")
+    print(f"exportar --help via -m          mediana {med(cli):6.1f} ms   "
+          f"meta < {META_MS} ms → {'ok' if med(cli) < META_MS else 'ACIMA'}   "
+          f"(+{med(cli) - med(vazio):.0f} ms sobre o interpretador)")
+    print(f"exportar --help como script     mediana {med(script):6.1f} ms   "
+          f"(recompila o .py: +{med(script) - med(cli):.0f} ms)")
+    print(f"dependências pesadas carregadas no import: {', '.join(sorted(carregados)) or 'nenhuma'}")
+
+    print(f"\nimportações mais caras (acumulado, mediana de {args.rodadas}):")
+    nomes = set().union(*amostras)
+    medianas = {n: statistics.median(a[n][1] for a in amostras if n in a) for n in nomes}
+    for nome, us in sorted(medianas.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us / 1000:7.1f} ms  {nome}")
+
+
+if __name__ == "__main__":
+    main()
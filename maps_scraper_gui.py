@@ -0,0 +1,385 @@
+"""
+Interface gráfica (Tk) do maps_scraper_v2.
+
+Fica num módulo à parte para o tkinter só ser importado quando a janela
+abre: a linha de comando e os processos trabalhador sobem sem ele (e sem
+Tk instalado). Abra pelo maps_scraper_v2.py, sem argumentos.
+"""
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+from pathlib import Path
+
+from maps_scraper_v2 import (
+    MISSING, PERFIS_BLOQUEIO, HistoricoDB, MapsScraper,
+    COR_BG, COR_CARD, COR_BORDA, COR_ACCENT, COR_DANGER,
+    COR_TEXTO, COR_SUBTEXTO, COR_INPUT, COR_LOG_BG,
+)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  INTERFACE GRÁFICA
+# ════════════════════════════════════════════════════════════════════════════
+class App(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("maps-scraper")
+        self.geometry("1120x780")
+        self.minsize(900, 660)
+        self.configure(bg=COR_BG)
+        self.scraper       = None
+        self.thread        = None
+        self.keywords_list = []
+        self.save_path     = tk.StringVar(
+            value=str(Path.home() / "Desktop" / "empresas_maps.xlsx")
+        )
+        self._build_ui()
+        self._check_deps()
+
+    def _build_ui(self):
+        top = tk.Frame(self, bg=COR_BG)
+        top.pack(fill="x", padx=20, pady=(14,4))
+        tk.Label(top, text="maps-scraper",
+                 bg=COR_BG, fg=COR_ACCENT, font=("Courier",18,"bold")).pack(side="left")
+        tk.Label(top, text="  // extrator de leads via Google Maps",
+                 bg=COR_BG, fg=COR_SUBTEXTO, font=("Courier",9)).pack(side="left", pady=(8,0))
+
+        main = tk.Frame(self, bg=COR_BG)
+        main.pack(fill="both", expand=True, padx=20, pady=6)
+        main.columnconfigure(0, weight=1)
+        main.columnconfigure(1, weight=2)
+        main.rowconfigure(0, weight=1)
+
+        # ── Painel esquerdo ──────────────────────────────────────────────────
+        esq = tk.Frame(main, bg=COR_CARD,
+                       highlightbackground=COR_BORDA, highlightthickness=1)
+        esq.grid(row=0, column=0, sticky="nsew", padx=(0,8))
+
+        self._sec(esq, "[ config ]", pad_top=14)
+
+        self._sec(esq, "keywords")
+        fkw = tk.Frame(esq, bg=COR_CARD)
+        fkw.pack(fill="x", padx=14, pady=(0,4))
+        self.ent_kw = self._entry(fkw)
+        self.ent_kw.pack(side="left", fill="x", expand=True)
+        self.ent_kw.bind("<Return>", lambda e: self._add_kw())
+        self._btn(fkw, "+ Add", self._add_kw).pack(side="left", padx=(6,0))
+
+        flb = tk.Frame(esq, bg=COR_INPUT,
+                       highlightbackground=COR_BORDA, highlightthickness=1)
+        flb.pack(fill="x", padx=14, pady=(0,4))
+        self.lb = tk.Listbox(flb, bg=COR_INPUT, fg=COR_TEXTO, font=("Courier",10),
+                             height=5, selectbackground=COR_ACCENT, selectforeground="#0d0b09",
+                             borderwidth=0, highlightthickness=0)
+        self.lb.pack(side="left", fill="both", expand=True, padx=4, pady=4)
+        sb = tk.Scrollbar(flb, command=self.lb.yview, bg=COR_CARD)
+        sb.pack(side="right", fill="y")
+        self.lb.config(yscrollcommand=sb.set)
+        self._btn(esq, "🗑  Remover selecionada", self._rem_kw,
+                  cor=COR_DANGER).pack(anchor="w", padx=14, pady=(0,8))
+
+        self._sec(esq, "região")
+        self.ent_reg = self._entry(esq,
+            placeholder="Ex: Ceará, Tokyo Japan, New York USA, Caçapava SP")
+        self.ent_reg.pack(fill="x", padx=14, pady=(0,8))
+
+        self._sec(esq, "filtros")
+        ff = tk.Frame(esq, bg=COR_CARD)
+        ff.pack(fill="x", padx=14, pady=(0,8))
+        ff.columnconfigure((0,1), weight=1)
+        tk.Label(ff, text="min_stars  (0–5)", bg=COR_CARD,
+                 fg=COR_SUBTEXTO, font=("Courier",8)).grid(row=0,column=0,sticky="w")
+        tk.Label(ff, text="min_reviews", bg=COR_CARD,
+                 fg=COR_SUBTEXTO, font=("Courier",8)).grid(row=0,column=1,sticky="w",padx=(8,0))
+        self.sp_stars = self._spin(ff, 0, 5, 0.5, "0")
+        self.sp_stars.grid(row=1, column=0, sticky="ew", pady=(2,0))
+        self.sp_rev = self._spin(ff, 0, 999999, 10, "0")
+        self.sp_rev.grid(row=1, column=1, sticky="ew", padx=(8,0), pady=(2,0))
+
+        self._sec(esq, "meta / keyword")
+        tk.Label(esq,
+                 text="# vasculha quantos forem necessários",
+                 bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",8),
+                 wraplength=220, justify="left").pack(anchor="w", padx=14)
+        self.sp_max = self._spin(esq, 1, 9999, 5, "20")
+        self.sp_max.pack(fill="x", padx=14, pady=(4,8))
+
+        self._sec(esq, "workers  (parallelism)")
+        fw = tk.Frame(esq, bg=COR_CARD)
+        fw.pack(fill="x", padx=14, pady=(0,4))
+        fw.columnconfigure((0,1), weight=1)
+        tk.Label(fw, text="# ficha workers  (abre N+1 Chromes: 1 scroll + N fichas)",
+                 bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",8),
+                 wraplength=210, justify="left").grid(row=0,column=0,columnspan=2,sticky="w")
+        self.sp_workers = self._spin(fw, 1, 8, 1, "1")
+        self.sp_workers.grid(row=1, column=0, sticky="ew", pady=(2,4))
+        self.var_headless = tk.BooleanVar(value=False)
+        tk.Checkbutton(fw, text="headless (sem janela)", variable=self.var_headless,
+                       bg=COR_CARD, fg=COR_TEXTO, font=("Courier",8),
+                       selectcolor=COR_INPUT, activebackground=COR_CARD,
+                       relief="flat").grid(row=1, column=1, sticky="w", padx=(8,0))
+        tk.Label(fw, text="# keywords simultâneas", bg=COR_CARD, fg=COR_SUBTEXTO,
+                 font=("Courier",8)).grid(row=2, column=0, columnspan=2, sticky="w")
+        self.sp_kw_sim = self._spin(fw, 1, 8, 1, "1")
+        self.sp_kw_sim.grid(row=3, column=0, sticky="ew", pady=(2,4))
+        self.var_http = tk.BooleanVar(value=False)
+        tk.Checkbutton(fw, text="fichas via http", variable=self.var_http,
+                       bg=COR_CARD, fg=COR_TEXTO, font=("Courier",8),
+                       selectcolor=COR_INPUT, activebackground=COR_CARD,
+                       relief="flat").grid(row=3, column=1, sticky="w", padx=(8,0))
+
+        self._sec(esq, "navegação")
+        fn = tk.Frame(esq, bg=COR_CARD)
+        fn.pack(fill="x", padx=14, pady=(0,4))
+        fn.columnconfigure((0,1), weight=1)
+        tk.Label(fn, text="# ritmo das pausas  (0 = sem pausa, 1 = padrão)", bg=COR_CARD,
+                 fg=COR_SUBTEXTO, font=("Courier",8)).grid(row=0, column=0, columnspan=2, sticky="w")
+        self.sp_ritmo = self._spin(fn, 0, 3, 0.25, "1")
+        self.sp_ritmo.grid(row=1, column=0, sticky="ew", pady=(2,4))
+        self.var_historico = tk.BooleanVar(value=False)
+        tk.Checkbutton(fn, text="voltar à lista (back)", variable=self.var_historico,
+                       bg=COR_CARD, fg=COR_TEXTO, font=("Courier",8),
+                       selectcolor=COR_INPUT, activebackground=COR_CARD,
+                       relief="flat").grid(row=1, column=1, sticky="w", padx=(8,0))
+        tk.Label(fn, text="# bloqueio de recursos  (auto = leve no scroll, sem_mapa nas fichas)",
+                 bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",8),
+                 wraplength=210, justify="left").grid(row=2, column=0, columnspan=2, sticky="w")
+        self.var_bloqueio = tk.StringVar(value="auto")
+        ttk.Combobox(fn, textvariable=self.var_bloqueio, state="readonly",
+                     values=["auto", *PERFIS_BLOQUEIO], font=("Courier",9)
+                     ).grid(row=3, column=0, sticky="ew", pady=(2,4))
+
+        self._sec(esq, "output")
+        fsv = tk.Frame(esq, bg=COR_CARD)
+        fsv.pack(fill="x", padx=14, pady=(0,14))
+        tk.Entry(fsv, textvariable=self.save_path, bg=COR_INPUT, fg=COR_SUBTEXTO,
+                 insertbackground=COR_ACCENT, font=("Courier",9), relief="flat",
+                 highlightbackground=COR_BORDA, highlightthickness=1
+                 ).pack(side="left", fill="x", expand=True)
+        self._btn(fsv, "...", self._pick_path).pack(side="left", padx=(4,0))
+
+        # ── Painel direito ───────────────────────────────────────────────────
+        dir_ = tk.Frame(main, bg=COR_BG)
+        dir_.grid(row=0, column=1, sticky="nsew")
+        dir_.rowconfigure(1, weight=1)
+        dir_.columnconfigure(0, weight=1)
+
+        fbt = tk.Frame(dir_, bg=COR_BG)
+        fbt.grid(row=0, column=0, sticky="ew", pady=(0,8))
+        self.btn_start = tk.Button(fbt, text=">>  RUN",
+            command=self._iniciar, bg=COR_ACCENT, fg="white",
+            font=("Courier",12,"bold"), activebackground="#a05e2a",
+            relief="flat", cursor="hand2", pady=10, padx=20)
+        self.btn_start.pack(side="left", fill="x", expand=True, padx=(0,6))
+        self.btn_stop = tk.Button(fbt, text="//  STOP",
+            command=self._parar, bg=COR_DANGER, fg=COR_TEXTO,
+            font=("Courier",12,"bold"), activebackground="#8a2020",
+            relief="flat", cursor="hand2", pady=10, padx=20, state="disabled")
+        self.btn_stop.pack(side="left", padx=(0,6))
+        tk.Button(fbt, text="cls", command=self._clear_log,
+            bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",10),
+            relief="flat", cursor="hand2", pady=10, padx=12).pack(side="left")
+        tk.Button(fbt, text="limpar historico", command=self._limpar_historico,
+            bg="#884444", fg="white", font=("Courier",9),
+            relief="flat", cursor="hand2", pady=10, padx=10).pack(side="right")
+
+        fp = tk.Frame(dir_, bg=COR_BG)
+        fp.grid(row=2, column=0, sticky="ew", pady=(6,0))
+        self.lbl_prog = tk.Label(fp, text="idle",
+                                 bg=COR_BG, fg=COR_SUBTEXTO, font=("Courier",9))
+        self.lbl_prog.pack(anchor="w")
+        self.prog_var = tk.DoubleVar()
+        style = ttk.Style(); style.theme_use("clam")
+        style.configure("G.Horizontal.TProgressbar",
+            troughcolor=COR_INPUT, background=COR_ACCENT, bordercolor=COR_BORDA)
+        ttk.Progressbar(fp, variable=self.prog_var, maximum=100,
+            style="G.Horizontal.TProgressbar").pack(fill="x", pady=(4,0))
+
+        flog = tk.Frame(dir_, bg=COR_LOG_BG,
+                        highlightbackground=COR_BORDA, highlightthickness=1)
+        flog.grid(row=1, column=0, sticky="nsew")
+        tk.Label(flog, text="$ stdout", bg=COR_LOG_BG,
+                 fg=COR_ACCENT, font=("Courier",10,"bold")).pack(anchor="w", padx=10, pady=(8,4))
+        ftxt = tk.Frame(flog, bg=COR_LOG_BG)
+        ftxt.pack(fill="both", expand=True, padx=6, pady=(0,6))
+        self.txt = tk.Text(ftxt, bg=COR_LOG_BG, fg=COR_TEXTO,
+                           font=("Courier",9), relief="flat",
+                           wrap="word", state="disabled")
+        self.txt.pack(side="left", fill="both", expand=True)
+        sb2 = tk.Scrollbar(ftxt, command=self.txt.yview, bg=COR_CARD)
+        sb2.pack(side="right", fill="y")
+        self.txt.config(yscrollcommand=sb2.set)
+        for tag, cor in [("info","#6699cc"),("ok","#88bb44"),("erro","#ee4444"),
+                         ("warn","#ddaa33"),("sub","#888888"),("system","#aaaaaa")]:
+            self.txt.tag_config(tag, foreground=cor)
+
+    def _sec(self, p, txt, pad_top=6):
+        f = tk.Frame(p, bg=COR_CARD)
+        f.pack(fill="x", padx=14, pady=(pad_top,2))
+        tk.Label(f, text=txt, bg=COR_CARD, fg=COR_TEXTO,
+                 font=("Courier",9,"bold")).pack(side="left")
+
+    def _entry(self, p, placeholder=""):
+        e = tk.Entry(p, bg=COR_INPUT, fg=COR_TEXTO, insertbackground=COR_ACCENT,
+                     font=("Courier",10), relief="flat",
+                     highlightbackground=COR_BORDA, highlightthickness=1)
+        if placeholder:
+            e.insert(0, placeholder); e.config(fg=COR_SUBTEXTO)
+            def fi(ev,w=e,ph=placeholder):
+                if w.get()==ph: w.delete(0,"end"); w.config(fg=COR_TEXTO)
+            def fo(ev,w=e,ph=placeholder):
+                if not w.get(): w.insert(0,ph); w.config(fg=COR_SUBTEXTO)
+            e.bind("<FocusIn>",fi); e.bind("<FocusOut>",fo)
+        return e
+
+    def _spin(self, p, from_, to, inc, val):
+        s = tk.Spinbox(p, from_=from_, to=to, increment=inc,
+                       bg=COR_INPUT, fg=COR_TEXTO, insertbackground=COR_ACCENT,
+                       font=("Courier",10), buttonbackground=COR_BORDA, relief="flat",
+                       highlightbackground=COR_BORDA, highlightthickness=1)
+        s.delete(0,"end"); s.insert(0,val)
+        return s
+
+    def _btn(self, p, txt, cmd, cor=COR_ACCENT):
+        return tk.Button(p, text=txt, command=cmd, bg=cor, fg="#0d0b09",
+                         font=("Courier",9,"bold"), relief="flat", cursor="hand2",
+                         padx=8, pady=4, activebackground=COR_BORDA, activeforeground=COR_TEXTO)
+
+    def _add_kw(self):
+        kw = self.ent_kw.get().strip()
+        if kw and kw not in self.keywords_list:
+            self.keywords_list.append(kw)
+            self.lb.insert("end", f"  > {kw}")
+            self.ent_kw.delete(0,"end")
+
+    def _rem_kw(self):
+        sel = self.lb.curselection()
+        if sel:
+            self.lb.delete(sel[0]); self.keywords_list.pop(sel[0])
+
+    def _pick_path(self):
+        p = filedialog.asksaveasfilename(defaultextension=".xlsx",
+            filetypes=[("Excel","*.xlsx"),("Todos","*.*")],
+            initialfile="empresas_maps.xlsx")
+        if p: self.save_path.set(p)
+
+    def _clear_log(self):
+        self.txt.config(state="normal")
+        self.txt.delete("1.0","end")
+        self.txt.config(state="disabled")
+
+    def _limpar_historico(self):
+        db = HistoricoDB.compartilhado()
+        total = db.total()
+        if total == 0:
+            messagebox.showinfo("Histórico", "O histórico já está vazio.")
+            return
+        resp = messagebox.askyesno(
+            "Limpar histórico",
+            f"Isso vai apagar {total} empresa(s) do histórico.\n"
+            "Na próxima busca, elas poderão aparecer novamente.\n\nConfirmar?"
+        )
+        if resp:
+            db.limpar()
+            self.log(f"🗑 Histórico limpo ({total} registros removidos).", "warn")
+
+    def log(self, msg, tag="info"):
+        ts = datetime.now().strftime("%H:%M:%S")
+        self.txt.config(state="normal")
+        self.txt.insert("end", f"[{ts}] {msg}\n", tag)
+        self.txt.see("end")
+        self.txt.config(state="disabled")
+
+    def set_progress(self, val, texto=""):
+        self.prog_var.set(val)
+        if texto: self.lbl_prog.config(text=texto)
+
+    def _iniciar(self):
+        if not self.keywords_list:
+            messagebox.showwarning("Atenção","Adicione pelo menos uma palavra-chave!")
+            return
+        ph  = "Ex: Ceará, Tokyo Japan, New York USA, Caçapava SP"
+        reg = self.ent_reg.get().strip()
+        if not reg or reg == ph:
+            messagebox.showwarning("Atenção","Digite a região para a busca!")
+            return
+        try:
+            min_stars = float(self.sp_stars.get())
+            min_revs  = int(self.sp_rev.get())
+            meta      = int(self.sp_max.get())
+            workers   = int(self.sp_workers.get())
+            kw_sim    = int(self.sp_kw_sim.get())
+            ritmo     = float(self.sp_ritmo.get())
+            if ritmo < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Erro","Valores inválidos nos filtros."); return
+        headless = self.var_headless.get()
+
+        self.btn_start.config(state="disabled")
+        self.btn_stop.config(state="normal")
+        self.prog_var.set(0)
+        self.lbl_prog.config(text="Iniciando Chrome...")
+
+        self.log("═"*55, "system")
+        self.log(f"🚀 {len(self.keywords_list)} keyword(s) | Região: {reg}", "system")
+        self.log(f"   Filtros: ≥{min_stars}⭐ | ≥{min_revs} aval. | Meta: {meta}/kw | Workers: {workers}{'  headless' if headless else ''}", "system")
+        self.log("═"*55, "system")
+
+        self.scraper = MapsScraper(
+            log_cb      = lambda m, t="info": self.after(0, self.log, m, t),
+            progress_cb = lambda v, t: self.after(0, self.set_progress, v, t),
+        )
+
+        def run():
+            self.scraper.scrape(
+                keywords    = self.keywords_list[:],
+                regiao      = reg,
+                min_stars   = min_stars,
+                min_reviews = min_revs,
+                meta_por_kw = meta,
+                save_path   = self.save_path.get(),
+                num_workers = workers,
+                headless    = headless,
+                kw_simultaneas = kw_sim,
+                backend_ficha  = "http" if self.var_http.get() else "chrome",
+                ritmo          = ritmo,
+                navegacao      = "historico" if self.var_historico.get() else "direta",
+                bloqueio       = self.var_bloqueio.get(),
+            )
+            self.after(0, self._done)
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def _parar(self):
+        if self.scraper:
+            self.scraper.stop()
+            self.log("⏹ Parando após empresa atual...", "warn")
+            self.btn_stop.config(state="disabled")
+
+    def _done(self):
+        self.btn_start.config(state="normal")
+        self.btn_stop.config(state="disabled")
+        n = self.scraper.emitidos if self.scraper else 0
+        self.log("═"*55, "system")
+        self.log(f"🎉 Concluído! {n} empresas aprovadas na planilha.", "ok")
+        if n > 0:
+            self.log(f"📁 {self.save_path.get()}", "ok")
+            messagebox.showinfo("Pronto!",
+                f"✅ {n} empresas aprovadas!\n\n📁 Salvo em:\n{self.save_path.get()}")
+
+    def _check_deps(self):
+        if MISSING:
+            self.log("⚠  DEPENDÊNCIAS FALTANDO:", "erro")
+            self.log(f"   pip install {' '.join(MISSING)}", "warn")
+        else:
+            self.log("✅ Dependências OK.", "ok")
+            self.log("💡 O número que você define é a META de aprovados na planilha.", "sub")
+            self.log("   O programa vasculha quantos estabelecimentos forem necessários.", "sub")
+            try:
+                total = HistoricoDB.compartilhado().total()
+                self.log(f"📦 Histórico: {total} empresa(s) já capturadas (não serão repetidas).", "sub")
+            except Exception:
+                pass
@@ -10,46 +10,96 @@
 ╚══════════════════════════════════════════════════════════════════╝
 """
 #oi sou o vininicus amigo do fefe q fez o codigo, ele mandoumuito bem
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import importlib
 import threading
+import atexit
+import itertools
+import json
+import math
+import os
 import time
 import re
 import unicodedata
 import sqlite3
 import random
 import queue
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+import signal
+import sys
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# ── Dependências — carregadas só no primeiro uso ────────────────────────────
+# Importar o módulo não puxa selenium/openpyxl/requests/bs4/pyarrow (e o
+# tkinter fica em maps_scraper_gui): comandos que não raspam (exportar,
+# execucoes) e processos worker sobem rápido. MISSING só consulta os
+# pacotes instalados (find_spec), sem importar.
+class _Preguicoso:
+    """Módulo (ou atributo de módulo) importado no primeiro acesso/chamada."""
+
+    def __init__(self, modulo, atributo=None):
+        self._modulo   = modulo
+        self._atributo = atributo
+        self._alvo     = None
+
+    def _carregar(self):
+        if self._alvo is None:
+            alvo = importlib.import_module(self._modulo)
+            self._alvo = getattr(alvo, self._atributo) if self._atributo else alvo
+        return self._alvo
+
+    def __getattr__(self, nome):
+        return getattr(self._carregar(), nome)
+
+    def __call__(self, *args, **kwargs):
+        return self._carregar()(*args, **kwargs)
+
+
+def _disponivel(*modulos):
+    from importlib.util import find_spec
+    try:
+        return all(find_spec(m) is not None for m in modulos)
+    except (ImportError, ValueError):
+        return False
+
 
-# ── Verificação de dependências ──────────────────────────────────────────────
-MISSING = []
-try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-except ImportError:
-    MISSING.append("selenium webdriver-manager")
-
-try:
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    MISSING.append("openpyxl")
-
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError:
-    MISSING.append("requests beautifulsoup4 lxml")
-
-# cores
+MISSING = [pip for pip, modulos in (
+    ("selenium webdriver-manager",   ("selenium", "webdriver_manager")),
+    ("openpyxl",                     ("openpyxl",)),
+    ("requests beautifulsoup4 lxml", ("requests", "bs4", "lxml")),
+) if not _disponivel(*modulos)]
+
+webdriver           = _Preguicoso("selenium.webdriver")
+By                  = _Preguicoso("selenium.webdriver.common.by", "By")
+Options             = _Preguicoso("selenium.webdriver.chrome.options", "Options")
+Service             = _Preguicoso("selenium.webdriver.chrome.service", "Service")
+ChromeDriverManager = _Preguicoso("webdriver_manager.chrome", "ChromeDriverManager")
+
+openpyxl          = _Preguicoso("openpyxl")
+Font              = _Preguicoso("openpyxl.styles", "Font")
+PatternFill       = _Preguicoso("openpyxl.styles", "PatternFill")
+Alignment         = _Preguicoso("openpyxl.styles", "Alignment")
+Border            = _Preguicoso("openpyxl.styles", "Border")
+Side              = _Preguicoso("openpyxl.styles", "Side")
+NamedStyle        = _Preguicoso("openpyxl.styles", "NamedStyle")
+WriteOnlyCell     = _Preguicoso("openpyxl.cell", "WriteOnlyCell")
+get_column_letter = _Preguicoso("openpyxl.utils", "get_column_letter")
+
+requests      = _Preguicoso("requests")
+BeautifulSoup = _Preguicoso("bs4", "BeautifulSoup")
+
+# Opcional — só para exportar Parquet / Arrow IPC (CSV.gz não precisa)
+pa = _Preguicoso("pyarrow")
+pq = _Preguicoso("pyarrow.parquet")
+
+# concurrent.futures puxa logging — só é preciso quando o scrape começa
+ThreadPoolExecutor = _Preguicoso("concurrent.futures", "ThreadPoolExecutor")
+as_completed       = _Preguicoso("concurrent.futures", "as_completed")
+
+# cores da interface (maps_scraper_gui)
 COR_BG       = "#f0f0f0"
 COR_CARD     = "#e4e4e4"
 COR_BORDA    = "#aaaaaa"
@@ -70,11 +120,26 @@ class HistoricoDB:
     """
     Banco SQLite local que guarda a URL de todo estabelecimento já aprovado.
     Fica salvo em scraper_historico.db na mesma pasta do programa.
+    Também guarda o cache de e-mail por domínio (emails_dominio).
+
+    As URLs aprovadas ficam num set em memória (ja_existe não toca no
+    SQLite) e toda escrita passa por uma única thread que agrupa várias
+    gravações por transação, com o banco em modo WAL.
     """
     DB_FILE = Path(__file__).parent / "scraper_historico.db"
 
+    LOTE_MAX       = 500    # gravações por transação
+    INTERVALO_LOTE = 0.5    # s que o escritor espera juntando um lote
+
+    _compartilhado      = None
+    _compartilhado_lock = threading.Lock()
+
     def __init__(self):
-        self.conn = sqlite3.connect(str(self.DB_FILE), check_same_thread=False)
+        # timeout: no modo distribuído outros processos escrevem no mesmo arquivo
+        self.conn = sqlite3.connect(str(self.DB_FILE), check_same_thread=False, timeout=30)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS aprovados (
                 url      TEXT PRIMARY KEY,
@@ -84,48 +149,1913 @@ class HistoricoDB:
                 data     TEXT
             )
         """)
+        # Cache do Nominatim — bbox guardado como JSON [sul, norte, oeste, leste]
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocache (
+                chave        TEXT PRIMARY KEY,
+                lat          REAL,
+                lon          REAL,
+                bbox         TEXT,
+                display_name TEXT,
+                data         TEXT
+            )
+        """)
+        # email = "" é resultado negativo (site sem e-mail) — também vale cache
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS emails_dominio (
+                dominio    TEXT PRIMARY KEY,
+                email      TEXT,
+                status     INTEGER,
+                buscado_em REAL
+            )
+        """)
         self.conn.commit()
 
+        self._urls = {row[0] for row in self.conn.execute("SELECT url FROM aprovados")}
+
+        self._fila    = queue.Queue()
+        self._fechado = False
+        self._thread  = threading.Thread(target=self._escritor, name="historico-escritor",
+                                         daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def compartilhado(cls):
+        """Instância única do processo — o set de URLs é carregado uma vez só."""
+        with cls._compartilhado_lock:
+            if cls._compartilhado is None or cls._compartilhado._fechado:
+                cls._compartilhado = cls()
+                atexit.register(cls._compartilhado.close)
+            return cls._compartilhado
+
+    # ── Escritor único ───────────────────────────────────────────────────────
+    def _escrever(self, sql, params):
+        self._fila.put((sql, params))
+
+    def _escritor(self):
+        while True:
+            lote   = [self._fila.get()]
+            limite = time.time() + self.INTERVALO_LOTE
+            while len(lote) < self.LOTE_MAX and lote[-1] is not None:
+                try:
+                    lote.append(self._fila.get(timeout=max(0.0, limite - time.time())))
+                except queue.Empty:
+                    break
+            cmds = [c for c in lote if c is not None]
+            if cmds:
+                with self._lock:
+                    try:
+                        with self.conn:
+                            for sql, params in cmds:
+                                self.conn.execute(sql, params)
+                    except Exception:
+                        # Um comando ruim não derruba o lote inteiro
+                        for sql, params in cmds:
+                            try:
+                                with self.conn:
+                                    self.conn.execute(sql, params)
+                            except Exception:
+                                pass
+            for _ in lote:
+                self._fila.task_done()
+            if lote[-1] is None:
+                return
+
+    def descarregar(self):
+        """Bloqueia até todas as gravações pendentes estarem no disco."""
+        if not self._fechado:
+            self._fila.join()
+
+    # ── Aprovados ────────────────────────────────────────────────────────────
     def ja_existe(self, url: str) -> bool:
-        cur = self.conn.execute("SELECT 1 FROM aprovados WHERE url = ?", (url,))
-        return cur.fetchone() is not None
+        return url in self._urls
 
     def registrar(self, url: str, nome: str, keyword: str, regiao: str):
-        try:
-            self.conn.execute(
+        self._urls.add(url)
+        self._escrever(
+            "INSERT OR IGNORE INTO aprovados (url, nome, keyword, regiao, data) VALUES (?,?,?,?,?)",
+            (url, nome, keyword, regiao, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        )
+
+    def reservar(self, url: str, nome: str, keyword: str, regiao: str) -> bool:
+        """
+        Registro síncrono e atômico, para histórico compartilhado entre
+        processos: True só para quem inseriu a URL primeiro. O set em
+        memória não vê aprovações de outros nós — o SQLite vê.
+        """
+        with self._lock:
+            cur = self.conn.execute(
                 "INSERT OR IGNORE INTO aprovados (url, nome, keyword, regiao, data) VALUES (?,?,?,?,?)",
                 (url, nome, keyword, regiao, datetime.now().strftime("%Y-%m-%d %H:%M"))
             )
             self.conn.commit()
-        except Exception:
-            pass
+        self._urls.add(url)
+        return cur.rowcount == 1
 
     def total(self) -> int:
-        cur = self.conn.execute("SELECT COUNT(*) FROM aprovados")
-        return cur.fetchone()[0]
+        return len(self._urls)
+
+    # ── Cache de geocodificação ──────────────────────────────────────────────
+    def geo_em_cache(self, chave: str):
+        with self._lock:
+            cur = self.conn.execute(
+                "SELECT lat, lon, bbox, display_name FROM geocache WHERE chave = ?", (chave,)
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        return {"lat": row[0], "lon": row[1],
+                "bbox": json.loads(row[2]) if row[2] else None,
+                "display_name": row[3] or ""}
+
+    def salvar_geo(self, chave: str, info: dict):
+        self._escrever(
+            "INSERT OR REPLACE INTO geocache (chave, lat, lon, bbox, display_name, data) "
+            "VALUES (?,?,?,?,?,?)",
+            (chave, info["lat"], info["lon"],
+             json.dumps(info["bbox"]) if info.get("bbox") else None,
+             info.get("display_name", ""), datetime.now().strftime("%Y-%m-%d %H:%M"))
+        )
+
+    # ── Cache de e-mail por domínio ──────────────────────────────────────────
+    def email_em_cache(self, dominio: str, ttl: float):
+        """
+        Retorna o e-mail em cache ("" = negativo) se a busca tiver menos de
+        `ttl` segundos; None se não houver entrada válida.
+        """
+        with self._lock:
+            cur = self.conn.execute(
+                "SELECT email, buscado_em FROM emails_dominio WHERE dominio = ?", (dominio,)
+            )
+            row = cur.fetchone()
+            if row is not None and time.time() - (row[1] or 0) < ttl:
+                return row[0] or ""
+            return None
+
+    def salvar_email(self, dominio: str, email: str, status: int):
+        self._escrever(
+            "INSERT OR REPLACE INTO emails_dominio (dominio, email, status, buscado_em) "
+            "VALUES (?,?,?,?)",
+            (dominio, email or "", status, time.time())
+        )
 
     def limpar(self):
-        self.conn.execute("DELETE FROM aprovados")
-        self.conn.commit()
+        self.descarregar()
+        with self._lock:
+            self.conn.execute("DELETE FROM aprovados")
+            self.conn.commit()
+        self._urls.clear()
 
     def close(self):
+        if self._fechado:
+            return
+        self._fila.put(None)
+        self._thread.join(timeout=10)
+        self._fechado = True
         try:
             self.conn.close()
         except Exception:
             pass
 
 
+class DiarioExecucao:
+    """
+    Diário de uma execução no mesmo SQLite do histórico: a spec do job, as
+    varreduras de busca já feitas (tile/zoom → links vistos), os links
+    enfileirados e ainda não visitados, e cada registro aprovado com a marca
+    de emitido. Com isso MapsScraper.retomar(run_id) continua uma execução
+    interrompida sem refazer o scroll e sem perder aprovados que o histórico
+    já bloqueia mas que não chegaram à saída.
+    As escritas passam pelo escritor em lote do HistoricoDB.
+    O detalhe (varreduras, links, registros) só serve para retomar: sai
+    quando a execução conclui, e o de execuções interrompidas há mais de
+    RETENCAO_DIAS sai na abertura seguinte (estado "expirada").
+    """
+    DETALHE       = ("exec_varreduras", "exec_links", "exec_registros")
+    RETENCAO_DIAS = 30
+
+    def __init__(self, db):
+        self.db = db
+        with db._lock:
+            db.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    run_id     TEXT PRIMARY KEY,
+                    spec       TEXT,
+                    estado     TEXT,
+                    criado     TEXT,
+                    atualizado TEXT
+                );
+                CREATE TABLE IF NOT EXISTS exec_varreduras (
+                    run_id  TEXT,
+                    keyword TEXT,
+                    rotulo  TEXT,
+                    links   INTEGER,
+                    PRIMARY KEY (run_id, keyword, rotulo)
+                );
+                CREATE TABLE IF NOT EXISTS exec_links (
+                    run_id  TEXT,
+                    url     TEXT,
+                    keyword TEXT,
+                    score   REAL,
+                    card    TEXT,
+                    visitado INTEGER DEFAULT 0,
+                    PRIMARY KEY (run_id, url)
+                );
+                CREATE TABLE IF NOT EXISTS exec_registros (
+                    run_id   TEXT,
+                    url      TEXT,
+                    keyword  TEXT,
+                    registro TEXT,
+                    emitido  INTEGER DEFAULT 0,
+                    PRIMARY KEY (run_id, url)
+                );
+            """)
+            limite = (datetime.now() - timedelta(days=self.RETENCAO_DIAS)).strftime("%Y-%m-%d %H:%M:%S")
+            velhas = [r for (r,) in db.conn.execute(
+                "SELECT run_id FROM execucoes WHERE estado IN ('rodando', 'interrompida') "
+                "AND atualizado < ?", (limite,))]
+            for run_id in velhas:
+                for tabela in self.DETALHE:
+                    db.conn.execute(f"DELETE FROM {tabela} WHERE run_id = ?", (run_id,))
+                db.conn.execute("UPDATE execucoes SET estado = 'expirada' WHERE run_id = ?", (run_id,))
+            db.conn.commit()
+
+    @staticmethod
+    def _agora():
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # ── Escrita ──────────────────────────────────────────────────────────────
+    def iniciar(self, run_id, spec):
+        self.db._escrever(
+            "INSERT INTO execucoes (run_id, spec, estado, criado, atualizado) VALUES (?,?,?,?,?) "
+            "ON CONFLICT(run_id) DO UPDATE SET estado = excluded.estado, atualizado = excluded.atualizado",
+            (run_id, json.dumps(spec, ensure_ascii=False), "rodando", self._agora(), self._agora())
+        )
+
+    def finalizar(self, run_id, estado):
+        self.db._escrever("UPDATE execucoes SET estado = ?, atualizado = ? WHERE run_id = ?",
+                          (estado, self._agora(), run_id))
+        if estado == "concluida":
+            # nada a retomar — o detalhe só ocuparia o banco
+            for tabela in self.DETALHE:
+                self.db._escrever(f"DELETE FROM {tabela} WHERE run_id = ?", (run_id,))
+
+    def varrido(self, run_id, keyword, rotulo, links):
+        self.db._escrever("INSERT OR REPLACE INTO exec_varreduras VALUES (?,?,?,?)",
+                          (run_id, keyword, rotulo, links))
+
+    def enfileirados(self, run_id, keyword, itens):
+        """itens: [(url, score, card)]"""
+        for url, score, card in itens:
+            self.db._escrever(
+                "INSERT OR IGNORE INTO exec_links (run_id, url, keyword, score, card) VALUES (?,?,?,?,?)",
+                (run_id, url, keyword, score, json.dumps(card, ensure_ascii=False))
+            )
+
+    def visitado(self, run_id, url):
+        self.db._escrever("UPDATE exec_links SET visitado = 1 WHERE run_id = ? AND url = ?",
+                          (run_id, url))
+
+    def aprovado(self, run_id, keyword, registro):
+        self.db._escrever(
+            "INSERT OR IGNORE INTO exec_registros (run_id, url, keyword, registro) VALUES (?,?,?,?)",
+            (run_id, registro["URL Maps"], keyword, json.dumps(registro, ensure_ascii=False))
+        )
+
+    def emitido(self, run_id, url):
+        self.db._escrever("UPDATE exec_registros SET emitido = 1 WHERE run_id = ? AND url = ?",
+                          (run_id, url))
+
+    # ── Leitura ──────────────────────────────────────────────────────────────
+    def _consultar(self, sql, params=()):
+        self.db.descarregar()
+        with self.db._lock:
+            return self.db.conn.execute(sql, params).fetchall()
+
+    def spec(self, run_id):
+        rows = self._consultar("SELECT spec FROM execucoes WHERE run_id = ?", (run_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def situacao(self, run_id):
+        """"rodando", "interrompida", "concluida", "expirada" ou None."""
+        rows = self._consultar("SELECT estado FROM execucoes WHERE run_id = ?", (run_id,))
+        return rows[0][0] if rows else None
+
+    def listar(self):
+        """[(run_id, estado, criado, atualizado)] da mais recente para a mais antiga."""
+        return self._consultar(
+            "SELECT run_id, estado, criado, atualizado FROM execucoes ORDER BY criado DESC"
+        )
+
+    def estado(self, run_id):
+        """
+        {keyword: {"aprovados": n, "varreduras": {rotulo: links},
+                   "fila": [(url, score, card)]}},  [registros não emitidos]
+        """
+        kws = {}
+
+        def kw(nome):
+            return kws.setdefault(nome, {"aprovados": 0, "varreduras": {}, "fila": []})
+
+        for keyword, rotulo, links in self._consultar(
+                "SELECT keyword, rotulo, links FROM exec_varreduras WHERE run_id = ?", (run_id,)):
+            kw(keyword)["varreduras"][rotulo] = links
+        for keyword, url, score, card in self._consultar(
+                "SELECT keyword, url, score, card FROM exec_links "
+                "WHERE run_id = ? AND visitado = 0", (run_id,)):
+            kw(keyword)["fila"].append((url, score, json.loads(card or "{}")))
+        pendentes = []
+        for keyword, registro, emitido in self._consultar(
+                "SELECT keyword, registro, emitido FROM exec_registros WHERE run_id = ?", (run_id,)):
+            kw(keyword)["aprovados"] += 1
+            if not emitido:
+                pendentes.append(json.loads(registro))
+        return kws, pendentes
+
+
+class DiarioNulo:
+    """
+    Diário de um processo trabalhador: mesma interface de escrita, nada é
+    gravado. A execução é do coordenador — só ele escreve no diário dela,
+    depois de pôr o registro na saída (senão um registro marcado emitido
+    por um trabalhador se perderia na retomada).
+    """
+
+    def iniciar(self, run_id, spec):
+        pass
+
+    def finalizar(self, run_id, estado):
+        pass
+
+    def varrido(self, run_id, keyword, rotulo, links):
+        pass
+
+    def enfileirados(self, run_id, keyword, itens):
+        pass
+
+    def visitado(self, run_id, url):
+        pass
+
+    def aprovado(self, run_id, keyword, registro):
+        pass
+
+    def emitido(self, run_id, url):
+        pass
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  CHROMEDRIVER — resolvido uma vez por processo, com cache em disco
+# ════════════════════════════════════════════════════════════════════════════
+class ResolvedorChromedriver:
+    """
+    Resolve o binário do chromedriver uma única vez por processo.
+    O caminho resolvido (e a versão do Chrome que o usou) fica salvo em
+    chromedriver_cache.json; nas execuções seguintes ele é reaproveitado
+    sem nenhuma consulta de rede ao webdriver-manager.
+    Máquinas sem internet podem fixar o binário com chromedriver_path ou
+    com a variável de ambiente MAPS_SCRAPER_CHROMEDRIVER.
+    Se o Chrome instalado mudou de versão principal desde a gravação, o
+    caminho em cache é descartado antes de tentar subir o driver.
+    """
+    CACHE_FILE = Path(__file__).parent / "chromedriver_cache.json"
+    ENV_FIXO   = "MAPS_SCRAPER_CHROMEDRIVER"
+    # Mensagem do chromedriver quando o Chrome não é da versão suportada
+    RE_VERSAO  = re.compile(r"only supports Chrome version|Current browser version is", re.I)
+
+    _lock    = threading.Lock()
+    _caminho = None
+    _chrome  = None         # versão do Chrome instalado, lida uma vez por processo
+
+    @classmethod
+    def caminho_fixo(cls, chromedriver_path=None):
+        """Caminho pinado (parâmetro tem prioridade sobre a variável de ambiente)."""
+        fixo = chromedriver_path or os.environ.get(cls.ENV_FIXO, "")
+        if not fixo:
+            return None
+        if not Path(fixo).is_file():
+            raise FileNotFoundError(f"chromedriver fixo não encontrado: {fixo}")
+        return str(fixo)
+
+    @classmethod
+    def _ler_cache(cls):
+        try:
+            return json.loads(cls.CACHE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    @classmethod
+    def _salvar_cache(cls, dados):
+        try:
+            tmp = cls.CACHE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(dados, indent=2), encoding="utf-8")
+            os.replace(tmp, cls.CACHE_FILE)
+        except Exception:
+            pass
+
+    @classmethod
+    def versao_chrome(cls):
+        """Versão do Chrome instalado (sem rede), ou "" se não der para ler."""
+        if cls._chrome is None:
+            try:
+                from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+                cls._chrome = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE) or ""
+            except Exception:
+                cls._chrome = ""
+        return cls._chrome
+
+    @staticmethod
+    def _principal(versao):
+        return (versao or "").split(".")[0]
+
+    @classmethod
+    def _cache_valido(cls, cache):
+        """Caminho gravado existe e foi usado com a mesma versão principal do Chrome?"""
+        caminho = cache.get("caminho", "")
+        if not caminho or not Path(caminho).is_file():
+            return False
+        gravada, instalada = cls._principal(cache.get("chrome")), cls._principal(cls.versao_chrome())
+        # Sem uma das versões não há como comparar — mantém o caminho
+        return not (gravada and instalada) or gravada == instalada
+
+    @classmethod
+    def versao_incompativel(cls, erro):
+        """A falha ao subir o Chrome é de chromedriver de outra versão?"""
+        return bool(cls.RE_VERSAO.search(str(erro)))
+
+    @classmethod
+    def resolver(cls, chromedriver_path=None):
+        """Retorna o caminho do chromedriver: fixo → memória → disco → download."""
+        fixo = cls.caminho_fixo(chromedriver_path)
+        if fixo:
+            return fixo
+        with cls._lock:
+            if cls._caminho and Path(cls._caminho).is_file():
+                return cls._caminho
+            cache = cls._ler_cache()
+            caminho = cache.get("caminho", "")
+            if not cls._cache_valido(cache):
+                caminho = ChromeDriverManager().install()
+                cls._salvar_cache({
+                    "caminho":     caminho,
+                    "chrome":      cls.versao_chrome(),
+                    "resolvido_em": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                })
+            cls._caminho = caminho
+            return caminho
+
+    @classmethod
+    def registrar_versoes(cls, driver):
+        """Grava no cache a versão do Chrome/chromedriver que subiu com sucesso."""
+        try:
+            caps   = driver.capabilities or {}
+            chrome = caps.get("browserVersion", "")
+            drv    = (caps.get("chrome") or {}).get("chromedriverVersion", "").split(" ")[0]
+        except Exception:
+            return
+        with cls._lock:
+            cache = cls._ler_cache()
+            if not cache.get("caminho") or (cache.get("chrome") == chrome and cache.get("chromedriver") == drv):
+                return
+            cache.update(chrome=chrome, chromedriver=drv)
+            cls._salvar_cache(cache)
+
+    @classmethod
+    def invalidar(cls):
+        """Descarta o caminho memorizado e o cache em disco (ex.: Chrome atualizou)."""
+        with cls._lock:
+            cls._caminho = None
+            try: cls.CACHE_FILE.unlink()
+            except Exception: pass
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  POOL DE CHROMES — drivers de vida longa, reaproveitados entre keywords
+# ════════════════════════════════════════════════════════════════════════════
+class PoolChrome:
+    """
+    Pool de instâncias Chrome compartilhado por todo o processo.
+    checkout() entrega um driver saudável (cria se não houver livre) e
+    checkin() devolve para reuso. O custo de abrir o Chrome é pago uma vez
+    por slot, e não mais uma vez por keyword ou por chamada de scrape().
+    Cada slot tem o próprio perfil (chrome_profile_w{slot}), então dois
+    Chromes nunca disputam o mesmo diretório.
+    """
+    _compartilhado = None
+    _compartilhado_lock = threading.Lock()
+
+    def __init__(self, max_drivers=16):
+        self.max_drivers = max_drivers
+        self._cond   = threading.Condition()
+        self._livres = []      # [(chave, driver)] — prontos para checkout
+        self._slots  = set()   # slots com driver vivo (livre ou em uso)
+
+    @classmethod
+    def compartilhado(cls):
+        """Pool único do processo — sobrevive entre execuções do scraper."""
+        with cls._compartilhado_lock:
+            if cls._compartilhado is None:
+                cls._compartilhado = cls()
+                atexit.register(cls._compartilhado.fechar_todos)
+            return cls._compartilhado
+
+    @staticmethod
+    def _saudavel(driver):
+        """Health check barato: o Chrome responde e ainda tem janela aberta."""
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _encerrar(driver):
+        try: driver.quit()
+        except Exception: pass
+
+    def _proximo_slot(self):
+        slot = 0
+        while slot in self._slots:
+            slot += 1
+        return slot
+
+    def checkout(self, fabrica, timeout=None, **config):
+        """
+        Retorna um driver pronto para uso.
+        fabrica(slot, **config) cria um Chrome novo quando não há livre com a
+        mesma config (ex.: headless, bloqueio). Bloqueia se o pool estiver no
+        limite e todos em uso.
+        """
+        chave = tuple(sorted(config.items()))
+        limite = None if timeout is None else time.time() + timeout
+        while True:
+            descartar = None
+            driver    = None
+            slot      = None
+            with self._cond:
+                for i, (ch, drv) in enumerate(self._livres):
+                    if ch == chave:
+                        driver = self._livres.pop(i)[1]
+                        break
+                if driver is None:
+                    if len(self._slots) >= self.max_drivers:
+                        if self._livres:
+                            # Livre mas incompatível (ex.: outro headless/bloqueio) — recicla o slot
+                            _, descartar = self._livres.pop(0)
+                            self._slots.discard(descartar.pool_slot)
+                        else:
+                            restante = None if limite is None else limite - time.time()
+                            if restante is not None and restante <= 0:
+                                raise TimeoutError("pool de Chrome esgotado")
+                            self._cond.wait(restante)
+                            continue
+                    slot = self._proximo_slot()
+                    self._slots.add(slot)
+
+            if descartar is not None:
+                self._encerrar(descartar)
+
+            if driver is not None:
+                if self._saudavel(driver):
+                    driver.pool_usos += 1
+                    return driver
+                # Morto — libera o slot e tenta de novo
+                self._encerrar(driver)
+                with self._cond:
+                    self._slots.discard(driver.pool_slot)
+                    self._cond.notify()
+                continue
+
+            try:
+                driver = fabrica(slot, **config)
+            except Exception:
+                with self._cond:
+                    self._slots.discard(slot)
+                    self._cond.notify()
+                raise
+            driver.pool_slot  = slot
+            driver.pool_chave = chave
+            driver.pool_usos  = 1
+            return driver
+
+    def checkin(self, driver):
+        """Devolve o driver ao pool; se estiver quebrado, encerra e libera o slot."""
+        if driver is None:
+            return
+        if not self._saudavel(driver):
+            self._encerrar(driver)
+            with self._cond:
+                self._slots.discard(driver.pool_slot)
+                self._cond.notify()
+            return
+        with self._cond:
+            self._livres.append((driver.pool_chave, driver))
+            self._cond.notify()
+
+    def fechar_todos(self):
+        """Encerra os Chromes livres (chamado no atexit)."""
+        with self._cond:
+            livres, self._livres = self._livres, []
+            for _, drv in livres:
+                self._slots.discard(drv.pool_slot)
+            self._cond.notify_all()
+        for _, drv in livres:
+            self._encerrar(drv)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  HTTP — sessão compartilhada (keep-alive + pool de conexões)
+# ════════════════════════════════════════════════════════════════════════════
+_SESSAO_HTTP      = None
+_SESSAO_HTTP_LOCK = threading.Lock()
+
+
+def sessao_http(max_conexoes=32):
+    """requests.Session única do processo, com pool de conexões por host."""
+    global _SESSAO_HTTP
+    with _SESSAO_HTTP_LOCK:
+        if _SESSAO_HTTP is None:
+            s = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=max_conexoes, pool_maxsize=max_conexoes
+            )
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers["User-Agent"] = "Mozilla/5.0"
+            _SESSAO_HTTP = s
+        return _SESSAO_HTTP
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  RESULTADOS — saída em streaming, segura contra queda do processo
+# ════════════════════════════════════════════════════════════════════════════
+COLUNAS_SAIDA = ["Nome", "E-mail", "Telefone", "WhatsApp", "Categoria",
+                 "Endereço", "Site", "Estrelas", "Avaliações", "Keyword", "URL Maps"]
+
+
+class SaidaJSONL:
+    """
+    Um registro aprovado por linha, gravado assim que sai do enriquecimento.
+    flush a cada linha e fsync em lote (a cada `lote` linhas ou `intervalo`
+    segundos): uma queda perde no máximo o último lote, não a execução.
+    O arquivo é só de acréscimo; cada linha leva o id da execução ("_execucao")
+    para a planilha poder ser gerada de uma execução específica.
+    """
+
+    def __init__(self, caminho, execucao, lote=50, intervalo=2.0):
+        self.caminho   = Path(caminho)
+        self.execucao  = execucao
+        self.lote      = lote
+        self.intervalo = intervalo
+        self._lock     = threading.Lock()
+        self._arq      = open(self.caminho, "a", encoding="utf-8")
+        self._sem_sync = 0
+        self._ult_sync = time.time()
+        self.emitidos  = 0
+
+    @staticmethod
+    def caminho_para(save_path):
+        """resultados.xlsx → resultados.jsonl (ao lado da planilha)."""
+        return Path(save_path).with_suffix(".jsonl")
+
+    def emitir(self, registro):
+        linha = json.dumps({**registro, "_execucao": self.execucao}, ensure_ascii=False)
+        with self._lock:
+            if self._arq is None:
+                return
+            self._arq.write(linha + "\n")
+            self._arq.flush()
+            self.emitidos  += 1
+            self._sem_sync += 1
+            if self._sem_sync >= self.lote or time.time() - self._ult_sync >= self.intervalo:
+                self._sincronizar()
+
+    def _sincronizar(self):
+        os.fsync(self._arq.fileno())
+        self._sem_sync = 0
+        self._ult_sync = time.time()
+
+    def fechar(self):
+        with self._lock:
+            if self._arq is None:
+                return
+            self._arq.flush()
+            self._sincronizar()
+            self._arq.close()
+            self._arq = None
+
+    @staticmethod
+    def ler(caminho, execucao=None):
+        """
+        Itera os registros do arquivo (opcionalmente só de uma execução).
+        Ignora uma última linha cortada pela queda no meio da escrita.
+        """
+        try:
+            arq = open(caminho, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with arq:
+            for linha in arq:
+                try:
+                    reg = json.loads(linha)
+                except ValueError:
+                    continue
+                if execucao is None or reg.get("_execucao") == execucao:
+                    yield reg
+
+
+FORMATOS_COLUNARES = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow",
+                      ".ipc": "arrow", ".gz": "csv.gz"}
+
+
+def _valor_coluna(col, val):
+    """Tipo da coluna: Estrelas float, Avaliações int, o resto texto (vazio = nulo)."""
+    if col == "Estrelas":
+        try: return float(val) if val not in ("", None) else None
+        except (TypeError, ValueError): return None
+    if col == "Avaliações":
+        try: return int(val) if val not in ("", None) else None
+        except (TypeError, ValueError): return None
+    return "" if val is None else str(val)
+
+
+def exportar_colunar(registros, destino, formato=None, compressao="zstd", lote=50_000):
+    """
+    Grava as mesmas colunas da planilha em Parquet, Arrow IPC ou CSV.gz,
+    em lotes de `lote` linhas — os registros (ex.: SaidaJSONL.ler) nunca
+    ficam todos em memória. Formato pela extensão se não for informado.
+    Retorna quantas linhas gravou.
+    """
+    destino = Path(destino)
+    formato = formato or FORMATOS_COLUNARES.get(destino.suffix.lower())
+    if formato not in ("parquet", "arrow", "csv.gz"):
+        raise ValueError(f"formato desconhecido para {destino.name!r} (use .parquet, .arrow ou .csv.gz)")
+    if formato == "arrow" and compressao not in (None, "", "none", "lz4", "zstd"):
+        # Arrow IPC só comprime em lz4/zstd — melhor recusar que gravar sem compressão calado
+        raise ValueError(f"compressão {compressao!r} não existe em Arrow IPC (use lz4, zstd ou None)")
+
+    if formato == "csv.gz":
+        import csv
+        import gzip
+
+        n = 0
+        with gzip.open(destino, "wt", encoding="utf-8", newline="") as arq:
+            escritor = csv.writer(arq)
+            escritor.writerow(COLUNAS_SAIDA)
+            for reg in registros:
+                escritor.writerow([_valor_coluna(c, reg.get(c)) for c in COLUNAS_SAIDA])
+                n += 1
+        return n
+
+    if not _disponivel("pyarrow"):
+        raise RuntimeError("exportar Parquet/Arrow requer pyarrow: pip install pyarrow")
+
+    tipos = {"Estrelas": pa.float64(), "Avaliações": pa.int64()}
+    schema = pa.schema([(c, tipos.get(c, pa.string())) for c in COLUNAS_SAIDA])
+    if formato == "parquet":
+        escritor = pq.ParquetWriter(destino, schema, compression=compressao or "none")
+    else:
+        opcoes = pa.ipc.IpcWriteOptions(compression=compressao if compressao in ("lz4", "zstd") else None)
+        escritor = pa.ipc.new_file(str(destino), schema, options=opcoes)
+
+    n = 0
+    colunas = {c: [] for c in COLUNAS_SAIDA}
+
+    def despejar():
+        lote_rb = pa.RecordBatch.from_pydict(colunas, schema=schema)
+        if formato == "parquet":
+            escritor.write_table(pa.Table.from_batches([lote_rb]))
+        else:
+            escritor.write_batch(lote_rb)
+        for v in colunas.values():
+            v.clear()
+
+    with escritor:
+        for reg in registros:
+            for c in COLUNAS_SAIDA:
+                colunas[c].append(_valor_coluna(c, reg.get(c)))
+            n += 1
+            if n % lote == 0:
+                despejar()
+        if n % lote or n == 0:
+            despejar()
+    return n
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  ENRIQUECIMENTO DE E-MAIL — estágio próprio, fora dos ficha workers
+# ════════════════════════════════════════════════════════════════════════════
+class EnriquecedorEmail:
+    """
+    Recebe os registros aprovados e busca o e-mail no site em paralelo,
+    preenchendo a coluna "E-mail" no próprio dict. O ficha worker entrega
+    o registro e segue direto para o próximo link, sem esperar o site.
+    - por_host: limite de requisições simultâneas para o mesmo domínio
+    - finalizar(prazo): prazo global; o que não começou até lá é descartado
+    - ao_concluir(registro): chamado uma vez por registro, com ou sem e-mail
+      (sem site, na hora; no prazo, os que ficaram pendentes vão sem e-mail)
+    """
+
+    def __init__(self, buscar, log_cb=None, max_workers=8, por_host=2, ao_concluir=None):
+        self.buscar   = buscar           # fn(url) -> e-mail ou ""
+        self.log      = log_cb or print
+        self.ao_concluir = ao_concluir or (lambda registro: None)
+        self._pendentes  = {}            # id(registro) -> registro ainda não concluído
+        self.por_host = por_host
+        self._ex      = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="email")
+        self._lock    = threading.Lock()
+        self._hosts   = {}               # host -> Semaphore
+        self._futuros = []
+        self._prazo   = None             # time.time() limite, definido em finalizar()
+        self.encontrados = 0
+
+    def _semaforo(self, url):
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.por_host)
+            return self._hosts[host]
+
+    def enviar(self, registro):
+        """Agenda a busca do e-mail para registro["Site"] (se houver)."""
+        if not str(registro.get("Site", "")).startswith("http"):
+            self.ao_concluir(registro)
+            return
+        with self._lock:
+            self._pendentes[id(registro)] = registro
+        fut = self._ex.submit(self._tarefa, registro)
+        with self._lock:
+            self._futuros.append(fut)
+
+    def _concluir(self, registro):
+        with self._lock:
+            if self._pendentes.pop(id(registro), None) is None:
+                return
+        self.ao_concluir(registro)
+
+    def _tarefa(self, registro):
+        try:
+            if self._prazo is not None and time.time() >= self._prazo:
+                return
+            with self._semaforo(registro["Site"]):
+                if self._prazo is not None and time.time() >= self._prazo:
+                    return
+                email = self.buscar(registro["Site"])
+            if email:
+                registro["E-mail"] = email
+                with self._lock:
+                    self.encontrados += 1
+                self.log(f"   📧 {registro.get('Nome', '')} — {email}", "sub")
+        finally:
+            self._concluir(registro)
+
+    def finalizar(self, prazo=120):
+        """Espera as buscas pendentes por no máximo `prazo` segundos."""
+        self._prazo = time.time() + prazo
+        with self._lock:
+            futuros = list(self._futuros)
+        for fut in futuros:
+            restante = self._prazo - time.time()
+            if restante <= 0:
+                break
+            try: fut.result(timeout=restante)
+            except Exception: pass
+        self._ex.shutdown(wait=False, cancel_futures=True)
+        # Estourou o prazo: o que sobrou sai sem e-mail, mas sai
+        with self._lock:
+            restantes = list(self._pendentes.values())
+        for registro in restantes:
+            self._concluir(registro)
+        return self.encontrados
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  GEOCODIFICAÇÃO — Nominatim com cache persistente + memória
+# ════════════════════════════════════════════════════════════════════════════
+class Geocodificador:
+    """
+    Geocodifica texto de região via Nominatim (lat/lon, bbox, display_name).
+    Consulta primeiro a memória do processo, depois a tabela geocache do
+    histórico; só vai à rede em último caso, respeitando o limite de
+    ~1 requisição/segundo da instância pública (intervalo global do processo).
+    A URL pode apontar para um servidor local (MAPS_SCRAPER_NOMINATIM).
+    """
+    NOMINATIM_URL = os.environ.get(
+        "MAPS_SCRAPER_NOMINATIM", "https://nominatim.openstreetmap.org/search"
+    )
+
+    _memo       = {}
+    _memo_lock  = threading.Lock()
+    _rede_lock  = threading.Lock()
+    _ultima_req = 0.0
+
+    def __init__(self, db, log_cb=None, intervalo=1.0, url=None):
+        self.db        = db
+        self.log       = log_cb or print
+        self.intervalo = intervalo
+        self.url       = url or self.NOMINATIM_URL
+
+    @staticmethod
+    def chave(regiao):
+        """Normaliza o texto: minúsculo, sem acento, espaços e vírgulas uniformes."""
+        txt = MapsScraper._norm(regiao or "")
+        partes = [" ".join(p.split()) for p in txt.split(",")]
+        return ", ".join(p for p in partes if p)
+
+    def _consultar(self, regiao):
+        # Intervalo mínimo entre requisições, compartilhado pelo processo
+        with Geocodificador._rede_lock:
+            espera = Geocodificador._ultima_req + self.intervalo - time.time()
+            if espera > 0:
+                time.sleep(espera)
+            try:
+                r = sessao_http().get(
+                    self.url,
+                    params={"q": regiao, "format": "json", "limit": 1},
+                    headers={"User-Agent": "MapsScraper/4.0"},
+                    timeout=8,
+                )
+            finally:
+                Geocodificador._ultima_req = time.time()
+        data = r.json()
+        if not data:
+            return None
+        d0 = data[0]
+        bbox = d0.get("boundingbox")
+        return {
+            "lat": float(d0["lat"]),
+            "lon": float(d0["lon"]),
+            "bbox": [float(v) for v in bbox] if bbox and len(bbox) == 4 else None,
+            "display_name": d0.get("display_name", ""),
+        }
+
+    def geocodificar(self, regiao):
+        """Retorna {lat, lon, bbox, display_name} ou None."""
+        chave = self.chave(regiao)
+        if not chave:
+            return None
+        with Geocodificador._memo_lock:
+            if chave in Geocodificador._memo:
+                return Geocodificador._memo[chave]
+        info = self.db.geo_em_cache(chave)
+        if info is None:
+            info = self._consultar(regiao)
+            if info is not None:
+                self.db.salvar_geo(chave, info)
+        with Geocodificador._memo_lock:
+            Geocodificador._memo[chave] = info
+        return info
+
+    def geocodificar_lote(self, regioes):
+        """
+        Geocodifica uma lista de regiões (cache primeiro, rede no ritmo
+        permitido). Retorna {regiao: info ou None}; falhas viram None.
+        """
+        saida = {}
+        for regiao in regioes:
+            try:
+                saida[regiao] = self.geocodificar(regiao)
+            except Exception as e:
+                self.log(f"   ⚠ Geocodificação falhou ({regiao}): {e}", "warn")
+                saida[regiao] = None
+        return saida
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  AGENDADOR — várias keywords ao mesmo tempo dentro de um orçamento de Chromes
+# ════════════════════════════════════════════════════════════════════════════
+class ContagemRegressiva:
+    """
+    Event que só fica "set" depois de N chamadas a set() — uma por produtor.
+    Mesma interface usada antes com threading.Event (set/is_set/wait).
+    """
+
+    def __init__(self, n=1):
+        self._restantes = n
+        self._lock  = threading.Lock()
+        self._event = threading.Event()
+        if n <= 0:
+            self._event.set()
+
+    def set(self):
+        with self._lock:
+            self._restantes -= 1
+            if self._restantes <= 0:
+                self._event.set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+
+class FilaLinks(queue.PriorityQueue):
+    """
+    Fila de links ordenada por score (maior sai primeiro; empate = ordem
+    de chegada). Mesma interface de queue.Queue para quem consome: get()
+    devolve só o link.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._seq = itertools.count()
+
+    def put(self, link, block=True, timeout=None, score=0.0):
+        super().put((-score, next(self._seq), link), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        return super().get(block, timeout)[2]
+
+
+class TarefaKeyword:
+    """Estado de uma keyword em andamento: fila de links, meta e sinais de parada."""
+
+    def __init__(self, indice, keyword, meta, produtores=1):
+        self.indice      = indice
+        self.keyword     = keyword
+        self.meta        = meta
+        self.produtores  = produtores
+        self.link_queue  = FilaLinks()
+        self.scroll_done = ContagemRegressiva(produtores)
+        self.parar       = threading.Event()   # substitui o antigo toggle de stop_flag
+        self.tiles       = None                # queue.Queue de tiles no modo "tiles"
+        self.tiles_ativos = 0                  # tiles sendo varridos (podem gerar filhos)
+        self.enfileirados = set()              # dedup compartilhado pelos produtores
+        self.cards       = {}                  # url -> dados do card da lista
+        self.varreduras  = {}                  # rotulo (tile/zoom) -> links vistos (já feitas)
+        self.lock        = threading.Lock()
+        self.aprovados   = [0]
+        self.em_andamento = 0
+        self.concluida   = False
+
+    def enfileirar(self, links, score=None):
+        """
+        Põe na fila só os links que nenhum produtor desta keyword já pôs.
+        score(link) define a prioridade (padrão: ordem de chegada).
+        """
+        with self.lock:
+            novos = set(links) - self.enfileirados
+            self.enfileirados.update(novos)
+        for link in novos:
+            self.link_queue.put(link, score=score(link) if score else 0.0)
+        return novos
+
+    def proximo_tile(self, parar):
+        """
+        Próximo tile da fila compartilhada. Se a fila estiver vazia mas outro
+        produtor ainda varre um tile (que pode se subdividir), espera.
+        Retorna None quando não há mais nada a varrer.
+        """
+        while not parar():
+            with self.lock:
+                try:
+                    tile = self.tiles.get_nowait()
+                    self.tiles_ativos += 1
+                    return tile
+                except queue.Empty:
+                    if self.tiles_ativos == 0:
+                        return None
+            time.sleep(0.5)
+        return None
+
+    def tile_concluido(self, filhos=()):
+        with self.lock:
+            for f in filhos:
+                self.tiles.put(f)
+            self.tiles_ativos -= 1
+
+    def restaurar(self, estado):
+        """Aplica o estado salvo no DiarioExecucao (retomada)."""
+        self.aprovados[0] = estado["aprovados"]
+        self.varreduras.update(estado["varreduras"])
+        for url, score, card in estado["fila"]:
+            self.enfileirados.add(url)
+            self.cards[url] = card
+            self.link_queue.put(url, score=score or 0.0)
+
+    def vagas(self):
+        """Quantas fichas ainda podem ser abertas sem estourar a meta."""
+        return self.meta - self.aprovados[0] - self.em_andamento
+
+
+class AgendadorKeywords:
+    """
+    Distribui os links de até `simultaneas` keywords ativas entre os ficha
+    workers. A cada pedido entrega o link da keyword mais atrasada em
+    relação à própria meta (fair share), sem abrir mais fichas do que a
+    cota restante da keyword. Quando uma keyword termina (meta atingida ou
+    lista esgotada), o scroll dela é parado e a próxima da fila é ativada.
+    """
+    FIM = object()
+
+    def __init__(self, keywords, meta_por_kw, simultaneas, ao_ativar,
+                 parado=lambda: False, log_cb=None, produtores=1):
+        self.pendentes = [TarefaKeyword(i, kw, meta_por_kw, produtores)
+                          for i, kw in enumerate(keywords)]
+        self.tarefas   = list(self.pendentes)
+        self.ativas    = []
+        self.simultaneas = max(1, simultaneas)
+        self.ao_ativar = ao_ativar        # fn(tarefa) — inicia os scroll workers da keyword
+        self.parado    = parado           # fn() -> True quando o usuário mandou parar
+        self.log       = log_cb or print
+        self._cond     = threading.Condition()
+
+    def iniciar(self):
+        with self._cond:
+            novas = self._ativar_proximas()
+        for t in novas:
+            self.ao_ativar(t)
+
+    def _ativar_proximas(self):
+        novas = []
+        while self.pendentes and len(self.ativas) < self.simultaneas and not self.parado():
+            t = self.pendentes.pop(0)
+            self.ativas.append(t)
+            novas.append(t)
+            self.log(f"\n── keyword [{t.indice+1}/{len(self.tarefas)}]: {t.keyword!r} ──", "system")
+        return novas
+
+    def _encerrar_concluidas(self):
+        """Marca como concluídas as keywords que terminaram. Chamar com o lock."""
+        for t in list(self.ativas):
+            terminou = (
+                t.aprovados[0] >= t.meta
+                or self.parado()
+                or (t.scroll_done.is_set() and t.link_queue.empty() and t.em_andamento == 0)
+            )
+            if not terminou or t.em_andamento:
+                continue
+            t.concluida = True
+            t.parar.set()
+            self.ativas.remove(t)
+            ok = t.aprovados[0] >= t.meta
+            status = "🎉 meta atingida" if ok else f"📌 {t.aprovados[0]}/{t.meta}"
+            self.log(f"── {status} para {t.keyword!r} ──", "ok" if ok else "warn")
+        return self._ativar_proximas()
+
+    def proximo(self, timeout=3):
+        """
+        Retorna (tarefa, link), None se nada estiver disponível no momento
+        ou AgendadorKeywords.FIM quando todas as keywords terminaram.
+        """
+        limite = time.time() + timeout
+        while True:
+            with self._cond:
+                novas = self._encerrar_concluidas()
+                if not novas:
+                    if not self.ativas and not self.pendentes:
+                        return self.FIM
+                    if self.parado():
+                        return self.FIM
+                    candidatas = sorted(
+                        (t for t in self.ativas if t.vagas() > 0 and not t.link_queue.empty()),
+                        key=lambda t: (t.aprovados[0] / max(1, t.meta), t.em_andamento),
+                    )
+                    for t in candidatas:
+                        try:
+                            link = t.link_queue.get_nowait()
+                        except queue.Empty:
+                            continue
+                        t.em_andamento += 1
+                        return t, link
+                    restante = limite - time.time()
+                    if restante <= 0:
+                        return None
+                    self._cond.wait(min(restante, 0.25))
+                    continue
+            for t in novas:
+                self.ao_ativar(t)
+
+    def concluir(self, tarefa):
+        """Ficha worker terminou de processar um link de `tarefa`."""
+        with self._cond:
+            tarefa.em_andamento -= 1
+            tarefa.link_queue.task_done()
+            self._cond.notify_all()
+
+    def avisar(self):
+        """Acorda os ficha workers (ex.: scroll colocou links novos na fila)."""
+        with self._cond:
+            self._cond.notify_all()
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  FILA DE LEASES — modo distribuído (coordenador + trabalhadores)
+# ════════════════════════════════════════════════════════════════════════════
+class FilaLeases(ABC):
+    """
+    Interface da fila durável do modo distribuído. Cada item tem tipo
+    ("keyword" ou "ficha"), grupo (execução:keyword), chave única (dedup de
+    publicação) e carga JSON. Um trabalhador arrenda um item por `duracao`
+    segundos; se não concluir nem renovar até lá, o item volta a ficar
+    visível para outro (visibility timeout). Falhas voltam para a fila com
+    espera crescente até `max_tentativas`; depois disso o item fica "morto".
+    Outros backends (Redis, SQS...) implementam os mesmos métodos — um
+    backend incompleto falha ao instanciar, não no meio de uma execução.
+    """
+    max_tentativas = 3
+
+    @abstractmethod
+    def publicar(self, tipo, carga, chave, grupo="", prioridade=0.0):
+        """Enfileira; False se a chave já existia (já publicado antes)."""
+
+    @abstractmethod
+    def arrendar(self, trabalhador, tipos, duracao=120):
+        """Próximo item disponível → dict(id, tipo, grupo, carga, tentativas) ou None."""
+
+    @abstractmethod
+    def renovar(self, item_id, trabalhador, duracao=120):
+        """Estende o lease. False se perdeu o lease ou o grupo foi cancelado."""
+
+    @abstractmethod
+    def concluir(self, item_id, trabalhador, resultado=None):
+        """Marca feito e guarda o resultado. False se o lease já era de outro."""
+
+    @abstractmethod
+    def falhar(self, item_id, trabalhador, erro=""):
+        """Devolve à fila com espera crescente, ou "morto" após max_tentativas."""
+
+    @abstractmethod
+    def cancelar(self, grupo):
+        """Descarta os pendentes do grupo e sinaliza os arrendados (renovar → False)."""
+
+    @abstractmethod
+    def resultados(self, desde=0):
+        """Itens concluídos após o cursor → [(seq, tipo, grupo, carga, resultado)]."""
+
+    @abstractmethod
+    def abertos(self, prefixo_grupo=""):
+        """Quantos itens ainda podem rodar (pendentes ou arrendados, não cancelados)."""
+
+    @abstractmethod
+    def contagem(self):
+        """{estado: n} — para log/monitoramento."""
+
+
+class FilaLeasesSQLite(FilaLeases):
+    """
+    FilaLeases num arquivo SQLite (WAL). Serve para vários processos na
+    mesma máquina, ou em máquinas diferentes com o arquivo num disco
+    compartilhado que respeite locks. O arrendamento é um UPDATE dentro de
+    BEGIN IMMEDIATE, então dois processos nunca pegam o mesmo item.
+    """
+
+    def __init__(self, caminho, max_tentativas=3):
+        self.caminho = str(caminho)
+        self.max_tentativas = max_tentativas
+        self._lock = threading.Lock()
+        self.conn  = sqlite3.connect(self.caminho, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS leases (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo          TEXT,
+                grupo         TEXT,
+                chave         TEXT UNIQUE,
+                carga         TEXT,
+                prioridade    REAL DEFAULT 0,
+                estado        TEXT DEFAULT 'pendente',
+                cancelado     INTEGER DEFAULT 0,
+                trabalhador   TEXT,
+                expira        REAL,
+                tentativas    INTEGER DEFAULT 0,
+                disponivel_em REAL DEFAULT 0,
+                erro          TEXT
+            );
+            CREATE INDEX IF NOT EXISTS leases_fila ON leases (estado, tipo, prioridade DESC, id);
+            CREATE INDEX IF NOT EXISTS leases_grupo ON leases (grupo, estado);
+            CREATE TABLE IF NOT EXISTS lease_resultados (
+                seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+                lease_id  INTEGER,
+                resultado TEXT
+            );
+        """)
+
+    def _transacao(self, fn):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                r = fn(self.conn)
+                self.conn.execute("COMMIT")
+                return r
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def publicar(self, tipo, carga, chave, grupo="", prioridade=0.0):
+        with self._lock:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO leases (tipo, grupo, chave, carga, prioridade) VALUES (?,?,?,?,?)",
+                (tipo, grupo, chave, json.dumps(carga, ensure_ascii=False), prioridade)
+            )
+        return cur.rowcount == 1
+
+    def arrendar(self, trabalhador, tipos, duracao=120):
+        marcas = ",".join("?" * len(tipos))
+
+        def tx(conn):
+            agora = time.time()
+            while True:
+                row = conn.execute(
+                    f"SELECT id, tipo, grupo, carga, tentativas FROM leases "
+                    f"WHERE tipo IN ({marcas}) AND cancelado = 0 AND ("
+                    f"  (estado = 'pendente' AND disponivel_em <= ?) OR"
+                    f"  (estado = 'arrendado' AND expira < ?)) "
+                    f"ORDER BY prioridade DESC, id LIMIT 1",
+                    (*tipos, agora, agora)
+                ).fetchone()
+                if row is None:
+                    return None
+                item_id, tipo, grupo, carga, tentativas = row
+                if tentativas >= self.max_tentativas:
+                    # Lease expirou vezes demais (trabalhador morrendo nele)
+                    conn.execute("UPDATE leases SET estado = 'morto', erro = 'lease expirado' "
+                                 "WHERE id = ?", (item_id,))
+                    continue
+                conn.execute(
+                    "UPDATE leases SET estado = 'arrendado', trabalhador = ?, expira = ?, "
+                    "tentativas = tentativas + 1 WHERE id = ?",
+                    (trabalhador, agora + duracao, item_id)
+                )
+                return dict(id=item_id, tipo=tipo, grupo=grupo, carga=json.loads(carga),
+                            tentativas=tentativas + 1)
+
+        return self._transacao(tx)
+
+    def renovar(self, item_id, trabalhador, duracao=120):
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE leases SET expira = ? WHERE id = ? AND trabalhador = ? "
+                "AND estado = 'arrendado' AND cancelado = 0",
+                (time.time() + duracao, item_id, trabalhador)
+            )
+        return cur.rowcount == 1
+
+    def concluir(self, item_id, trabalhador, resultado=None):
+        def tx(conn):
+            cur = conn.execute(
+                "UPDATE leases SET estado = 'feito', expira = NULL "
+                "WHERE id = ? AND trabalhador = ? AND estado = 'arrendado'",
+                (item_id, trabalhador)
+            )
+            if cur.rowcount != 1:
+                return False        # lease perdido: outro trabalhador refaz
+            conn.execute("INSERT INTO lease_resultados (lease_id, resultado) VALUES (?,?)",
+                         (item_id, json.dumps(resultado, ensure_ascii=False)))
+            return True
+        return self._transacao(tx)
+
+    def falhar(self, item_id, trabalhador, erro=""):
+        def tx(conn):
+            row = conn.execute("SELECT tentativas FROM leases WHERE id = ? AND trabalhador = ? "
+                               "AND estado = 'arrendado'", (item_id, trabalhador)).fetchone()
+            if row is None:
+                return
+            if row[0] >= self.max_tentativas:
+                conn.execute("UPDATE leases SET estado = 'morto', erro = ? WHERE id = ?",
+                             (erro, item_id))
+            else:
+                espera = min(300, 5 * 2 ** row[0])
+                conn.execute("UPDATE leases SET estado = 'pendente', erro = ?, expira = NULL, "
+                             "disponivel_em = ? WHERE id = ?",
+                             (erro, time.time() + espera, item_id))
+        self._transacao(tx)
+
+    def cancelar(self, grupo):
+        with self._lock:
+            self.conn.execute("UPDATE leases SET cancelado = 1 WHERE grupo = ? "
+                              "AND estado IN ('pendente', 'arrendado')", (grupo,))
+
+    def resultados(self, desde=0):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT r.seq, l.tipo, l.grupo, l.carga, r.resultado FROM lease_resultados r "
+                "JOIN leases l ON l.id = r.lease_id WHERE r.seq > ? ORDER BY r.seq",
+                (desde,)
+            ).fetchall()
+        return [(seq, tipo, grupo, json.loads(carga), json.loads(res) if res else None)
+                for seq, tipo, grupo, carga, res in rows]
+
+    def abertos(self, prefixo_grupo=""):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE estado IN ('pendente', 'arrendado') "
+                "AND cancelado = 0 AND grupo LIKE ?", (prefixo_grupo + "%",)
+            ).fetchone()[0]
+
+    def contagem(self):
+        """{estado: n} — para log/monitoramento."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT estado, COUNT(*) FROM leases GROUP BY estado"))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class TarefaDistribuida(TarefaKeyword):
+    """
+    TarefaKeyword de um trabalhador: em vez de ir para a FilaLinks local,
+    cada link novo é publicado na FilaLeases como item "ficha" (chave
+    execução|url, então o mesmo lugar não é publicado duas vezes na
+    execução, venha de que keyword ou nó vier).
+    """
+
+    def __init__(self, fila, carga, produtores=1):
+        super().__init__(0, carga["keyword"], carga["meta"], produtores)
+        self.fila  = fila
+        self.carga = carga
+
+    def enfileirar(self, links, score=None):
+        with self.lock:
+            novos = set(links) - self.enfileirados
+            self.enfileirados.update(novos)
+        publicados = set()
+        for link in novos:
+            carga = {**self.carga, "link": link, "card": self.cards.get(link) or {}}
+            if self.fila.publicar("ficha", carga, chave=f"{self.carga['run']}|{link}",
+                                  grupo=self.carga["grupo"],
+                                  prioridade=score(link) if score else 0.0):
+                publicados.add(link)
+        return publicados
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  REDE — perfis de bloqueio de recursos e estatística por worker
+# ════════════════════════════════════════════════════════════════════════════
+# Padrões para Network.setBlockedURLs (curinga *). O scraper só lê texto e
+# atributos, então imagem, fonte, vídeo e telemetria são peso morto.
+_BLOQUEIO_LEVE = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*googleusercontent.com/*", "*ggpht.com/*",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.gstatic.com/*",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*play.google.com/log*", "*/gen_204*",
+]
+# Além do leve: tiles do mapa (vetoriais e satélite) e Street View
+_BLOQUEIO_TILES = [
+    "*/maps/vt*", "*/vt/pb=*", "*khms*.google.com/*", "*/kh/v=*",
+    "*streetviewpixels*", "*/maps/preview/pwa*",
+]
+PERFIS_BLOQUEIO = {
+    "nenhum":   [],
+    "leve":     _BLOQUEIO_LEVE,
+    "sem_mapa": _BLOQUEIO_LEVE + _BLOQUEIO_TILES,
+}
+
+
+class EstatRede:
+    """
+    Páginas, tempo de carga e bytes de um worker, lidos do log de performance
+    do Chrome (eventos Network.*). Requisições bloqueadas não têm tamanho,
+    então os bytes poupados são estimados pelo tamanho médio do tipo.
+    """
+    BYTES_MEDIOS = {
+        "Image": 30_000, "Font": 40_000, "Media": 250_000, "Stylesheet": 20_000,
+        "Script": 60_000, "XHR": 8_000, "Fetch": 25_000, "Other": 10_000,
+    }
+
+    def __init__(self):
+        self.paginas         = 0
+        self.tempo_carga     = 0.0
+        self.bytes_recebidos = 0
+        self.bloqueados      = 0
+        self.bytes_poupados  = 0
+        self._tipos          = {}      # requestId -> tipo do recurso
+
+    def registrar_pagina(self, segundos):
+        self.paginas     += 1
+        self.tempo_carga += segundos
+
+    def processar_eventos(self, eventos):
+        """eventos: [(method, params)] drenados do log de performance."""
+        for metodo, params in eventos:
+            if metodo == "Network.requestWillBeSent":
+                self._tipos[params.get("requestId")] = params.get("type", "Other")
+            elif metodo == "Network.loadingFinished":
+                self.bytes_recebidos += int(params.get("encodedDataLength") or 0)
+                self._tipos.pop(params.get("requestId"), None)
+            elif metodo == "Network.loadingFailed":
+                tipo = self._tipos.pop(params.get("requestId"), params.get("type", "Other"))
+                if params.get("blockedReason"):
+                    self.bloqueados     += 1
+                    self.bytes_poupados += self.BYTES_MEDIOS.get(tipo, self.BYTES_MEDIOS["Other"])
+        if len(self._tipos) > 5000:
+            self._tipos.clear()
+
+    def somar(self, outra):
+        self.paginas         += outra.paginas
+        self.tempo_carga     += outra.tempo_carga
+        self.bytes_recebidos += outra.bytes_recebidos
+        self.bloqueados      += outra.bloqueados
+        self.bytes_poupados  += outra.bytes_poupados
+
+    def resumo(self):
+        n = max(1, self.paginas)
+        return (f"{self.paginas} pág. | carga média {self.tempo_carga / n:.2f}s | "
+                f"{self.bytes_recebidos / n / 1024:.0f} KB/pág. | "
+                f"{self.bloqueados} bloqueio(s) ≈ {self.bytes_poupados / 1024 / 1024:.1f} MB poupados")
+
+
+class PayloadMaps:
+    """
+    Lê os JSON que o próprio Maps baixa — /search?tbm=map (páginas da lista
+    de resultados) e /maps/preview/place (ficha) — e devolve o mesmo dict de
+    MapsScraper._extrair_ficha. Os arrays não têm nome de campo, só posição;
+    _dig anda por eles sem levantar exceção, então uma mudança de layout vira
+    campo vazio (e o caminho DOM assume), não erro.
+    Tudo estático e sem Chrome: dá para rodar em cima de payloads gravados.
+    """
+    PREFIXO   = ")]}'"
+    URL_BUSCA = "/search?tbm=map"
+    URL_FICHA = "/maps/preview/place"
+    # Feature id do lugar ("0x...:0x...") — aparece na URL do card e em p[10]
+    RE_FEATURE = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.I)
+
+    @classmethod
+    def interessa(cls, url):
+        return cls.URL_BUSCA in url or cls.URL_FICHA in url
+
+    @staticmethod
+    def _dig(obj, *indices):
+        for i in indices:
+            try:
+                obj = obj[i]
+            except (IndexError, KeyError, TypeError):
+                return None
+        return obj
+
+    @classmethod
+    def _carregar(cls, texto):
+        """Corpo cru → estrutura JSON (tira o prefixo anti-XSSI e o envelope {"d": ...})."""
+        texto = (texto or "").strip()
+        if texto.startswith("{"):
+            # Resposta nova da busca: {"c":0,"d":")]}'\n[...]",...}/*""*/
+            try:
+                texto = json.loads(texto.rsplit("/*", 1)[0]).get("d") or ""
+            except (ValueError, AttributeError):
+                return None
+            texto = texto.strip()
+        if texto.startswith(cls.PREFIXO):
+            texto = texto[len(cls.PREFIXO):]
+        try:
+            return json.loads(texto)
+        except ValueError:
+            return None
+
+    @classmethod
+    def feature_id(cls, url):
+        m = cls.RE_FEATURE.search(url or "")
+        return m.group(1).lower() if m else ""
+
+    @classmethod
+    def lugar(cls, p):
+        """Array de um lugar → (feature_id, dict da ficha) ou None."""
+        dig = cls._dig
+        nome = dig(p, 11)
+        if not isinstance(nome, str) or not nome:
+            return None
+
+        endereco = dig(p, 39)
+        if not isinstance(endereco, str) or not endereco:
+            endereco = dig(p, 18) if isinstance(dig(p, 18), str) else ""
+            if endereco.startswith(nome + ", "):
+                endereco = endereco[len(nome) + 2:]
+
+        site = dig(p, 7, 0) if isinstance(dig(p, 7, 0), str) else ""
+        if site.startswith("/url?"):
+            site = (parse_qs(urlparse(site).query).get("q") or [""])[0]
+
+        categorias = dig(p, 13)
+        categoria  = categorias[0] if isinstance(categorias, list) and categorias else ""
+        stars      = dig(p, 4, 7)
+        reviews    = dig(p, 4, 8)
+        telefone   = dig(p, 178, 0, 0)
+
+        dados = dict(
+            nome=nome.strip(),
+            categoria=categoria if isinstance(categoria, str) else "",
+            endereco=endereco.strip(),
+            telefone=telefone.strip() if isinstance(telefone, str) else "",
+            site=site,
+            stars=float(stars) if isinstance(stars, (int, float)) else 0.0,
+            reviews=int(reviews) if isinstance(reviews, (int, float)) else 0,
+        )
+        fid = dig(p, 10)
+        return (fid.lower() if isinstance(fid, str) else ""), dados
+
+    @classmethod
+    def interpretar(cls, url, texto):
+        """Corpo de uma resposta → {feature_id: dict da ficha}."""
+        data = cls._carregar(texto)
+        if data is None:
+            return {}
+        if cls.URL_FICHA in url:
+            lugares = [cls._dig(data, 6)]
+        else:
+            # Layout antigo: data[0][1][i][14]; novo: data[64][i][1]
+            lugares = [cls._dig(r, 14) for r in (cls._dig(data, 0, 1) or [])]
+            lugares += [cls._dig(r, 1) for r in (cls._dig(data, 64) or [])]
+        saida = {}
+        for p in lugares:
+            if not isinstance(p, list):
+                continue
+            lido = cls.lugar(p)
+            if lido and lido[0]:
+                saida[lido[0]] = lido[1]
+        return saida
+
+    @classmethod
+    def pagina(cls, html):
+        """
+        HTML de /maps/place/... baixado sem navegador → dict da ficha ou None.
+        Os dados vêm embutidos em window.APP_INITIALIZATION_STATE; o lugar é
+        o mesmo array do preview, dentro de uma string com prefixo )]}'.
+        """
+        m = re.search(r'window\.APP_INITIALIZATION_STATE\s*=\s*(.*?);\s*window\.APP_FLAGS',
+                      html or "", re.S)
+        if not m:
+            return None
+        try:
+            estado = json.loads(m.group(1))
+        except ValueError:
+            return None
+        for bloco in cls._dig(estado, 3) or []:
+            if not (isinstance(bloco, str) and bloco.startswith(cls.PREFIXO)):
+                continue
+            p = cls._dig(cls._carregar(bloco), 6)
+            lido = cls.lugar(p) if isinstance(p, list) else None
+            if lido:
+                return lido[1]
+        return None
+
+    @staticmethod
+    def completo(dados):
+        """Dá para aprovar sem abrir a ficha? (nome e endereço para o filtro de região)"""
+        return bool(dados and dados.get("nome") and dados.get("endereco"))
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  MÉTRICAS — contadores e tempos por etapa/worker (JSON e Prometheus)
+# ════════════════════════════════════════════════════════════════════════════
+class Metricas:
+    """
+    Contadores, medidores (gauges) e histogramas de tempo, por nome e rótulos
+    (ex.: etapa="carregar_ficha", worker="W2"). Thread-safe: um lock só,
+    segurado pelo tempo de um acesso a dict. instantaneo() é o JSON de
+    /metrics.json (com taxa por minuto dos contadores) e prometheus() o texto
+    de /metrics. Desligado, o scraper usa MetricasNulas.
+    """
+    ativa   = True
+    PREFIXO = "maps_scraper_"
+    BUCKETS = (0.0001, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    AJUDA = {
+        "etapa_segundos":          "tempo por etapa do worker",
+        "espera_lock_segundos":    "espera para adquirir um lock compartilhado",
+        "fichas_total":            "fichas lidas (aprovadas ou não), por origem",
+        "aprovados_total":         "registros aprovados",
+        "rejeicoes_total":         "fichas descartadas, por motivo",
+        "erros_total":             "exceções ao processar uma ficha",
+        "links_enfileirados_total": "links novos postos na fila de fichas",
+        "fichas_evitadas_total":   "links descartados pelo card da lista, sem abrir a ficha",
+        "fila_links":              "links aguardando ficha worker",
+        "fila_leases":             "itens da fila de leases, por estado",
+    }
+
+    def __init__(self):
+        self.inicio       = time.time()
+        self._lock        = threading.Lock()
+        self._contadores  = {}      # (nome, rótulos) -> valor
+        self._medidores   = {}      # (nome, rótulos) -> valor
+        self._histogramas = {}      # (nome, rótulos) -> [n por bucket..., n +Inf, soma]
+
+    @staticmethod
+    def _chave(nome, rotulos):
+        return nome, tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+    def inc(self, nome, valor=1, **rotulos):
+        chave = self._chave(nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        chave = self._chave(nome, rotulos)
+        with self._lock:
+            self._medidores[chave] = valor
+
+    def observar(self, nome, segundos, **rotulos):
+        chave = self._chave(nome, rotulos)
+        i = bisect_left(self.BUCKETS, segundos)
+        with self._lock:
+            h = self._histogramas.get(chave)
+            if h is None:
+                h = self._histogramas[chave] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            h[i]  += 1
+            h[-1] += segundos
+
+    @contextmanager
+    def medir(self, etapa, **rotulos):
+        """with metricas.medir("extrair", worker="W1"): ... → etapa_segundos."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar("etapa_segundos", time.perf_counter() - t0, etapa=etapa, **rotulos)
+
+    @contextmanager
+    def travar(self, lock, **rotulos):
+        """Como `with lock:`, registrando quanto se esperou para adquiri-lo."""
+        t0 = time.perf_counter()
+        with lock:
+            self.observar("espera_lock_segundos", time.perf_counter() - t0, **rotulos)
+            yield
+
+    def _copiar(self):
+        with self._lock:
+            return (dict(self._contadores), dict(self._medidores),
+                    {k: list(h) for k, h in self._histogramas.items()})
+
+    def instantaneo(self):
+        """Estado atual como dict serializável em JSON."""
+        contadores, medidores, histogramas = self._copiar()
+        segundos = time.time() - self.inicio
+        minutos  = max(segundos / 60, 1e-9)
+        return {
+            "inicio":   datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+            "segundos": round(segundos, 1),
+            "contadores": [
+                {"nome": n, "rotulos": dict(r), "valor": v, "por_minuto": round(v / minutos, 2)}
+                for (n, r), v in sorted(contadores.items())
+            ],
+            "medidores": [
+                {"nome": n, "rotulos": dict(r), "valor": v}
+                for (n, r), v in sorted(medidores.items())
+            ],
+            "histogramas": [
+                {"nome": n, "rotulos": dict(r), "n": sum(h[:-1]), "soma": round(h[-1], 4),
+                 "media": round(h[-1] / max(1, sum(h[:-1])), 4),
+                 "buckets": dict(zip([*map(str, self.BUCKETS), "+Inf"], itertools.accumulate(h[:-1])))}
+                for (n, r), h in sorted(histogramas.items())
+            ],
+        }
+
+    def prometheus(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        def rot(rotulos, *extra):
+            pares = [*rotulos, *extra]
+            if not pares:
+                return ""
+            esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pares) + "}"
+
+        contadores, medidores, histogramas = self._copiar()
+        linhas, vistos = [], set()
+
+        def cabecalho(nome, tipo):
+            if nome not in vistos:
+                vistos.add(nome)
+                linhas.append(f"# HELP {self.PREFIXO}{nome} {self.AJUDA.get(nome, nome)}")
+                linhas.append(f"# TYPE {self.PREFIXO}{nome} {tipo}")
+
+        for tipo, dados in (("counter", contadores), ("gauge", medidores)):
+            for (nome, r), v in sorted(dados.items()):
+                cabecalho(nome, tipo)
+                linhas.append(f"{self.PREFIXO}{nome}{rot(r)} {v}")
+        for (nome, r), h in sorted(histogramas.items()):
+            cabecalho(nome, "histogram")
+            m = self.PREFIXO + nome
+            for le, n in zip([*map(str, self.BUCKETS), "+Inf"], itertools.accumulate(h[:-1])):
+                linhas.append(f"{m}_bucket{rot(r, ('le', le))} {n}")
+            linhas.append(f"{m}_sum{rot(r)} {h[-1]:.6f}")
+            linhas.append(f"{m}_count{rot(r)} {sum(h[:-1])}")
+        return "\n".join(linhas) + "\n"
+
+    def resumo(self):
+        """Tempo total por etapa (somado entre workers), da maior para a menor."""
+        _, _, histogramas = self._copiar()
+        total = {}
+        for (nome, r), h in histogramas.items():
+            if nome == "etapa_segundos":
+                etapa = dict(r)["etapa"]
+                total[etapa] = total.get(etapa, 0.0) + h[-1]
+        return " | ".join(f"{e} {s:.1f}s" for e, s in sorted(total.items(), key=lambda kv: -kv[1]))
+
+
+class MetricasNulas:
+    """Métricas desligadas: mesma interface, nada é registrado."""
+    ativa = False
+
+    def inc(self, nome, valor=1, **rotulos):
+        pass
+
+    def definir(self, nome, valor, **rotulos):
+        pass
+
+    def observar(self, nome, segundos, **rotulos):
+        pass
+
+    def medir(self, etapa, **rotulos):
+        return nullcontext()
+
+    def travar(self, lock, **rotulos):
+        return lock
+
+
+class ServidorMetricas:
+    """
+    HTTP local numa thread daemon: GET /metrics (texto Prometheus) e
+    GET /metrics.json (Metricas.instantaneo). porta=0 escolhe uma livre.
+    """
+
+    def __init__(self, metricas, porta=9464, host="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                caminho = self.path.split("?", 1)[0]
+                if caminho == "/metrics":
+                    corpo = metricas.prometheus().encode()
+                    tipo  = "text/plain; version=0.0.4; charset=utf-8"
+                elif caminho in ("/", "/metrics.json"):
+                    corpo = json.dumps(metricas.instantaneo(), ensure_ascii=False).encode()
+                    tipo  = "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass                # não mistura no stdout de progresso
+
+        self.httpd = ThreadingHTTPServer((host, porta), Handler)
+        self.httpd.daemon_threads = True
+        self.porta = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                         name="metricas").start()
+
+    def fechar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
 # ════════════════════════════════════════════════════════════════════════════
 #  SCRAPER  — v4: JavaScript DOM + regex no texto, sem CSS frágil
 # ════════════════════════════════════════════════════════════════════════════
 class MapsScraper:
-    def __init__(self, log_cb=None, progress_cb=None):
+    NAVEGACOES = ("direta", "historico")
+
+    def __init__(self, log_cb=None, progress_cb=None, chromedriver_path=None,
+                 ritmo=1.0, ttl_email_dias=30, navegacao="direta",
+                 bloqueio="auto", medir_rede=True, captura=True, metricas=None):
         self.log       = log_cb      or print
         self.progress  = progress_cb or (lambda v, t: None)
+        self.chromedriver_path = chromedriver_path
+        # Multiplicador das pausas anti-bot (0 = sem pausa, 1 = padrão)
+        self.ritmo     = ritmo
+        # Validade do cache de e-mail por domínio
+        self.ttl_email = ttl_email_dias * 86400
+        # "direta": ficha → ficha sem voltar; "historico": driver.back() após cada
+        # ficha (mais parecido com um usuário, porém recarrega a página anterior)
+        self.navegacao = navegacao
+        # Perfil de PERFIS_BLOQUEIO; "auto" = scroll "leve" e fichas "sem_mapa"
+        self.bloqueio  = bloqueio
+        self.medir_rede = medir_rede
+        # Lê os JSON de busca/ficha da rede (PayloadMaps); DOM vira fallback
+        self.captura   = captura
+        self.log_rede  = medir_rede or captura
+        self.estat_rede = EstatRede()
+        self.capturados = {}        # feature_id -> dict da ficha
+        self._respostas = {}        # requestId -> url (aguardando loadingFinished)
+        self._estat_lock = threading.Lock()
+        # Tempos por etapa e contadores (Metricas); desligado = MetricasNulas
+        self.metricas  = metricas or MetricasNulas()
+        self.worker    = ""         # rótulo "worker" das métricas (clones dos workers)
         self.stop_flag = False
         self.results   = []
+        self.fichas_evitadas = 0
+        self.email_hits = self.email_misses = 0     # cache de e-mail por domínio, por execução
+        self.backend_ficha = "chrome"
+        self.fichas_http = self.fallbacks_chrome = 0
+        self.saida     = None
+        self.manter_resultados = True
+        self.emitidos  = 0
         self.driver    = None
-        self.db        = HistoricoDB()
+        self.db        = HistoricoDB.compartilhado()
+        self.diario    = DiarioExecucao(self.db)
+        self.execucao  = None
+        # Modo distribuído: aprovação confirmada no SQLite (HistoricoDB.reservar)
+        self.historico_compartilhado = False
+        self.pool      = PoolChrome.compartilhado()
+        # None = perfis Chrome ao lado do script (chrome_profile_w{slot})
+        self.pasta_perfis = None
+        self.geo       = None
 
     def stop(self):
         self.stop_flag = True
@@ -139,26 +2069,64 @@ class MapsScraper:
         return "".join(c for c in txt if unicodedata.category(c) != "Mn")
 
     # ── E-mail via site ───────────────────────────────────────────────────────
+    @staticmethod
+    def _dominio(url):
+        """Domínio normalizado para o cache: minúsculo, sem www. e sem porta."""
+        host = (urlparse(url).hostname or "").lower().rstrip(".")
+        return host[4:] if host.startswith("www.") else host
+
     def _email_do_site(self, url):
+        """E-mail do site, consultando antes o cache por domínio do histórico."""
         if not url or not url.startswith("http"):
             return ""
+        dominio = self._dominio(url)
+        if dominio:
+            em_cache = self.db.email_em_cache(dominio, self.ttl_email)
+            with self._estat_lock:
+                if em_cache is not None:
+                    self.email_hits += 1
+                else:
+                    self.email_misses += 1
+            if em_cache is not None:
+                return em_cache
+        with self.metricas.medir("email_site"):
+            email, status = self._buscar_email_site(url)
+        if dominio and self._email_cacheavel(email, status):
+            self.db.salvar_email(dominio, email, status)
+        return email
+
+    @staticmethod
+    def _email_cacheavel(email, status):
+        """
+        Só vai para o cache o que uma nova tentativa não mudaria: e-mail
+        achado, página 2xx lida sem e-mail, ou 404/410. Falha de rede, 429 e
+        5xx são passageiros — negativo deles bloquearia o domínio pelo TTL.
+        """
+        if email:
+            return True
+        return status is not None and (200 <= status < 300 or status in (404, 410))
+
+    def _buscar_email_site(self, url):
+        """Baixa o site e procura um e-mail. Retorna (email, status HTTP)."""
+        status = None
         try:
-            r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=8)
+            r = sessao_http().get(url, timeout=8)
+            status = r.status_code
             soup = BeautifulSoup(r.text, "lxml")
             # Prioriza mailto: links
             for a in soup.find_all("a", href=True):
                 if a["href"].startswith("mailto:"):
                     e = a["href"][7:].split("?")[0].strip()
                     if "@" in e and "." in e.split("@")[1]:
-                        return e
+                        return e, status
             # Fallback: regex no texto
             for e in re.findall(r"[\w.+\-]+@[\w.\-]+\.[a-zA-Z]{2,}", soup.get_text(" ")):
                 dom = e.split("@")[1].lower()
                 if not any(x in dom for x in ["example","wix","wordpress","seusite","domain"]):
-                    return e
+                    return e, status
         except Exception:
             pass
-        return ""
+        return "", status
 
     # ── WhatsApp ──────────────────────────────────────────────────────────────
     def _whatsapp(self, tel):
@@ -175,19 +2143,14 @@ class MapsScraper:
 
     # ── Geocodificação ────────────────────────────────────────────────────────
     def _geocodificar(self, regiao):
+        """Retorna (lat, lon); o resultado completo (com bbox) fica em self.geo."""
+        self.geo = None
         try:
-            r = requests.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={"q": regiao, "format": "json", "limit": 1},
-                headers={"User-Agent": "MapsScraper/4.0"},
-                timeout=8,
-            )
-            data = r.json()
-            if data:
-                lat = float(data[0]["lat"])
-                lon = float(data[0]["lon"])
-                self.log(f"   📍 {data[0].get('display_name','')[:70]}", "sub")
-                return lat, lon
+            info = Geocodificador(self.db, log_cb=self.log).geocodificar(regiao)
+            if info:
+                self.geo = info
+                self.log(f"   📍 {info.get('display_name','')[:70]}", "sub")
+                return info["lat"], info["lon"]
         except Exception as e:
             self.log(f"   ⚠ Geocodificação falhou: {e}", "warn")
         return None
@@ -201,6 +2164,54 @@ class MapsScraper:
         q = requests.utils.quote(f"{keyword}, {regiao}")
         return f"https://www.google.com/maps/search/{q}"
 
+    # ── Tiling geográfico — divide a bbox da região em buscas @lat,lon,zoom ─
+    ZOOM_TILE_MIN      = 6
+    ZOOM_TILE_MAX      = 17
+    MAX_TILES_INICIAIS = 16
+    SATURACAO_TILE     = 100   # o Maps corta a lista em ~120 resultados
+
+    @staticmethod
+    def _span_tile(zoom, lat):
+        """Graus (lat, lon) visíveis na janela 1280x900 do Chrome no zoom dado."""
+        graus_px = 360.0 / (256 * 2 ** zoom)
+        return 900 * graus_px * math.cos(math.radians(lat)), 1280 * graus_px
+
+    @staticmethod
+    def _grade(bbox, nx, ny, zoom):
+        """Grade nx × ny sobre bbox (sul, norte, oeste, leste) → [(lat, lon, zoom, bbox)]."""
+        sul, norte, oeste, leste = bbox
+        alt, larg = (norte - sul) / ny, (leste - oeste) / nx
+        tiles = []
+        for iy in range(ny):
+            for ix in range(nx):
+                s0, o0 = sul + iy * alt, oeste + ix * larg
+                tiles.append((s0 + alt / 2, o0 + larg / 2, zoom, (s0, s0 + alt, o0, o0 + larg)))
+        return tiles
+
+    @classmethod
+    def _tiles_da_bbox(cls, bbox):
+        """
+        Escolhe o maior zoom em que a bbox cabe em até MAX_TILES_INICIAIS
+        tiles e devolve a grade inicial.
+        """
+        sul, norte, oeste, leste = bbox
+        lat_c = (sul + norte) / 2
+        for zoom in range(cls.ZOOM_TILE_MAX, cls.ZOOM_TILE_MIN - 1, -1):
+            dlat, dlon = cls._span_tile(zoom, lat_c)
+            ny = max(1, math.ceil((norte - sul) / dlat))
+            nx = max(1, math.ceil((leste - oeste) / dlon))
+            if nx * ny <= cls.MAX_TILES_INICIAIS:
+                break
+        return cls._grade(bbox, nx, ny, zoom)
+
+    @classmethod
+    def _subdividir(cls, tile):
+        """Tile saturado → 4 filhos com um nível a mais de zoom."""
+        _, _, zoom, bbox = tile
+        if zoom >= cls.ZOOM_TILE_MAX:
+            return []
+        return cls._grade(bbox, 2, 2, zoom + 1)
+
     # ── Verifica se endereço pertence à região ────────────────────────────────
     # Países/continentes: endereços locais nunca contêm esses termos
     REGIOES_AMPLAS = {
@@ -292,17 +2303,25 @@ class MapsScraper:
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
     ]
 
-    def _init_driver(self, worker_id=0, headless=False):
+    def _perfil_bloqueio(self, papel):
+        """Perfil de bloqueio para o papel do worker ("scroll" ou "ficha")."""
+        if self.bloqueio == "auto":
+            return "leve" if papel == "scroll" else "sem_mapa"
+        return self.bloqueio if self.bloqueio in PERFIS_BLOQUEIO else "nenhum"
+
+    def _init_driver(self, worker_id=0, headless=False, bloqueio="nenhum", log_rede=False):
         """
         Cria instância Chrome com anti-detecção:
         - User-agent rotativo por worker
         - Remove todos os sinais de automação
         - Perfil isolado por worker (cookies/sessão separados)
         - Headless opcional (mais rápido, menor risco de bloqueio visual)
+        - Perfil de bloqueio de recursos (imagens, fontes, tiles...)
+        - Log de performance (eventos Network.*) para EstatRede/PayloadMaps
         """
         opts = Options()
         # Perfil isolado por worker — cada Chrome parece um usuário diferente
-        profile_dir = Path(__file__).parent / f"chrome_profile_w{worker_id}"
+        profile_dir = (self.pasta_perfis or Path(__file__).parent) / f"chrome_profile_w{worker_id}"
         profile_dir.mkdir(exist_ok=True)
         opts.add_argument(f"--user-data-dir={profile_dir}")
 
@@ -321,23 +2340,198 @@ class MapsScraper:
         if headless:
             opts.add_argument("--headless=new")
 
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=opts
-        )
+        padroes = PERFIS_BLOQUEIO.get(bloqueio, [])
+        if padroes:
+            opts.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+            })
+        if log_rede:
+            opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            opts.add_experimental_option("perfLoggingPrefs", {
+                "enableNetwork": True, "enablePage": False,
+            })
+
+        from selenium.common.exceptions import SessionNotCreatedException
+
+        try:
+            driver = webdriver.Chrome(
+                service=Service(ResolvedorChromedriver.resolver(self.chromedriver_path)),
+                options=opts,
+            )
+        except SessionNotCreatedException as e:
+            # Só chromedriver de outra versão justifica resolver de novo; perfil
+            # travado, falta de memória etc. sobem como erro normal
+            if (ResolvedorChromedriver.caminho_fixo(self.chromedriver_path)
+                    or not ResolvedorChromedriver.versao_incompativel(e)):
+                raise
+            ResolvedorChromedriver.invalidar()
+            driver = webdriver.Chrome(
+                service=Service(ResolvedorChromedriver.resolver()), options=opts
+            )
+        ResolvedorChromedriver.registrar_versoes(driver)
+        # Os esperadores de prontidão usam execute_async_script
+        driver.set_script_timeout(30)
+
+        if padroes or log_rede:
+            driver.execute_cdp_cmd("Network.enable", {})
+        if padroes:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+
+        # Remove propriedades de automação via JS
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": """
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+            Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
+            Object.defineProperty(navigator, 'languages', {get: () => ['pt-BR','pt','en-US','en']});
+            window.chrome = {runtime: {}};
+        """})
+
+        return driver
+
+    def _drenar_rede(self):
+        """
+        Esvazia o log de performance do Chrome → [(method, params)].
+        Precisa rodar a cada página para o buffer do chromedriver não crescer.
+        """
+        if not self.log_rede or self.driver is None:
+            return []
+        eventos = []
+        try:
+            for entrada in self.driver.get_log("performance"):
+                msg = json.loads(entrada["message"]).get("message", {})
+                eventos.append((msg.get("method", ""), msg.get("params", {})))
+        except Exception:
+            pass
+        return eventos
+
+    def _processar_rede(self):
+        """
+        Drena o log de rede: alimenta a EstatRede e, com captura ligada, pega
+        o corpo das respostas de busca/ficha (Network.getResponseBody) e guarda
+        os lugares lidos em self.capturados. Retorna quantos lugares novos.
+        """
+        eventos = self._drenar_rede()
+        self.estat_rede.processar_eventos(eventos)
+        if not self.captura:
+            return 0
+        prontos = []
+        for metodo, params in eventos:
+            if metodo == "Network.responseReceived":
+                url = (params.get("response") or {}).get("url", "")
+                if PayloadMaps.interessa(url):
+                    self._respostas[params.get("requestId")] = url
+            elif metodo == "Network.loadingFinished":
+                # Corpo só existe depois do loadingFinished (pode vir no próximo dreno)
+                url = self._respostas.pop(params.get("requestId"), None)
+                if url:
+                    prontos.append((params["requestId"], url))
+        antes = len(self.capturados)
+        for req_id, url in prontos:
+            try:
+                corpo = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": req_id})
+            except Exception:
+                continue                    # já saiu do buffer do Chrome
+            self.capturados.update(PayloadMaps.interpretar(url, corpo.get("body", "")))
+        if len(self.capturados) > 5000:
+            self.capturados.clear()
+        if len(self._respostas) > 500:
+            self._respostas.clear()
+        return len(self.capturados) - antes
+
+    def _aba_unica(self):
+        """Fecha abas extras — o worker navega sempre numa única aba reaproveitada."""
+        try:
+            abas = self.driver.window_handles
+            for aba in abas[1:]:
+                self.driver.switch_to.window(aba)
+                self.driver.close()
+            self.driver.switch_to.window(abas[0])
+        except Exception:
+            pass
+
+    def _pausa_humana(self, minimo=0.8, maximo=2.2):
+        """
+        Delay aleatório que imita comportamento humano.
+        É só ritmo anti-bot — escalado por self.ritmo (0 desliga). A espera
+        pelo carregamento da página fica com _aguardar_dom.
+        """
+        if self.ritmo > 0:
+            with self.metricas.medir("pausa", worker=self.worker):
+                time.sleep(random.uniform(minimo, maximo) * self.ritmo)
+
+    # ── Prontidão da página — resolve assim que o dado aparece no DOM ────────
+    JS_AGUARDAR = """
+        var exigido = arguments[0], algum = arguments[1];
+        var timeout = arguments[2], folga = arguments[3];
+        var done = arguments[arguments.length - 1];
+        var inicio = Date.now(), visto = 0, fim = false, obs = null, timer = null;
+        function presente(s) {
+            var el = document.querySelector(s);
+            if (!el) return false;
+            return !!(el.textContent || el.getAttribute("aria-label") || el.href || "").trim();
+        }
+        function terminar(v) {
+            if (fim) return;
+            fim = true;
+            if (obs) obs.disconnect();
+            clearInterval(timer);
+            done(v);
+        }
+        function checar() {
+            if (fim) return;
+            var agora = Date.now();
+            if (presente(exigido)) {
+                if (!visto) visto = agora;
+                // Secundários (endereço/telefone/nota) ganham uma folga curta
+                if (!algum.length || algum.some(presente) || agora - visto >= folga)
+                    return terminar(true);
+            }
+            if (agora - inicio >= timeout) terminar(false);
+        }
+        obs = new MutationObserver(checar);
+        obs.observe(document.documentElement || document, {
+            childList: true, subtree: true,
+            attributes: true, attributeFilter: ["aria-label", "href"]
+        });
+        // Garante timeout/folga mesmo se o DOM parar de mudar
+        timer = setInterval(checar, 100);
+        checar();
+    """
 
-        # Remove propriedades de automação via JS
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": """
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['pt-BR','pt','en-US','en']});
-            window.chrome = {runtime: {}};
-        """})
+    JS_AGUARDAR_MAIS = """
+        var timeout = arguments[0];
+        var done = arguments[arguments.length - 1];
+        var sel = 'a[href*="/maps/place/"]';
+        var antes = document.querySelectorAll(sel).length, inicio = Date.now();
+        var timer = setInterval(function() {
+            var n = document.querySelectorAll(sel).length;
+            if (n > antes || Date.now() - inicio >= timeout) {
+                clearInterval(timer);
+                done(n);
+            }
+        }, 100);
+    """
 
-        return driver
+    def _aguardar_dom(self, exigido, algum_de=(), timeout=10, folga=1.5):
+        """
+        Espera event-driven (MutationObserver) até `exigido` ter conteúdo e,
+        se informado, algum seletor de `algum_de` aparecer (ou esgotar a folga).
+        Retorna False no timeout.
+        """
+        try:
+            return bool(self.driver.execute_async_script(
+                self.JS_AGUARDAR, exigido, list(algum_de),
+                int(timeout * 1000), int(folga * 1000)
+            ))
+        except Exception:
+            return False
 
-    def _pausa_humana(self, minimo=0.8, maximo=2.2):
-        """Delay aleatório que imita comportamento humano."""
-        time.sleep(random.uniform(minimo, maximo))
+    def _aguardar_mais_links(self, timeout=3):
+        """Logo após um scroll, espera a lista de resultados crescer."""
+        try:
+            return int(self.driver.execute_async_script(
+                self.JS_AGUARDAR_MAIS, int(timeout * 1000)) or 0)
+        except Exception:
+            return 0
 
     # ════════════════════════════════════════════════════════════════════════
     #  COLETA DE LINKS — via JavaScript puro, não depende de seletores CSS
@@ -345,28 +2539,91 @@ class MapsScraper:
     def _coletar_links(self):
         """
         Usa JavaScript para pegar TODOS os hrefs que contêm /maps/place/
-        diretamente do DOM. Não depende de classes CSS que mudam.
-        Retorna set de URLs limpas.
+        diretamente do DOM, junto com o card da lista onde cada um aparece.
+        Não depende de classes CSS que mudam.
+        Retorna dict {url limpa: card} (ver _interpretar_card).
         """
         try:
-            hrefs = self.driver.execute_script("""
+            brutos = self.driver.execute_script("""
                 var links = document.querySelectorAll('a[href*="/maps/place/"]');
-                var result = [];
+                var result = {};
                 links.forEach(function(a) {
                     var h = a.href || "";
                     // Filtra só links de estabelecimento (não fotos, não reviews)
                     if (h.includes("/maps/place/") && !h.includes("/photos/") && !h.includes("/reviews/")) {
                         // Limpa parâmetros de rastreamento mas mantém o link base
                         var clean = h.split("?")[0];
-                        result.push(clean);
+                        if (result[clean]) return;   // Remove duplicatas
+                        // Card do resultado: article da lista ou o bloco pai do link
+                        var card = a.closest('[role="article"]') || a.parentElement || a;
+                        var img = card.querySelector('[role="img"][aria-label]');
+                        result[clean] = {
+                            nome:   a.getAttribute("aria-label") || "",
+                            rotulo: img ? img.getAttribute("aria-label") : "",
+                            texto:  (card.innerText || "").slice(0, 600),
+                        };
                     }
                 });
-                // Remove duplicatas
-                return [...new Set(result)];
+                return result;
             """)
-            return set(hrefs or [])
+            return {url: self._interpretar_card(url, b) for url, b in (brutos or {}).items()}
         except Exception:
-            return set()
+            return {}
+
+    @staticmethod
+    def _interpretar_card(url, bruto):
+        """
+        Card da lista de resultados → {url, nome, stars, reviews, categoria}.
+        0 em stars/reviews significa "não aparece no card" (mesma regra da ficha).
+        """
+        rotulo = bruto.get("rotulo") or ""
+        texto  = bruto.get("texto") or ""
+        nome   = (bruto.get("nome") or "").strip()
+
+        stars = 0.0
+        m = re.search(r'\b([1-5][,.]\d)\b', rotulo) or re.search(r'\b([1-5][,.]\d)\s*\(', texto)
+        if m:
+            stars = float(m.group(1).replace(",", "."))
+
+        reviews = 0
+        m = (re.search(r'([\d.,]+)\s*(?:avalia|review|opini)', rotulo, re.I)
+             or re.search(r'\b[1-5][,.]\d\s*\(([\d.,]+)\)', texto))
+        if m:
+            digitos = re.sub(r"\D", "", m.group(1))
+            reviews = int(digitos) if digitos else 0
+
+        # Categoria: primeiro trecho de uma linha "Categoria · Endereço"
+        categoria = ""
+        for linha in texto.split("\n"):
+            linha = linha.strip()
+            if "·" not in linha or linha == nome:
+                continue
+            cand = linha.split("·")[0].strip()
+            if cand and len(cand) < 60 and not re.match(r'^[\d(]', cand):
+                categoria = cand
+                break
+
+        return dict(url=url, nome=nome, stars=stars, reviews=reviews, categoria=categoria)
+
+    @staticmethod
+    def _score_card(card, no_historico=False):
+        """
+        Prioridade de visita de um card: nota alta e muitas avaliações primeiro.
+        Sem nota no card vale um prior neutro (3,5). Quem já está no histórico
+        vai para o fim da fila (a ficha seria descartada de qualquer jeito).
+        """
+        nota  = card.get("stars") or 3.5
+        score = nota + math.log10(1 + (card.get("reviews") or 0))
+        return score - 100 if no_historico else score
+
+    @staticmethod
+    def _card_reprovado(card, min_stars, min_reviews):
+        """Aplica no card os mesmos filtros numéricos da ficha."""
+        if 0 < card["stars"] < min_stars:
+            return True
+        if 0 < card["reviews"] < min_reviews:
+            return True
+        return False
 
     def _scroll_lista(self):
         """
@@ -415,122 +2672,163 @@ class MapsScraper:
 
     def _aguardar_resultados(self, timeout=12):
         """Aguarda aparecer pelo menos 1 link de estabelecimento na página."""
-        inicio = time.time()
-        while time.time() - inicio < timeout:
-            if self._coletar_links():
-                return True
-            time.sleep(0.8)
-        return False
+        return self._aguardar_dom('a[href*="/maps/place/"]', timeout=timeout)
 
     # ════════════════════════════════════════════════════════════════════════
     #  EXTRAÇÃO DE DADOS DA FICHA
     #  Estratégia: texto da página + regex (robusto a mudanças de HTML)
+    #  Um único execute_script coleta tudo; a interpretação fica em Python.
     # ════════════════════════════════════════════════════════════════════════
-    def _extrair_ficha(self):
-        d = self.driver
+    SEL_NOME      = ["h1", "h1.DUwDvf", "h1.fontHeadlineLarge"]
+    # O Maps exibe a categoria logo abaixo do nome, em botão ou span pequeno
+    SEL_CATEGORIA = ["button.DkEaL", "button[jsaction*='category']",
+                     "span.mgr77e", ".fontBodyMedium button"]
+    SEL_ESTRELAS  = ['[aria-label*="estrela"]', '[aria-label*="star"]',
+                     '[aria-label*="rating"]', '[aria-label*="nota"]']
+    SEL_AVALIACAO = ['[aria-label*="avalia"]', '[aria-label*="review"]',
+                     '[aria-label*="opini"]']
+
+    JS_FICHA = """
+        var sel = arguments[0];
+        function txt(el) { return (el.innerText || "").trim(); }
+        function textos(lista) {
+            return lista.map(function(s) {
+                return Array.from(document.querySelectorAll(s)).map(txt);
+            });
+        }
+        function rotulos(lista) {
+            return lista.map(function(s) {
+                return Array.from(document.querySelectorAll(s)).map(function(el) {
+                    return el.getAttribute("aria-label") || "";
+                });
+            });
+        }
+        function item(s) {
+            var el = document.querySelector(s);
+            return el ? (el.getAttribute("aria-label") || el.innerText || "") : "";
+        }
+        var auth = document.querySelector('[data-item-id="authority"]');
+        return {
+            texto:     document.body ? document.body.innerText : "",
+            nomes:     textos(sel.nome),
+            categorias: textos(sel.categoria),
+            estrelas:  rotulos(sel.estrelas),
+            avaliacoes: rotulos(sel.avaliacao),
+            endereco:  item('[data-item-id="address"]'),
+            telefone:  item('[data-item-id^="phone"]'),
+            site:      auth ? (auth.getAttribute("href") || "") : "",
+            links:     Array.from(document.querySelectorAll("a[href^='http']"))
+                            .map(function(a) { return a.getAttribute("href") || ""; }),
+        };
+    """
+
+    # Nós que indicam ficha carregada além do nome
+    SEL_PRONTIDAO = ['[data-item-id="address"]', '[data-item-id^="phone"]',
+                     '[data-item-id="authority"]'] + SEL_ESTRELAS[:2]
 
-        # Aguarda o nome aparecer (H1)
+    def _ficha_http(self, link, worker_id=0):
+        """
+        Backend "http": baixa a página do lugar com a sessão compartilhada e
+        lê os dados embutidos (PayloadMaps.pagina). None se não deu para ler.
+        """
         try:
-            WebDriverWait(d, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "h1"))
-            )
+            with self.metricas.medir("ficha_http", worker=self.worker):
+                r = sessao_http().get(link, timeout=15, cookies={"CONSENT": "YES+"}, headers={
+                    "User-Agent": self.USER_AGENTS[worker_id % len(self.USER_AGENTS)],
+                    "Accept-Language": "pt-BR,pt;q=0.9",
+                })
+            if r.status_code != 200:
+                return None
         except Exception:
-            pass
-        time.sleep(1.5)
+            return None
+        if "charset" not in r.headers.get("Content-Type", "").lower():
+            r.encoding = "utf-8"        # sem charset o requests assume latin-1 e estraga os acentos
+        dados = PayloadMaps.pagina(r.text)
+        return dados if PayloadMaps.completo(dados) else None
+
+    def _ficha_da_rede(self, link):
+        """
+        Ficha lida do /maps/preview/place capturado para este link, se houver.
+        Espera o mesmo sinal de prontidão do DOM — o preview chega antes dele.
+        """
+        if not self.captura:
+            return None
+        self._aguardar_dom("h1", self.SEL_PRONTIDAO, timeout=10, folga=0.5)
+        self._processar_rede()
+        dados = self.capturados.get(PayloadMaps.feature_id(link))
+        return dados if PayloadMaps.completo(dados) else None
+
+    def _extrair_ficha(self):
+        d = self.driver
+
+        # Aguarda o nome (H1) e algum dado da ficha — sem sleep fixo
+        self._aguardar_dom("h1", self.SEL_PRONTIDAO, timeout=10, folga=1.5)
 
-        # ── Pega o texto completo da ficha ───────────────────────────────────
         try:
-            page_text = d.find_element(By.TAG_NAME, "body").text
+            bruto = d.execute_script(self.JS_FICHA, {
+                "nome": self.SEL_NOME, "categoria": self.SEL_CATEGORIA,
+                "estrelas": self.SEL_ESTRELAS, "avaliacao": self.SEL_AVALIACAO,
+            }) or {}
         except Exception:
-            page_text = ""
+            bruto = {}
+        return self._interpretar_ficha(bruto)
+
+    @staticmethod
+    def _interpretar_ficha(bruto):
+        """
+        Converte o objeto cru devolvido por JS_FICHA no dict da ficha.
+        Aplica as mesmas regras e fallbacks de regex de antes, só que
+        sobre dados já trazidos do navegador (sem round trips extras).
+        """
+        page_text = bruto.get("texto") or ""
 
         # ── Nome (H1 — o mais confiável) ─────────────────────────────────────
         nome = ""
-        try:
-            for sel in ["h1", "h1.DUwDvf", "h1.fontHeadlineLarge"]:
-                els = d.find_elements(By.CSS_SELECTOR, sel)
-                for el in els:
-                    t = el.text.strip()
-                    if t and len(t) > 1:
-                        nome = t
-                        break
-                if nome:
-                    break
-        except Exception:
-            pass
+        for grupo in bruto.get("nomes") or []:
+            nome = next((t for t in grupo if t and len(t) > 1), "")
+            if nome:
+                break
 
         # ── Categoria ────────────────────────────────────────────────────────
-        # O Maps exibe a categoria logo abaixo do nome, em botão ou span pequeno
         categoria = ""
-        try:
-            for sel in ["button.DkEaL", "button[jsaction*='category']",
-                        "span.mgr77e", ".fontBodyMedium button"]:
-                els = d.find_elements(By.CSS_SELECTOR, sel)
-                for el in els:
-                    t = el.text.strip()
-                    if t and len(t) < 80:
-                        categoria = t
-                        break
-                if categoria:
-                    break
-        except Exception:
-            pass
+        for grupo in bruto.get("categorias") or []:
+            categoria = next((t for t in grupo if t and len(t) < 80), "")
+            if categoria:
+                break
 
         # ── Estrelas — aria-label é o mais confiável ─────────────────────────
         stars = 0.0
-        try:
-            # Busca qualquer span/div com aria-label contendo "estrela" ou "star"
-            for sel in [
-                '[aria-label*="estrela"]',
-                '[aria-label*="star"]',
-                '[aria-label*="rating"]',
-                '[aria-label*="nota"]',
-            ]:
-                els = d.find_elements(By.CSS_SELECTOR, sel)
-                for el in els:
-                    lbl = el.get_attribute("aria-label") or ""
-                    m = re.search(r'(\d[,.]\d|[1-5])', lbl)
-                    if m:
-                        v = float(m.group(1).replace(",", "."))
-                        if 1.0 <= v <= 5.0:
-                            stars = v
-                            break
-                if stars:
-                    break
-        except Exception:
-            pass
+        for grupo in bruto.get("estrelas") or []:
+            for lbl in grupo:
+                m = re.search(r'(\d[,.]\d|[1-5])', lbl or "")
+                if m:
+                    v = float(m.group(1).replace(",", "."))
+                    if 1.0 <= v <= 5.0:
+                        stars = v
+                        break
+            if stars:
+                break
 
         # Fallback: regex no texto da página — procura padrão "4,5 (1.234)"
         if not stars:
             m = re.search(r'\b([1-5][,.]\d)\s*\(', page_text)
             if m:
-                try:
-                    stars = float(m.group(1).replace(",", "."))
-                except Exception:
-                    pass
+                stars = float(m.group(1).replace(",", "."))
 
         # ── Avaliações ───────────────────────────────────────────────────────
         reviews = 0
-        try:
-            for sel in [
-                '[aria-label*="avalia"]',
-                '[aria-label*="review"]',
-                '[aria-label*="opini"]',
-            ]:
-                els = d.find_elements(By.CSS_SELECTOR, sel)
-                for el in els:
-                    lbl = el.get_attribute("aria-label") or ""
-                    # "1.234 avaliações" ou "1,234 reviews"
-                    m = re.search(r'([\d.,]+)\s*(?:avalia|review|opini)', lbl, re.I)
-                    if m:
-                        v = int(re.sub(r"\D", "", m.group(1)))
-                        if v > 0:
-                            reviews = v
-                            break
-                if reviews:
-                    break
-        except Exception:
-            pass
+        for grupo in bruto.get("avaliacoes") or []:
+            for lbl in grupo:
+                # "1.234 avaliações" ou "1,234 reviews"
+                m = re.search(r'([\d.,]+)\s*(?:avalia|review|opini)', lbl or "", re.I)
+                if m:
+                    digitos = re.sub(r"\D", "", m.group(1))
+                    v = int(digitos) if digitos else 0
+                    if v > 0:
+                        reviews = v
+                        break
+            if reviews:
+                break
 
         # Fallback: regex no texto — "(1.234 avaliações)" ou "(1,234)"
         if not reviews:
@@ -539,20 +2837,13 @@ class MapsScraper:
             if not m:
                 m = re.search(r'([\d.]+)\s+avalia', page_text, re.I)
             if m:
-                try:
-                    reviews = int(re.sub(r"\D", "", m.group(1)))
-                except Exception:
-                    pass
+                digitos = re.sub(r"\D", "", m.group(1))
+                reviews = int(digitos) if digitos else 0
 
         # ── Endereço ─────────────────────────────────────────────────────────
-        endereco = ""
-        try:
-            # data-item-id="address" é o mais confiável historicamente
-            el = d.find_element(By.CSS_SELECTOR, '[data-item-id="address"]')
-            endereco = (el.get_attribute("aria-label") or el.text).strip()
-            endereco = re.sub(r"(?i)^endere[çc]o[:\s]*", "", endereco).strip()
-        except Exception:
-            pass
+        # data-item-id="address" é o mais confiável historicamente
+        endereco = (bruto.get("endereco") or "").strip()
+        endereco = re.sub(r"(?i)^endere[çc]o[:\s]*", "", endereco).strip()
         if not endereco:
             # Fallback: regex no texto da página — procura padrão de endereço BR
             m = re.search(
@@ -563,13 +2854,8 @@ class MapsScraper:
                 endereco = m.group(0).strip()
 
         # ── Telefone ─────────────────────────────────────────────────────────
-        telefone = ""
-        try:
-            el = d.find_element(By.CSS_SELECTOR, '[data-item-id^="phone"]')
-            telefone = (el.get_attribute("aria-label") or el.text).strip()
-            telefone = re.sub(r"(?i)^telefone[:\s]*", "", telefone).strip()
-        except Exception:
-            pass
+        telefone = (bruto.get("telefone") or "").strip()
+        telefone = re.sub(r"(?i)^telefone[:\s]*", "", telefone).strip()
         if not telefone:
             # Regex universal de telefone (BR e internacional)
             m = re.search(r'(?:\+\d{1,3}[\s\-]?)?\(?\d{2,3}\)?[\s\-]?\d{4,5}[\s\-]\d{4}', page_text)
@@ -577,23 +2863,13 @@ class MapsScraper:
                 telefone = m.group(0).strip()
 
         # ── Site ─────────────────────────────────────────────────────────────
-        site = ""
-        try:
-            el = d.find_element(By.CSS_SELECTOR, '[data-item-id="authority"]')
-            site = el.get_attribute("href") or ""
-        except Exception:
-            pass
+        site = bruto.get("site") or ""
         if not site:
-            try:
-                # Qualquer link externo na ficha que não seja do google
-                els = d.find_elements(By.CSS_SELECTOR, "a[href^='http']")
-                for el in els:
-                    href = el.get_attribute("href") or ""
-                    if href.startswith("http") and "google" not in href and "maps" not in href:
-                        site = href
-                        break
-            except Exception:
-                pass
+            # Qualquer link externo na ficha que não seja do google
+            for href in bruto.get("links") or []:
+                if href.startswith("http") and "google" not in href and "maps" not in href:
+                    site = href
+                    break
 
         return dict(
             nome=nome, categoria=categoria, endereco=endereco,
@@ -601,205 +2877,437 @@ class MapsScraper:
         )
 
     # ════════════════════════════════════════════════════════════════════════
-    #  SCROLL WORKER — W0 de cada keyword: só faz scroll e alimenta a fila
+    #  SCROLL WORKER — um por keyword ativa: só faz scroll e alimenta a fila
     # ════════════════════════════════════════════════════════════════════════
-    def _scroll_worker(self, worker_id, keyword, regiao, coords,
-                       link_queue, scroll_done, results_lock,
-                       global_vistos, headless):
+    def _scroll_worker(self, worker_id, tarefa, agendador, regiao, coords,
+                       results_lock, global_vistos, headless, produtor=0,
+                       min_stars=0, min_reviews=0):
         """
-        Abre o Maps, faz scroll infinito e coloca links novos na fila.
-        Sinaliza scroll_done quando a lista acabar ou stop_flag.
+        Abre o Maps, faz scroll infinito e coloca links novos na fila da keyword.
+        Uma keyword pode ter vários produtores (produtor = 0..N-1):
+        no modo tiles todos puxam da mesma fila de tiles, subdividindo os
+        saturados; sem bbox cada um fica com uma fatia da escada de zoom.
+        Cada produtor dá um set() na contagem tarefa.scroll_done ao terminar,
+        seja por fim da lista, keyword encerrada (tarefa.parar) ou stop_flag.
         """
-        w = MapsScraper(log_cb=self.log, progress_cb=None)
+        keyword = tarefa.keyword
+        parar   = lambda: self.stop_flag or tarefa.parar.is_set()
+        w = MapsScraper(log_cb=self.log, progress_cb=None, ritmo=self.ritmo,
+                        medir_rede=self.medir_rede, captura=self.captura,
+                        metricas=self.metricas)
+        w.worker = f"W{worker_id}"
+
+        def varrer(url, rotulo):
+            # Varredura já feita (retomada)? Reaproveita a contagem do diário
+            if rotulo in tarefa.varreduras:
+                return tarefa.varreduras[rotulo]
+            # Chrome só é pego na primeira varredura de verdade
+            if w.driver is None:
+                w.driver = self.pool.checkout(self._init_driver, headless=headless,
+                                              bloqueio=self._perfil_bloqueio("scroll"),
+                                              log_rede=self.log_rede)
+                w._drenar_rede()
+                if w.driver.pool_usos == 1:
+                    w._pausa_humana(1.0 + worker_id * 0.3, 2.0)
+            n = self._varrer_busca(w, worker_id, url, rotulo, tarefa, agendador,
+                                   results_lock, global_vistos, parar,
+                                   min_stars, min_reviews)
+            if not parar():
+                tarefa.varreduras[rotulo] = n
+                self.diario.varrido(self.execucao, keyword, rotulo, n)
+            return n
+
         try:
             self.log(f"[W{worker_id}] 🖱 scroll worker iniciando...", "sub")
-            w.driver = w._init_driver(worker_id=worker_id, headless=headless)
-            w._pausa_humana(1.0 + worker_id * 0.3, 2.0)
-
-            zooms = [14, 12, 10, 8] if ("," in regiao or len(regiao.split()) >= 3) else [10, 8, 6]
-
-            for zoom in zooms:
-                if self.stop_flag:
-                    break
-
-                url = w._url_busca(keyword, regiao, coords, zoom=zoom)
-                zoom_label = {14:"cidade",12:"região",10:"estado",8:"país",6:"continental"}.get(zoom, str(zoom))
-                self.log(f"[W{worker_id}] 🗺 {keyword!r} zoom:{zoom_label}", "info")
-
-                w.driver.get(url)
-                w._pausa_humana(2.5, 4.0)
-
-                if not w._aguardar_resultados(timeout=12):
-                    self.log(f"[W{worker_id}] ⚠ sem resultados (zoom {zoom_label})", "warn")
-                    continue
 
-                vistos_local = set()
-                sem_novos = 0
-
-                while not self.stop_flag and sem_novos < 10:
-                    novos = w._coletar_links() - vistos_local
-                    with results_lock:
-                        novos -= global_vistos
-
-                    if novos:
-                        sem_novos = 0
-                        vistos_local.update(novos)
-                        for link in novos:
-                            link_queue.put(link)
-                        self.log(f"[W{worker_id}] 📥 +{len(novos)} links na fila (total fila: {link_queue.qsize()})", "sub")
-                    else:
-                        sem_novos += 1
-
-                    if w._fim_de_lista():
-                        self.log(f"[W{worker_id}] 📌 fim da lista (zoom {zoom_label})", "sub")
+            if tarefa.tiles is not None:
+                while True:
+                    tile = tarefa.proximo_tile(parar)
+                    if tile is None:
                         break
-
-                    w._scroll_lista()
-                    w._pausa_humana(1.5, 2.5)
+                    filhos = []
+                    try:
+                        lat, lon, zoom, _ = tile
+                        rotulo = f"tile {lat:.4f},{lon:.4f} z{zoom}"
+                        n = varrer(w._url_busca(keyword, regiao, (lat, lon), zoom=zoom), rotulo)
+                        if n >= self.SATURACAO_TILE:
+                            filhos = self._subdividir(tile)
+                            if filhos:
+                                self.log(f"[W{worker_id}] 🧩 {rotulo} saturado ({n}) → +{len(filhos)} tiles", "sub")
+                    finally:
+                        tarefa.tile_concluido(filhos)
+            else:
+                zooms = [14, 12, 10, 8] if ("," in regiao or len(regiao.split()) >= 3) else [10, 8, 6]
+                # Cada produtor fica com uma fatia dos zooms
+                for zoom in zooms[produtor::tarefa.produtores]:
+                    if parar():
+                        break
+                    zoom_label = {14:"cidade",12:"região",10:"estado",8:"país",6:"continental"}.get(zoom, str(zoom))
+                    varrer(w._url_busca(keyword, regiao, coords, zoom=zoom), f"zoom:{zoom_label}")
 
         except Exception as e:
             self.log(f"[W{worker_id}] ❌ scroll worker erro: {e}", "erro")
         finally:
-            try: w.driver.quit()
-            except Exception: pass
-            scroll_done.set()
-            self.log(f"[W{worker_id}] scroll encerrado", "sub")
+            if w.driver is not None:
+                self._fechar_estat_rede(worker_id, w)
+                self.pool.checkin(w.driver)
+            tarefa.scroll_done.set()
+            if agendador is not None:
+                agendador.avisar()
+            self.log(f"[W{worker_id}] scroll encerrado ({keyword!r})", "sub")
+
+    def _varrer_busca(self, w, worker_id, url, rotulo, tarefa, agendador,
+                      results_lock, global_vistos, parar, min_stars=0, min_reviews=0):
+        """
+        Abre uma busca e rola a lista até o fim, enfileirando links novos.
+        Cards que já mostram nota/avaliações abaixo dos filtros nem entram
+        na fila (conta em self.fichas_evitadas).
+        Retorna quantos links a busca mostrou (para detectar saturação).
+        """
+        self.log(f"[W{worker_id}] 🗺 {tarefa.keyword!r} {rotulo}", "info")
+
+        with self.metricas.medir("carregar_busca", worker=w.worker):
+            t0 = time.time()
+            w.driver.get(url)
+            w.estat_rede.registrar_pagina(time.time() - t0)
+        w._pausa_humana(2.5, 4.0)
+
+        if not w._aguardar_resultados(timeout=12):
+            self.log(f"[W{worker_id}] ⚠ sem resultados ({rotulo})", "warn")
+            return 0
+
+        vistos_local = set()
+        sem_novos = 0
+
+        while not parar() and sem_novos < 10:
+            w._processar_rede()
+            cards = w._coletar_links()
+            self._anexar_capturados(w, cards)
+            novos = set(cards) - vistos_local
+            # A lista cresceu? (conta até links já vistos em outra keyword)
+            sem_novos = 0 if novos else sem_novos + 1
+            vistos_local.update(novos)
+            reprovados = {u for u in novos if self._card_reprovado(cards[u], min_stars, min_reviews)}
+            novos -= reprovados
+            with self.metricas.travar(results_lock, recurso="resultados", worker=w.worker):
+                novos -= global_vistos
+                self.fichas_evitadas += len(reprovados)
+            tarefa.cards.update((u, cards[u]) for u in novos)
+            scores = {u: self._score_card(cards[u], self.db.ja_existe(u)) for u in novos}
+            novos = tarefa.enfileirar(novos, score=scores.get)
+            self.diario.enfileirados(self.execucao, tarefa.keyword,
+                                     [(u, scores[u], cards[u]) for u in novos])
+            if novos:
+                self.metricas.inc("links_enfileirados_total", len(novos), keyword=tarefa.keyword)
+            if reprovados:
+                self.metricas.inc("fichas_evitadas_total", len(reprovados), keyword=tarefa.keyword)
+                self.log(f"[W{worker_id}] ⏩ {len(reprovados)} descartado(s) pelo card (nota/avaliações)", "sub")
+
+            if novos and agendador is not None:
+                agendador.avisar()
+                self.metricas.definir("fila_links", tarefa.link_queue.qsize(), keyword=tarefa.keyword)
+                self.log(f"[W{worker_id}] 📥 +{len(novos)} links na fila (total fila: {tarefa.link_queue.qsize()})", "sub")
+
+            if w._fim_de_lista():
+                self.log(f"[W{worker_id}] 📌 fim da lista ({rotulo})", "sub")
+                break
+
+            w._scroll_lista()
+            w._aguardar_mais_links(timeout=3)
+            w._pausa_humana(1.5, 2.5)
+
+        return len(vistos_local)
+
+    @staticmethod
+    def _anexar_capturados(w, cards):
+        """
+        Casa os lugares lidos da rede com os cards pelo feature id da URL.
+        O card ganha a ficha completa ("ficha") e nota/avaliações exatas,
+        que valem para o pré-filtro e o score.
+        """
+        if not w.capturados:
+            return
+        for url, card in cards.items():
+            dados = w.capturados.get(PayloadMaps.feature_id(url))
+            if dados:
+                card["ficha"]   = dados
+                card["stars"]   = dados["stars"]
+                card["reviews"] = dados["reviews"]
 
     # ════════════════════════════════════════════════════════════════════════
-    #  FICHA WORKER — consome links da fila e extrai dados das fichas
+    #  FICHA WORKER — consome links das keywords ativas e extrai as fichas
     # ════════════════════════════════════════════════════════════════════════
-    def _ficha_worker(self, worker_id, regiao, min_stars, min_reviews,
-                      meta_por_kw, keyword, link_queue, scroll_done,
+    def _ficha_worker(self, worker_id, agendador, regiao, min_stars, min_reviews,
                       results_lock, global_vistos, global_aprovados_counter,
-                      meta_total, aprovados_kw_counter, headless):
+                      meta_total, headless, enriquecedor=None):
         """
-        Consome links da fila, abre cada ficha, filtra e aprova.
-        Para quando meta atingida ou fila vazia + scroll encerrado.
+        Pede links ao agendador (qualquer keyword ativa), abre cada ficha,
+        filtra e aprova. Para quando todas as keywords terminarem ou stop_flag.
         """
-        w = MapsScraper(log_cb=self.log, progress_cb=None)
-        resultados_locais = []
+        w = MapsScraper(log_cb=self.log, progress_cb=None, ritmo=self.ritmo,
+                        medir_rede=self.medir_rede, captura=self.captura,
+                        metricas=self.metricas)
+        w.worker = f"W{worker_id}"
+        aprovados = 0
 
         try:
-            self.log(f"[W{worker_id}] 📋 ficha worker iniciando...", "sub")
-            w.driver = w._init_driver(worker_id=worker_id, headless=headless)
-            w._pausa_humana(1.5 + worker_id * 0.4, 2.5)
+            self.log(f"[W{worker_id}] 📋 ficha worker iniciando ({self.backend_ficha})...", "sub")
+            w.headless = headless
+            # Backend "http" só pega um Chrome se alguma ficha não der para ler
+            if self.backend_ficha != "http":
+                self._abrir_chrome_ficha(w, worker_id)
 
             while not self.stop_flag:
-                # Checa se atingiu a meta
-                with results_lock:
-                    if aprovados_kw_counter[0] >= meta_por_kw:
-                        break
-
-                # Pega próximo link da fila
-                try:
-                    link = link_queue.get(timeout=3)
-                except Exception:
-                    # Fila vazia — verifica se scroll terminou
-                    if scroll_done.is_set() and link_queue.empty():
-                        break
+                with self.metricas.medir("aguardar_link", worker=w.worker):
+                    item = agendador.proximo(timeout=3)
+                if item is AgendadorKeywords.FIM:
+                    break
+                if item is None:
                     continue
-
-                # Deduplicação
-                with results_lock:
-                    if link in global_vistos or self.db.ja_existe(link):
-                        self.log(f"[W{worker_id}] 🔁 já visto", "sub")
-                        link_queue.task_done()
-                        continue
-
+                tarefa, link = item
+                self.metricas.definir("fila_links", tarefa.link_queue.qsize(), keyword=tarefa.keyword)
                 try:
-                    w.driver.get(link)
-                    w._pausa_humana(1.2, 2.2)
-                    dados = w._extrair_ficha()
-
-                    nome    = dados["nome"] or "(sem nome)"
-                    stars   = dados["stars"]
-                    reviews = dados["reviews"]
-                    end     = dados["endereco"]
-
-                    if not w._na_regiao(end, regiao):
-                        self.log(f"[W{worker_id}] 🚫 {nome} — fora da região", "warn")
-                        w.driver.back(); w._pausa_humana(0.6, 1.2)
-                        link_queue.task_done()
-                        continue
-                    if stars > 0 and stars < min_stars:
-                        self.log(f"[W{worker_id}] ⏭ {nome} | {stars:.1f}⭐", "sub")
-                        w.driver.back(); w._pausa_humana(0.6, 1.2)
-                        link_queue.task_done()
-                        continue
-                    if reviews > 0 and reviews < min_reviews:
-                        self.log(f"[W{worker_id}] ⏭ {nome} | {reviews}aval.", "sub")
-                        w.driver.back(); w._pausa_humana(0.6, 1.2)
-                        link_queue.task_done()
-                        continue
-
-                    # ── APROVADO ─────────────────────────────────────────────
-                    with results_lock:
-                        if aprovados_kw_counter[0] >= meta_por_kw:
-                            link_queue.task_done()
-                            break
-                        global_vistos.add(link)
-                        self.db.registrar(link, nome, keyword, regiao)
-                        aprovados_kw_counter[0] += 1
-                        global_aprovados_counter[0] += 1
-                        tot = global_aprovados_counter[0]
-                        kw_tot = aprovados_kw_counter[0]
-                        self.progress(
-                            min(tot / meta_total * 100, 99),
-                            f"{tot} aprovados  [W{worker_id}: {kw_tot}/{meta_por_kw}]"
-                        )
-
-                    email = self._email_do_site(dados["site"]) if dados["site"] else ""
-
-                    resultados_locais.append({
-                        "Nome":       nome,
-                        "E-mail":     email,
-                        "Telefone":   dados["telefone"],
-                        "WhatsApp":   self._whatsapp(dados["telefone"]),
-                        "Categoria":  dados["categoria"],
-                        "Endereço":   end,
-                        "Site":       dados["site"],
-                        "Estrelas":   stars,
-                        "Avaliações": reviews,
-                        "Keyword":    keyword,
-                        "URL Maps":   link,
-                    })
-
-                    st = f"{stars:.1f}⭐" if stars > 0 else "s/nota"
-                    rv = f"{reviews:,}aval.".replace(",", ".") if reviews > 0 else "s/aval."
-                    self.log(
-                        f"[W{worker_id}] ✅ [{kw_tot}/{meta_por_kw}] {nome} | {st} | {rv}"
-                        + (" | 📧" if email else ""), "ok"
+                    registro = self._processar_ficha(
+                        w, worker_id, tarefa, link, regiao, min_stars, min_reviews,
+                        results_lock, global_vistos, global_aprovados_counter,
+                        meta_total, enriquecedor,
                     )
-                    w.driver.back()
-                    w._pausa_humana(1.2, 2.5)
-
-                except Exception as e:
-                    self.log(f"[W{worker_id}] ⚠ {e}", "warn")
-                    try: w.driver.back(); w._pausa_humana(0.5, 1.0)
-                    except Exception: pass
-
-                link_queue.task_done()
+                    if registro:
+                        aprovados += 1
+                finally:
+                    self.diario.visitado(self.execucao, link)
+                    agendador.concluir(tarefa)
 
         except Exception as e:
             self.log(f"[W{worker_id}] ❌ ficha worker erro: {e}", "erro")
         finally:
-            try: w.driver.quit()
-            except Exception: pass
+            if w.driver is not None:
+                self._fechar_estat_rede(worker_id, w)
+                self.pool.checkin(w.driver)
+
+        return aprovados
+
+    def _abrir_chrome_ficha(self, w, worker_id):
+        w.driver = self.pool.checkout(self._init_driver, headless=w.headless,
+                                      bloqueio=self._perfil_bloqueio("ficha"),
+                                      log_rede=self.log_rede)
+        w._aba_unica()
+        w._drenar_rede()
+        if w.driver.pool_usos == 1:
+            w._pausa_humana(1.5 + worker_id * 0.4, 2.5)
+
+    def _fechar_estat_rede(self, worker_id, w):
+        """Loga a estatística de rede do worker e soma na do scrape."""
+        w._processar_rede()
+        if w.estat_rede.paginas:
+            self.log(f"[W{worker_id}] 📶 {w.estat_rede.resumo()}", "sub")
+            with self._estat_lock:
+                self.estat_rede.somar(w.estat_rede)
+
+    def _apos_ficha(self, w, minimo, maximo):
+        """
+        Saída da ficha. No modo "direta" não faz nada — o próximo driver.get
+        já troca de página na mesma aba. No modo "historico" volta para a
+        página anterior e pausa, como antes.
+        """
+        if self.navegacao == "historico":
+            w.driver.back()
+            w._pausa_humana(minimo, maximo)
+
+    def _processar_ficha(self, w, worker_id, tarefa, link, regiao, min_stars,
+                         min_reviews, results_lock, global_vistos,
+                         global_aprovados_counter, meta_total, enriquecedor):
+        """Abre uma ficha, aplica os filtros e devolve o registro aprovado (ou None)."""
+        keyword     = tarefa.keyword
+        meta_por_kw = tarefa.meta
+
+        metricas    = self.metricas
+        travar      = lambda: metricas.travar(results_lock, recurso="resultados", worker=w.worker)
+
+        # Deduplicação
+        with travar():
+            if link in global_vistos or self.db.ja_existe(link):
+                metricas.inc("rejeicoes_total", motivo="ja_visto", keyword=keyword)
+                self.log(f"[W{worker_id}] 🔁 já visto", "sub")
+                return None
+
+        try:
+            # Ficha já colhida da rede pelo scroll worker? Nem abre a página.
+            dados = (tarefa.cards.get(link) or {}).get("ficha")
+            if PayloadMaps.completo(dados):
+                navegou, origem = False, "payload"
+                self.log(f"[W{worker_id}] ⚡ ficha via payload da busca", "sub")
+            elif self.backend_ficha == "http" and (dados := w._ficha_http(link, worker_id)):
+                navegou, origem = False, "http"
+                with travar():
+                    self.fichas_http += 1
+                w._pausa_humana(0.4, 1.0)
+            else:
+                if self.backend_ficha == "http":
+                    with travar():
+                        self.fallbacks_chrome += 1
+                    self.log(f"[W{worker_id}] 🧭 página sem dados legíveis — abrindo no Chrome", "sub")
+                    if w.driver is None:
+                        self._abrir_chrome_ficha(w, worker_id)
+                navegou, origem = True, "chrome"
+                with metricas.medir("carregar_ficha", worker=w.worker):
+                    t0 = time.time()
+                    w.driver.get(link)
+                    w.estat_rede.registrar_pagina(time.time() - t0)
+                w._pausa_humana(1.2, 2.2)
+                with metricas.medir("extrair", worker=w.worker):
+                    dados = w._ficha_da_rede(link) or w._extrair_ficha()
+            metricas.inc("fichas_total", worker=w.worker, origem=origem)
+
+            def sair(minimo, maximo):
+                if navegou:
+                    self._apos_ficha(w, minimo, maximo)
+
+            nome    = dados["nome"] or "(sem nome)"
+            stars   = dados["stars"]
+            reviews = dados["reviews"]
+            end     = dados["endereco"]
+
+            if not w._na_regiao(end, regiao):
+                metricas.inc("rejeicoes_total", motivo="regiao", keyword=keyword)
+                self.log(f"[W{worker_id}] 🚫 {nome} — fora da região", "warn")
+                sair(0.6, 1.2)
+                return None
+            if stars > 0 and stars < min_stars:
+                metricas.inc("rejeicoes_total", motivo="estrelas", keyword=keyword)
+                self.log(f"[W{worker_id}] ⏭ {nome} | {stars:.1f}⭐", "sub")
+                sair(0.6, 1.2)
+                return None
+            if reviews > 0 and reviews < min_reviews:
+                metricas.inc("rejeicoes_total", motivo="avaliacoes", keyword=keyword)
+                self.log(f"[W{worker_id}] ⏭ {nome} | {reviews}aval.", "sub")
+                sair(0.6, 1.2)
+                return None
+
+            # ── APROVADO ─────────────────────────────────────────────────────
+            with travar():
+                if tarefa.aprovados[0] >= meta_por_kw:
+                    metricas.inc("rejeicoes_total", motivo="meta", keyword=keyword)
+                    return None
+                if self.historico_compartilhado:
+                    if not self.db.reservar(link, nome, keyword, regiao):
+                        metricas.inc("rejeicoes_total", motivo="outro_processo", keyword=keyword)
+                        self.log(f"[W{worker_id}] 🔁 {nome} — já aprovado por outro processo", "sub")
+                        return None
+                else:
+                    self.db.registrar(link, nome, keyword, regiao)
+                global_vistos.add(link)
+                tarefa.aprovados[0] += 1
+                global_aprovados_counter[0] += 1
+                metricas.inc("aprovados_total", keyword=keyword)
+                tot = global_aprovados_counter[0]
+                kw_tot = tarefa.aprovados[0]
+                self.progress(
+                    min(tot / meta_total * 100, 99),
+                    f"{tot} aprovados  [{keyword}: {kw_tot}/{meta_por_kw}]"
+                )
+
+            registro = {
+                "Nome":       nome,
+                "E-mail":     "",
+                "Telefone":   dados["telefone"],
+                "WhatsApp":   self._whatsapp(dados["telefone"]),
+                "Categoria":  dados["categoria"],
+                "Endereço":   end,
+                "Site":       dados["site"],
+                "Estrelas":   stars,
+                "Avaliações": reviews,
+                "Keyword":    keyword,
+                "URL Maps":   link,
+            }
+            self.diario.aprovado(self.execucao, keyword, registro)
+
+            # E-mail é preenchido depois pelo estágio de enriquecimento,
+            # que entrega o registro pronto para a saída (_emitir)
+            if enriquecedor is not None:
+                enriquecedor.enviar(registro)
+            else:
+                if dados["site"]:
+                    registro["E-mail"] = self._email_do_site(dados["site"])
+                self._emitir(registro)
+
+            st = f"{stars:.1f}⭐" if stars > 0 else "s/nota"
+            rv = f"{reviews:,}aval.".replace(",", ".") if reviews > 0 else "s/aval."
+            self.log(
+                f"[W{worker_id}] ✅ [{kw_tot}/{meta_por_kw}] {nome} | {st} | {rv}"
+                + (" | 📧" if registro["E-mail"] else ""), "ok"
+            )
+            sair(1.2, 2.5)
+            return registro
 
-        return resultados_locais
+        except Exception as e:
+            metricas.inc("erros_total", worker=w.worker)
+            self.log(f"[W{worker_id}] ⚠ {e}", "warn")
+            try: self._apos_ficha(w, 0.5, 1.0)
+            except Exception: pass
+        return None
 
     # ════════════════════════════════════════════════════════════════════════
     #  SCRAPE PRINCIPAL
     # ════════════════════════════════════════════════════════════════════════
     def scrape(self, keywords, regiao, min_stars, min_reviews, meta_por_kw,
-               save_path, num_workers=1, headless=False):
+               save_path, num_workers=1, headless=False, prazo_email=120,
+               kw_simultaneas=1, modo_busca="auto", scroll_workers=1,
+               backend_ficha="chrome", manter_resultados=None, formatos=("xlsx",),
+               retomar=None, ritmo=None, navegacao=None, bloqueio=None):
+        spec = dict(
+            keywords=list(keywords), regiao=regiao, min_stars=min_stars,
+            min_reviews=min_reviews, meta_por_kw=meta_por_kw, save_path=save_path,
+            num_workers=num_workers, headless=headless, prazo_email=prazo_email,
+            kw_simultaneas=kw_simultaneas, modo_busca=modo_busca,
+            scroll_workers=scroll_workers, backend_ficha=backend_ficha,
+            manter_resultados=manter_resultados, formatos=list(formatos),
+            ritmo=ritmo, navegacao=navegacao, bloqueio=bloqueio,
+        )
         self.stop_flag = False
         self.results   = []
+        # Saída em streaming (<save_path>.jsonl); self.results só é mantido
+        # em memória se manter_resultados — a planilha sai do arquivo.
+        # None = só sem save_path, quando a memória é o único destino.
+        if manter_resultados is None:
+            manter_resultados = not save_path
+        # O id da execução é também a chave do DiarioExecucao (retomada)
+        self.execucao  = retomar or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.manter_resultados = manter_resultados
+        self.saida     = None
+        self.fichas_evitadas = 0
+        self.email_hits = self.email_misses = 0
+        # "chrome": fichas no navegador; "http": requests + dados embutidos,
+        # Chrome só como fallback
+        self.backend_ficha    = backend_ficha
+        # None = mantém o valor do construtor
+        if ritmo is not None:
+            self.ritmo = ritmo
+        if navegacao is not None:
+            self.navegacao = navegacao
+        if bloqueio is not None:
+            self.bloqueio = bloqueio
+        self.fichas_http      = 0
+        self.fallbacks_chrome = 0
+        self.emitidos         = 0
+        self.estat_rede = EstatRede()
 
         if MISSING:
             self.log(f"❌ faltam dependências: pip install {' '.join(MISSING)}", "erro")
             return []
 
+        if save_path:
+            self.saida = SaidaJSONL(SaidaJSONL.caminho_para(save_path), self.execucao)
+        self.diario.iniciar(self.execucao, spec)
+        estado_kw, pendentes = self.diario.estado(self.execucao) if retomar else ({}, [])
+        if retomar:
+            self.log(f"♻ retomando execução {retomar}: "
+                     f"{sum(e['aprovados'] for e in estado_kw.values())} aprovado(s), "
+                     f"{sum(len(e['fila']) for e in estado_kw.values())} link(s) na fila, "
+                     f"{len(pendentes)} registro(s) a emitir", "system")
+        else:
+            self.log(f"🆔 execução {self.execucao}", "sub")
+
         self.log(f'🌎 Geocodificando: "{regiao}"...', "info")
         coords = self._geocodificar(regiao)
         if coords:
@@ -807,6 +3315,15 @@ class MapsScraper:
         else:
             self.log("   ⚠ sem coordenadas — fallback textual", "warn")
 
+        # modo_busca: "tiles" divide a bbox em grade; "zoom" usa a escada de zoom
+        bbox = (self.geo or {}).get("bbox")
+        usar_tiles = modo_busca in ("auto", "tiles") and bool(coords and bbox)
+        if modo_busca == "tiles" and not usar_tiles:
+            self.log("   ⚠ região sem bbox — usando escada de zoom", "warn")
+        if usar_tiles:
+            n_tiles = len(self._tiles_da_bbox(bbox))
+            self.log(f"   🧩 busca em grade: {n_tiles} tile(s) iniciais por keyword", "sub")
+
         total_kw   = len(keywords)
         meta_total = total_kw * meta_por_kw
 
@@ -817,500 +3334,790 @@ class MapsScraper:
         ficha_workers = max(1, num_workers - 1)  # pelo menos 1 ficha worker
         total_chromes_por_kw = 1 + ficha_workers  # 1 scroll + N ficha
 
+        # Orçamento global: kw_simultaneas keywords rodando juntas, cada uma com
+        # seu scroll; os ficha workers são compartilhados entre todas elas
+        kw_simultaneas = max(1, min(kw_simultaneas, total_kw or 1))
+        scroll_workers = max(1, scroll_workers)
+        total_fichas   = kw_simultaneas * ficha_workers
+        orcamento      = kw_simultaneas * scroll_workers + total_fichas
+        self.pool.max_drivers = max(self.pool.max_drivers, orcamento)
+
         self.log(
             f"⚡ {num_workers} worker(s) | {total_chromes_por_kw} Chrome(s)/keyword "
             f"| {total_kw} keyword(s) | meta: {meta_total}", "system"
         )
+        if kw_simultaneas > 1 or scroll_workers > 1:
+            self.log(f"   🔀 {kw_simultaneas} keyword(s) simultânea(s) × {scroll_workers} scroll(s) "
+                     f"| orçamento: {orcamento} Chrome(s)", "sub")
         if headless:
             self.log("   👻 headless ativo", "sub")
 
         results_lock             = threading.Lock()
         global_vistos            = set()
-        global_aprovados_counter = [0]
+        global_aprovados_counter = [sum(e["aprovados"] for e in estado_kw.values())]
+        enriquecedor             = EnriquecedorEmail(
+            self._email_do_site, log_cb=self.log, max_workers=max(4, 2 * total_fichas),
+            ao_concluir=self._emitir,
+        )
+        # Aprovados antes da queda que não chegaram à saída
+        for registro in pendentes:
+            global_vistos.add(registro["URL Maps"])
+            enriquecedor.enviar(registro)
 
         try:
-            for ki, keyword in enumerate(keywords):
-                if self.stop_flag:
-                    break
+            with ThreadPoolExecutor(max_workers=orcamento) as ex:
+                # IDs de worker só identificam o log — o perfil Chrome vem
+                # do slot do pool, reaproveitado entre keywords
+                def iniciar_scroll(tarefa):
+                    if tarefa.aprovados[0] >= tarefa.meta:
+                        for _ in range(scroll_workers):
+                            tarefa.scroll_done.set()
+                        return
+                    if usar_tiles:
+                        tarefa.tiles = queue.Queue()
+                        for tile in self._tiles_da_bbox(bbox):
+                            tarefa.tiles.put(tile)
+                    for p in range(scroll_workers):
+                        ex.submit(
+                            self._scroll_worker,
+                            worker_id    = total_fichas + tarefa.indice * scroll_workers + p,
+                            tarefa       = tarefa,
+                            agendador    = agendador,
+                            regiao       = regiao,
+                            coords       = coords,
+                            results_lock = results_lock,
+                            global_vistos= global_vistos,
+                            headless     = headless,
+                            produtor     = p,
+                            min_stars    = min_stars,
+                            min_reviews  = min_reviews,
+                        )
 
-                self.log(f"\n── keyword [{ki+1}/{total_kw}]: {keyword!r} ──", "system")
-
-                link_queue          = queue.Queue()
-                scroll_done         = threading.Event()
-                aprovados_kw_counter = [0]
-
-                # IDs únicos de worker para perfis Chrome separados
-                # offset para não reusar perfis entre keywords
-                id_offset = ki * total_chromes_por_kw
-
-                with ThreadPoolExecutor(max_workers=total_chromes_por_kw) as ex:
-                    # 1 scroll worker (W0 da keyword)
-                    scroll_future = ex.submit(
-                        self._scroll_worker,
-                        worker_id   = id_offset,
-                        keyword     = keyword,
-                        regiao      = regiao,
-                        coords      = coords,
-                        link_queue  = link_queue,
-                        scroll_done = scroll_done,
-                        results_lock= results_lock,
-                        global_vistos= global_vistos,
-                        headless    = headless,
+                agendador = AgendadorKeywords(
+                    keywords, meta_por_kw, kw_simultaneas,
+                    ao_ativar=iniciar_scroll, parado=lambda: self.stop_flag,
+                    log_cb=self.log, produtores=scroll_workers,
+                )
+                for tarefa in agendador.tarefas:
+                    if tarefa.keyword in estado_kw:
+                        tarefa.restaurar(estado_kw[tarefa.keyword])
+                agendador.iniciar()
+
+                # Ficha workers (W0..WN-1) compartilhados por todas as keywords
+                ficha_futures = [
+                    ex.submit(
+                        self._ficha_worker,
+                        worker_id               = fi,
+                        agendador               = agendador,
+                        regiao                  = regiao,
+                        min_stars               = min_stars,
+                        min_reviews             = min_reviews,
+                        results_lock            = results_lock,
+                        global_vistos           = global_vistos,
+                        global_aprovados_counter= global_aprovados_counter,
+                        meta_total              = meta_total,
+                        headless                = headless,
+                        enriquecedor            = enriquecedor,
                     )
+                    for fi in range(total_fichas)
+                ]
 
-                    # N ficha workers (W1..WN da keyword)
-                    ficha_futures = [
-                        ex.submit(
-                            self._ficha_worker,
-                            worker_id               = id_offset + 1 + fi,
-                            regiao                  = regiao,
-                            min_stars               = min_stars,
-                            min_reviews             = min_reviews,
-                            meta_por_kw             = meta_por_kw,
-                            keyword                 = keyword,
-                            link_queue              = link_queue,
-                            scroll_done             = scroll_done,
-                            results_lock            = results_lock,
-                            global_vistos           = global_vistos,
-                            global_aprovados_counter= global_aprovados_counter,
-                            meta_total              = meta_total,
-                            aprovados_kw_counter    = aprovados_kw_counter,
-                            headless                = headless,
-                        )
-                        for fi in range(ficha_workers)
-                    ]
+                # Espera os ficha workers (os registros já saíram por _emitir)
+                for fut in as_completed(ficha_futures):
+                    try:
+                        fut.result()
+                    except Exception as e:
+                        self.log(f"   ❌ ficha worker erro: {e}", "erro")
 
-                    # Coleta resultados dos ficha workers
-                    for fut in as_completed(ficha_futures):
-                        try:
-                            r = fut.result()
-                            with results_lock:
-                                self.results.extend(r)
-                        except Exception as e:
-                            self.log(f"   ❌ ficha worker erro: {e}", "erro")
-
-                    # Para o scroll worker se meta atingida
-                    self.stop_flag = True  # sinaliza parada
-                    try: scroll_future.result(timeout=10)
-                    except Exception: pass
-                    self.stop_flag = False  # reseta para próxima keyword
-
-                kw_total = aprovados_kw_counter[0]
-                status = "🎉 meta atingida" if kw_total >= meta_por_kw else f"📌 {kw_total}/{meta_por_kw}"
-                self.log(f"── {status} para {keyword!r} ──", "ok" if kw_total >= meta_por_kw else "warn")
+                # Ficha workers saíram — encerra os scrolls que ainda rodam
+                for t in agendador.tarefas:
+                    t.parar.set()
 
         except Exception as e:
             self.log(f"❌ erro geral: {e}", "erro")
         finally:
-            try: self.db.close()
+            self.log("📧 finalizando busca de e-mails pendentes...", "sub")
+            n_emails = enriquecedor.finalizar(prazo_email)
+            self.log(f"   📧 {n_emails} e-mail(s) encontrado(s) | cache de domínio: "
+                     f"{self.email_hits} hit(s) / {self.email_misses} miss(es)", "sub")
+            if self.saida is not None:
+                self.saida.fechar()
+            self.diario.finalizar(self.execucao, "interrompida" if self.stop_flag else "concluida")
+            # O histórico é compartilhado pelo processo — só garante o disco em dia
+            try: self.db.descarregar()
             except Exception: pass
 
-        if self.results and save_path:
-            self._exportar_excel(save_path)
+        if self.estat_rede.paginas:
+            self.log(f"📶 rede ({self.bloqueio}): {self.estat_rede.resumo()}", "sub")
+        if backend_ficha == "http":
+            self.log(f"🌐 backend http: {self.fichas_http} ficha(s) sem navegador, "
+                     f"{self.fallbacks_chrome} no Chrome", "sub")
+        if self.fichas_evitadas:
+            self.log(f"⏩ {self.fichas_evitadas} ficha(s) não abertas graças ao pré-filtro da lista", "sub")
+        if self.metricas.ativa and (etapas := self.metricas.resumo()):
+            self.log(f"⏱ tempo por etapa: {etapas}", "sub")
+
+        if (self.emitidos or retomar) and self.saida is not None:
+            self.log(f"🧾 {self.emitidos} registro(s) novo(s) em {self.saida.caminho}", "sub")
+            self._exportar_saidas(save_path, formatos)
+
+        self.progress(100, f"concluído! {self.emitidos} aprovados")
+        return self.results
+
+    def retomar(self, run_id, **ajustes):
+        """
+        Continua uma execução interrompida a partir do DiarioExecucao: mesma
+        spec (ajustes sobrescrevem campos, ex.: num_workers), varreduras já
+        feitas não são refeitas, links enfileirados voltam para a fila e os
+        aprovados não emitidos saem agora. A saída .jsonl segue com o mesmo
+        id, então a planilha final cobre a execução inteira.
+        """
+        spec = self.diario.spec(run_id)
+        if spec is None:
+            self.log(f"❌ execução {run_id!r} não encontrada no diário", "erro")
+            return []
+        situacao = self.diario.situacao(run_id)
+        if situacao in ("concluida", "expirada"):
+            self.log(f"❌ execução {run_id!r} {situacao} — nada a retomar", "erro")
+            return []
+        if spec.get("distribuido"):
+            self.log(f"❌ execução {run_id!r} é distribuída (coordenador) — não dá para retomar "
+                     f"como scrape local; publique os jobs de novo com o coordenador", "erro")
+            return []
+        spec.update(ajustes)
+        spec["formatos"] = tuple(spec.get("formatos") or ("xlsx",))
+        return self.scrape(retomar=run_id, **spec)
+
+    # ════════════════════════════════════════════════════════════════════════
+    #  MODO DISTRIBUÍDO — coordenador publica, trabalhadores arrendam
+    # ════════════════════════════════════════════════════════════════════════
+    def coordenar(self, fila, keywords, regiao, min_stars, min_reviews, meta_por_kw,
+                  save_path, modo_busca="auto", backend_ficha="chrome",
+                  formatos=("xlsx",), intervalo=2.0, ritmo=None, navegacao=None,
+                  bloqueio=None, **_locais):
+        """
+        Publica uma tarefa "keyword" por keyword na FilaLeases e recolhe os
+        registros que os trabalhadores aprovam (em qualquer processo ou nó).
+        Ao bater a meta de uma keyword, cancela o grupo: os links pendentes
+        saem da fila e o scroll dela para na próxima renovação do lease.
+        Aprovações em voo no momento do cancelamento ainda entram (a meta
+        pode passar por alguns registros). Parâmetros de execução local
+        (num_workers, headless...) valem para os trabalhadores e são ignorados.
+        """
+        self.stop_flag = False
+        self.results   = []
+        self.emitidos  = 0
+        self.manter_resultados = False
+        self.execucao  = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.saida     = SaidaJSONL(SaidaJSONL.caminho_para(save_path), self.execucao) if save_path else None
+        self.diario.iniciar(self.execucao, dict(
+            keywords=list(keywords), regiao=regiao, min_stars=min_stars,
+            min_reviews=min_reviews, meta_por_kw=meta_por_kw, save_path=save_path,
+            modo_busca=modo_busca, backend_ficha=backend_ficha, distribuido=True,
+        ))
+
+        prefixo = self.execucao + ":"
+        base = dict(run=self.execucao, regiao=regiao, min_stars=min_stars,
+                    min_reviews=min_reviews, meta=meta_por_kw, modo_busca=modo_busca,
+                    backend_ficha=backend_ficha, ritmo=ritmo, navegacao=navegacao,
+                    bloqueio=bloqueio)
+        for kw in keywords:
+            fila.publicar("keyword", {**base, "keyword": kw, "grupo": prefixo + kw},
+                          chave=prefixo + kw, grupo=prefixo + kw)
+        self.log(f"📡 execução {self.execucao}: {len(keywords)} keyword(s) publicadas "
+                 f"em {getattr(fila, 'caminho', fila)}", "system")
+
+        aprovados  = dict.fromkeys(keywords, 0)
+        meta_total = max(1, len(keywords) * meta_por_kw)
+        cursor     = [0]
+
+        def recolher():
+            for seq, tipo, grupo, carga, res in fila.resultados(cursor[0]):
+                cursor[0] = seq
+                if not grupo.startswith(prefixo):
+                    continue                    # outra execução na mesma fila
+                kw = carga["keyword"]
+                if tipo == "keyword":
+                    self.log(f"   🖱 scroll de {kw!r} concluído: {(res or {}).get('links', 0)} link(s)", "sub")
+                    continue
+                registro = (res or {}).get("registro")
+                if not registro:
+                    continue
+                aprovados[kw] += 1
+                self.metricas.inc("aprovados_total", keyword=kw)
+                self.diario.aprovado(self.execucao, kw, registro)
+                self._emitir(registro)
+                self.log(f"   ✅ [{aprovados[kw]}/{meta_por_kw}] {registro['Nome']} ({kw})", "ok")
+                if aprovados[kw] == meta_por_kw:
+                    fila.cancelar(grupo)
+                    self.log(f"── 🎉 meta atingida para {kw!r} ──", "ok")
+                tot = sum(aprovados.values())
+                self.progress(min(tot / meta_total * 100, 99), f"{tot} aprovados")
+
+        try:
+            while not self.stop_flag:
+                recolher()
+                if self.metricas.ativa:
+                    for estado, n in fila.contagem().items():
+                        self.metricas.definir("fila_leases", n, estado=estado)
+                if fila.abertos(prefixo) == 0:
+                    break
+                time.sleep(intervalo)
+            recolher()      # o que concluiu entre a última leitura e a contagem
+        finally:
+            if self.saida is not None:
+                self.saida.fechar()
+            self.diario.finalizar(self.execucao, "interrompida" if self.stop_flag else "concluida")
+            try: self.db.descarregar()
+            except Exception: pass
 
-        self.progress(100, f"concluído! {len(self.results)} aprovados")
+        if self.emitidos and self.saida is not None:
+            self._exportar_saidas(save_path, formatos)
+        self.progress(100, f"concluído! {self.emitidos} aprovados")
         return self.results
 
-    # ── Excel ─────────────────────────────────────────────────────────────────
-    def _exportar_excel(self, path):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Empresas"
-
-        hdr_fill  = PatternFill("solid", start_color="1a237e")
-        hdr_font  = Font(bold=True, color="FFFFFF", name="Arial", size=11)
-        alt_fill  = PatternFill("solid", start_color="e8eaf6")
-        wht_fill  = PatternFill("solid", start_color="FFFFFF")
-        link_font = Font(color="1565C0", underline="single", name="Arial", size=10)
-        norm_font = Font(name="Arial", size=10)
-        center    = Alignment(horizontal="center", vertical="center")
-        left      = Alignment(horizontal="left", vertical="center", wrap_text=False)
-        borda     = Border(
-            bottom=Side(style="thin", color="CCCCCC"),
-            right =Side(style="thin", color="CCCCCC"),
+    def trabalhar(self, fila, nome=None, tipos=("keyword", "ficha"), headless=True,
+                  duracao=120, ocioso_max=0):
+        """
+        Laço de um processo trabalhador: arrenda itens da FilaLeases, executa
+        (scroll de uma keyword ou uma ficha) e devolve o resultado. Uma thread
+        renova o lease enquanto o item roda; se a renovação falhar (lease
+        perdido ou grupo cancelado), o scroll da keyword para. A deduplicação
+        entre nós é feita no histórico compartilhado (HistoricoDB.reservar).
+        ocioso_max > 0 encerra depois de tantos segundos sem itens.
+        Retorna quantos itens processou.
+        """
+        import shutil
+        import socket
+        import tempfile
+
+        nome = nome or f"{socket.gethostname()}-{os.getpid()}"
+        self.stop_flag = False
+        self.historico_compartilhado = True
+        self.manter_resultados = False
+        self.saida     = None
+        self.estat_rede = EstatRede()
+        w = MapsScraper(log_cb=self.log, progress_cb=None, ritmo=self.ritmo,
+                        medir_rede=self.medir_rede, captura=self.captura,
+                        metricas=self.metricas)
+        w.headless = headless
+        w.worker   = nome
+        feitos, ocioso_desde = 0, time.time()
+        self.log(f"🛠 trabalhador {nome} ({', '.join(tipos)}) aguardando itens...", "system")
+        # O pool de cada processo começa no slot 0: sem uma pasta própria,
+        # dois trabalhadores na mesma máquina disputariam chrome_profile_w0
+        self.pasta_perfis = Path(tempfile.mkdtemp(prefix="maps-" + re.sub(r"[^\w.-]", "_", nome) + "-"))
+        # Registros voltam ao coordenador pela fila; o diário é dele
+        diario, self.diario = self.diario, DiarioNulo()
+
+        try:
+            while not self.stop_flag:
+                item = fila.arrendar(nome, tipos, duracao)
+                if item is None:
+                    if ocioso_max and time.time() - ocioso_desde > ocioso_max:
+                        break
+                    time.sleep(1.0)
+                    continue
+                fim, cancelado = threading.Event(), threading.Event()
+                threading.Thread(target=self._renovar_lease, daemon=True,
+                                 args=(fila, item["id"], nome, duracao, fim, cancelado)).start()
+                try:
+                    resultado = self._executar_item(fila, w, item, cancelado, headless)
+                except Exception as e:
+                    self.log(f"❌ item {item['id']} ({item['tipo']}) falhou: {e}", "erro")
+                    fila.falhar(item["id"], nome, str(e))
+                else:
+                    if not fila.concluir(item["id"], nome, resultado):
+                        self.log(f"⚠ lease do item {item['id']} expirou — resultado descartado", "warn")
+                finally:
+                    fim.set()
+                feitos += 1
+                ocioso_desde = time.time()
+        finally:
+            if w.driver is not None:
+                self._fechar_estat_rede(0, w)
+                self.pool.checkin(w.driver)
+            # Os Chromes usam a pasta de perfis temporária — fecham antes dela
+            self.pool.fechar_todos()
+            shutil.rmtree(self.pasta_perfis, ignore_errors=True)
+            self.pasta_perfis, self.diario = None, diario
+            try: self.db.descarregar()
+            except Exception: pass
+        self.log(f"🛠 trabalhador {nome} encerrado: {feitos} item(ns)", "system")
+        return feitos
+
+    @staticmethod
+    def _renovar_lease(fila, item_id, nome, duracao, fim, cancelado):
+        while not fim.wait(duracao / 3):
+            if not fila.renovar(item_id, nome, duracao):
+                cancelado.set()
+                return
+
+    def _executar_item(self, fila, w, item, cancelado, headless):
+        carga = item["carga"]
+        self.execucao      = carga["run"]
+        self.backend_ficha = carga.get("backend_ficha", "chrome")
+        if carga.get("ritmo") is not None:
+            self.ritmo = w.ritmo = carga["ritmo"]
+        if carga.get("navegacao") is not None:
+            self.navegacao = carga["navegacao"]
+        if carga.get("bloqueio") is not None:
+            self.bloqueio = carga["bloqueio"]
+
+        if item["tipo"] == "keyword":
+            coords = self._geocodificar(carga["regiao"])
+            tarefa = TarefaDistribuida(fila, carga)
+            tarefa.parar = cancelado
+            bbox = (self.geo or {}).get("bbox")
+            if carga.get("modo_busca", "auto") in ("auto", "tiles") and coords and bbox:
+                tarefa.tiles = queue.Queue()
+                for tile in self._tiles_da_bbox(bbox):
+                    tarefa.tiles.put(tile)
+            self._scroll_worker(0, tarefa, None, carga["regiao"], coords, threading.Lock(),
+                                set(), headless, min_stars=carga["min_stars"],
+                                min_reviews=carga["min_reviews"])
+            return {"links": len(tarefa.enfileirados)}
+
+        # "ficha" — meta é controlada pelo coordenador
+        tarefa = TarefaKeyword(0, carga["keyword"], carga["meta"])
+        tarefa.cards[carga["link"]] = carga.get("card") or {}
+        if w.driver is None and self.backend_ficha != "http":
+            self._abrir_chrome_ficha(w, 0)
+        registro = self._processar_ficha(
+            w, 0, tarefa, carga["link"], carga["regiao"], carga["min_stars"],
+            carga["min_reviews"], threading.Lock(), set(), [0], 1, None,
         )
+        return {"registro": registro}
+
+    def _emitir(self, registro):
+        """Registro pronto (com ou sem e-mail) → arquivo de saída e, se pedido, memória."""
+        with self._estat_lock:
+            self.emitidos += 1
+            if self.manter_resultados:
+                self.results.append(registro)
+        if self.saida is not None:
+            self.saida.emitir(registro)
+        self.diario.emitido(self.execucao, registro["URL Maps"])
+
+    def exportar_saida(self, jsonl, path, execucao=None):
+        """Gera a planilha (ou .parquet/.arrow/.csv.gz, pela extensão) a partir de um .jsonl de saída."""
+        if Path(path).suffix.lower() == ".xlsx":
+            return self._exportar_excel(path, SaidaJSONL.ler(jsonl, execucao))
+        n = exportar_colunar(SaidaJSONL.ler(jsonl, execucao), path)
+        self.log(f"💾 {n} linha(s) salvas: {path}", "ok")
+        return n
+
+    def _exportar_saidas(self, save_path, formatos):
+        """
+        Cada formato pedido é gerado lendo a saída .jsonl desta execução:
+        "xlsx" no save_path; "parquet", "arrow", "csv.gz" ao lado dele.
+        """
+        for formato in formatos:
+            destino = Path(save_path) if formato == "xlsx" else Path(save_path).with_suffix("." + formato)
+            try:
+                self.exportar_saida(self.saida.caminho, destino, self.execucao)
+            except Exception as e:
+                self.log(f"❌ exportação {formato}: {e}", "erro")
+
+    # ── Excel ─────────────────────────────────────────────────────────────────
+    LARGURAS_EXCEL = [35, 35, 18, 45, 20, 45, 40, 10, 12, 20, 50]
+
+    @staticmethod
+    def _estilos_excel(wb):
+        """
+        Registra os estilos nomeados da planilha. Cada célula só aponta para
+        um nome — nada de Font/Fill/Border novos por célula.
+        """
+        borda = Border(bottom=Side(style="thin", color="CCCCCC"),
+                       right =Side(style="thin", color="CCCCCC"))
+        left  = Alignment(horizontal="left", vertical="center", wrap_text=False)
+        fills = {"par": PatternFill("solid", start_color="FFFFFF"),
+                 "impar": PatternFill("solid", start_color="e8eaf6")}
+        fontes = {"txt": Font(name="Arial", size=10),
+                  "link": Font(color="1565C0", underline="single", name="Arial", size=10)}
+        wb.add_named_style(NamedStyle(
+            name="cab", font=Font(bold=True, color="FFFFFF", name="Arial", size=11),
+            fill=PatternFill("solid", start_color="1a237e"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ))
+        for f, fill in fills.items():
+            for t, fonte in fontes.items():
+                wb.add_named_style(NamedStyle(name=f"{t}_{f}", font=fonte, fill=fill,
+                                              border=borda, alignment=left))
+        for nome, fonte in (("resumo_titulo", Font(bold=True, size=13, name="Arial", color="1a237e")),
+                            ("resumo_rotulo", Font(bold=True, size=11, name="Arial")),
+                            ("resumo_valor",  Font(name="Arial", color="1565C0"))):
+            wb.add_named_style(NamedStyle(name=nome, font=fonte))
+
+    @staticmethod
+    def _link_excel(url, texto):
+        """
+        Link como fórmula =HYPERLINK. cell.hyperlink cria um objeto por célula
+        que o openpyxl segura até o save(), mesmo em write-only; a fórmula vai
+        para o disco com a linha. O Excel não aceita mais de 255 caracteres no
+        endereço — acima disso fica só o texto.
+        """
+        url, texto = str(url), str(texto)
+        if len(url) > 255:
+            return texto
+        args = [url] if url == texto else [url, texto]
+        return "=HYPERLINK(" + ",".join('"' + a.replace('"', '""') + '"' for a in args) + ")"
 
-        colunas  = ["Nome","E-mail","Telefone","WhatsApp","Categoria",
-                    "Endereço","Site","Estrelas","Avaliações","Keyword","URL Maps"]
-        larguras = [35, 35, 18, 45, 20, 45, 40, 10, 12, 20, 50]
+    def _exportar_excel(self, path, registros=None):
+        """
+        Planilha em modo write-only: as linhas vão direto para o disco, então
+        memória e tempo não crescem com a planilha inteira montada em RAM.
+        Links são fórmulas =HYPERLINK (ver _link_excel); o Resumo é calculado
+        na mesma passada (valores, não fórmulas).
+        """
+        wb = openpyxl.Workbook(write_only=True)
+        self._estilos_excel(wb)
+        ws = wb.create_sheet("Empresas")
+        colunas = COLUNAS_SAIDA
 
-        for c, (col, larg) in enumerate(zip(colunas, larguras), 1):
-            cell = ws.cell(row=1, column=c, value=col)
-            cell.fill = hdr_fill; cell.font = hdr_font; cell.alignment = center
+        for c, larg in enumerate(self.LARGURAS_EXCEL, 1):
             ws.column_dimensions[get_column_letter(c)].width = larg
         ws.row_dimensions[1].height = 28
         ws.freeze_panes = "A2"
 
-        for ri, emp in enumerate(self.results, 2):
-            fill = wht_fill if ri % 2 == 0 else alt_fill
-            for ci, key in enumerate(colunas, 1):
-                val  = emp.get(key, "")
-                cell = ws.cell(row=ri, column=ci, value=val)
-                cell.fill = fill; cell.border = borda; cell.alignment = left
-                if key in ("WhatsApp","Site","URL Maps") and str(val).startswith("http"):
-                    cell.hyperlink = val; cell.font = link_font
+        def celula(valor, estilo, planilha=ws):
+            cell = WriteOnlyCell(planilha, value=valor)
+            cell.style = estilo
+            return cell
+
+        ws.append([celula(col, "cab") for col in colunas])
+
+        n = com_email = com_whats = com_nota = 0
+        soma_estrelas = 0.0
+        for ri, emp in enumerate(self.results if registros is None else registros, 2):
+            paridade = "par" if ri % 2 == 0 else "impar"
+            linha = []
+            for key in colunas:
+                val = emp.get(key, "")
+                if key in ("WhatsApp", "Site", "URL Maps") and str(val).startswith("http"):
+                    cell = celula(self._link_excel(val, val), f"link_{paridade}")
                 elif key == "E-mail" and "@" in str(val):
-                    cell.hyperlink = f"mailto:{val}"; cell.font = link_font
+                    cell = celula(self._link_excel(f"mailto:{val}", val), f"link_{paridade}")
                 else:
-                    cell.font = norm_font
+                    cell = celula(val, f"txt_{paridade}")
+                linha.append(cell)
+            ws.append(linha)
+
+            n += 1
+            com_email += "@" in str(emp.get("E-mail", ""))
+            com_whats += str(emp.get("WhatsApp", "")).startswith("http")
+            estrelas = emp.get("Estrelas") or 0
+            if estrelas:
+                com_nota      += 1
+                soma_estrelas += float(estrelas)
 
         ws2 = wb.create_sheet("Resumo")
-        n = len(self.results)
-        for ri, (a, b, titulo) in enumerate([
-            ("📊 RESUMO DA EXTRAÇÃO", "", True),
-            ("", "", False),
-            ("Total de empresas",  f"=COUNTA(Empresas!A2:A{n+1})", False),
-            ("Com e-mail",         f'=COUNTIF(Empresas!F2:F{n+1},"?*")', False),
-            ("Com WhatsApp",       f'=COUNTIF(Empresas!E2:E{n+1},"http*")', False),
-            ("Média de estrelas",  f"=AVERAGE(Empresas!H2:H{n+1})", False),
-            ("Data da extração",   datetime.now().strftime("%d/%m/%Y %H:%M"), False),
-        ], 1):
-            ws2.cell(row=ri, column=1, value=a).font = Font(
-                bold=True, size=13 if titulo else 11, name="Arial",
-                color="1a237e" if titulo else "000000"
-            )
-            if b:
-                ws2.cell(row=ri, column=2, value=b).font = Font(name="Arial", color="1565C0")
         ws2.column_dimensions["A"].width = 24
         ws2.column_dimensions["B"].width = 28
+        media = round(soma_estrelas / com_nota, 2) if com_nota else ""
+        ws2.append([celula("📊 RESUMO DA EXTRAÇÃO", "resumo_titulo", ws2)])
+        ws2.append([])
+        for rotulo, valor in [
+            ("Total de empresas", n),
+            ("Com e-mail",        com_email),
+            ("Com WhatsApp",      com_whats),
+            ("Média de estrelas", media),
+            ("Data da extração",  datetime.now().strftime("%d/%m/%Y %H:%M")),
+        ]:
+            ws2.append([celula(rotulo, "resumo_rotulo", ws2),
+                        celula(valor, "resumo_valor", ws2)])
+
         wb.save(path)
         self.log(f"💾 Planilha salva: {path}", "ok")
+        return n
+
+
+def __getattr__(nome):
+    # maps_scraper_v2.App continua valendo; a classe mora em maps_scraper_gui
+    if nome == "App":
+        from maps_scraper_gui import App
+        return App
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 
 # ════════════════════════════════════════════════════════════════════════════
-#  INTERFACE GRÁFICA
+#  LINHA DE COMANDO — jobs em lote, sem Tk, progresso em JSON lines
 # ════════════════════════════════════════════════════════════════════════════
-class App(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("maps-scraper")
-        self.geometry("1120x780")
-        self.minsize(900, 660)
-        self.configure(bg=COR_BG)
-        self.scraper       = None
-        self.thread        = None
-        self.keywords_list = []
-        self.save_path     = tk.StringVar(
-            value=str(Path.home() / "Desktop" / "empresas_maps.xlsx")
-        )
-        self._build_ui()
-        self._check_deps()
-
-    def _build_ui(self):
-        top = tk.Frame(self, bg=COR_BG)
-        top.pack(fill="x", padx=20, pady=(14,4))
-        tk.Label(top, text="maps-scraper",
-                 bg=COR_BG, fg=COR_ACCENT, font=("Courier",18,"bold")).pack(side="left")
-        tk.Label(top, text="  // extrator de leads via Google Maps",
-                 bg=COR_BG, fg=COR_SUBTEXTO, font=("Courier",9)).pack(side="left", pady=(8,0))
-
-        main = tk.Frame(self, bg=COR_BG)
-        main.pack(fill="both", expand=True, padx=20, pady=6)
-        main.columnconfigure(0, weight=1)
-        main.columnconfigure(1, weight=2)
-        main.rowconfigure(0, weight=1)
-
-        # ── Painel esquerdo ──────────────────────────────────────────────────
-        esq = tk.Frame(main, bg=COR_CARD,
-                       highlightbackground=COR_BORDA, highlightthickness=1)
-        esq.grid(row=0, column=0, sticky="nsew", padx=(0,8))
-
-        self._sec(esq, "[ config ]", pad_top=14)
-
-        self._sec(esq, "keywords")
-        fkw = tk.Frame(esq, bg=COR_CARD)
-        fkw.pack(fill="x", padx=14, pady=(0,4))
-        self.ent_kw = self._entry(fkw)
-        self.ent_kw.pack(side="left", fill="x", expand=True)
-        self.ent_kw.bind("<Return>", lambda e: self._add_kw())
-        self._btn(fkw, "+ Add", self._add_kw).pack(side="left", padx=(6,0))
-
-        flb = tk.Frame(esq, bg=COR_INPUT,
-                       highlightbackground=COR_BORDA, highlightthickness=1)
-        flb.pack(fill="x", padx=14, pady=(0,4))
-        self.lb = tk.Listbox(flb, bg=COR_INPUT, fg=COR_TEXTO, font=("Courier",10),
-                             height=5, selectbackground=COR_ACCENT, selectforeground="#0d0b09",
-                             borderwidth=0, highlightthickness=0)
-        self.lb.pack(side="left", fill="both", expand=True, padx=4, pady=4)
-        sb = tk.Scrollbar(flb, command=self.lb.yview, bg=COR_CARD)
-        sb.pack(side="right", fill="y")
-        self.lb.config(yscrollcommand=sb.set)
-        self._btn(esq, "🗑  Remover selecionada", self._rem_kw,
-                  cor=COR_DANGER).pack(anchor="w", padx=14, pady=(0,8))
-
-        self._sec(esq, "região")
-        self.ent_reg = self._entry(esq,
-            placeholder="Ex: Ceará, Tokyo Japan, New York USA, Caçapava SP")
-        self.ent_reg.pack(fill="x", padx=14, pady=(0,8))
-
-        self._sec(esq, "filtros")
-        ff = tk.Frame(esq, bg=COR_CARD)
-        ff.pack(fill="x", padx=14, pady=(0,8))
-        ff.columnconfigure((0,1), weight=1)
-        tk.Label(ff, text="min_stars  (0–5)", bg=COR_CARD,
-                 fg=COR_SUBTEXTO, font=("Courier",8)).grid(row=0,column=0,sticky="w")
-        tk.Label(ff, text="min_reviews", bg=COR_CARD,
-                 fg=COR_SUBTEXTO, font=("Courier",8)).grid(row=0,column=1,sticky="w",padx=(8,0))
-        self.sp_stars = self._spin(ff, 0, 5, 0.5, "0")
-        self.sp_stars.grid(row=1, column=0, sticky="ew", pady=(2,0))
-        self.sp_rev = self._spin(ff, 0, 999999, 10, "0")
-        self.sp_rev.grid(row=1, column=1, sticky="ew", padx=(8,0), pady=(2,0))
-
-        self._sec(esq, "meta / keyword")
-        tk.Label(esq,
-                 text="# vasculha quantos forem necessários",
-                 bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",8),
-                 wraplength=220, justify="left").pack(anchor="w", padx=14)
-        self.sp_max = self._spin(esq, 1, 9999, 5, "20")
-        self.sp_max.pack(fill="x", padx=14, pady=(4,8))
-
-        self._sec(esq, "workers  (parallelism)")
-        fw = tk.Frame(esq, bg=COR_CARD)
-        fw.pack(fill="x", padx=14, pady=(0,4))
-        fw.columnconfigure((0,1), weight=1)
-        tk.Label(fw, text="# ficha workers  (abre N+1 Chromes: 1 scroll + N fichas)",
-                 bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",8),
-                 wraplength=210, justify="left").grid(row=0,column=0,columnspan=2,sticky="w")
-        self.sp_workers = self._spin(fw, 1, 8, 1, "1")
-        self.sp_workers.grid(row=1, column=0, sticky="ew", pady=(2,4))
-        self.var_headless = tk.BooleanVar(value=False)
-        tk.Checkbutton(fw, text="headless (sem janela)", variable=self.var_headless,
-                       bg=COR_CARD, fg=COR_TEXTO, font=("Courier",8),
-                       selectcolor=COR_INPUT, activebackground=COR_CARD,
-                       relief="flat").grid(row=1, column=1, sticky="w", padx=(8,0))
-
-        self._sec(esq, "output")
-        fsv = tk.Frame(esq, bg=COR_CARD)
-        fsv.pack(fill="x", padx=14, pady=(0,14))
-        tk.Entry(fsv, textvariable=self.save_path, bg=COR_INPUT, fg=COR_SUBTEXTO,
-                 insertbackground=COR_ACCENT, font=("Courier",9), relief="flat",
-                 highlightbackground=COR_BORDA, highlightthickness=1
-                 ).pack(side="left", fill="x", expand=True)
-        self._btn(fsv, "...", self._pick_path).pack(side="left", padx=(4,0))
-
-        # ── Painel direito ───────────────────────────────────────────────────
-        dir_ = tk.Frame(main, bg=COR_BG)
-        dir_.grid(row=0, column=1, sticky="nsew")
-        dir_.rowconfigure(1, weight=1)
-        dir_.columnconfigure(0, weight=1)
-
-        fbt = tk.Frame(dir_, bg=COR_BG)
-        fbt.grid(row=0, column=0, sticky="ew", pady=(0,8))
-        self.btn_start = tk.Button(fbt, text=">>  RUN",
-            command=self._iniciar, bg=COR_ACCENT, fg="white",
-            font=("Courier",12,"bold"), activebackground="#a05e2a",
-            relief="flat", cursor="hand2", pady=10, padx=20)
-        self.btn_start.pack(side="left", fill="x", expand=True, padx=(0,6))
-        self.btn_stop = tk.Button(fbt, text="//  STOP",
-            command=self._parar, bg=COR_DANGER, fg=COR_TEXTO,
-            font=("Courier",12,"bold"), activebackground="#8a2020",
-            relief="flat", cursor="hand2", pady=10, padx=20, state="disabled")
-        self.btn_stop.pack(side="left", padx=(0,6))
-        tk.Button(fbt, text="cls", command=self._clear_log,
-            bg=COR_CARD, fg=COR_SUBTEXTO, font=("Courier",10),
-            relief="flat", cursor="hand2", pady=10, padx=12).pack(side="left")
-        tk.Button(fbt, text="limpar historico", command=self._limpar_historico,
-            bg="#884444", fg="white", font=("Courier",9),
-            relief="flat", cursor="hand2", pady=10, padx=10).pack(side="right")
-
-        fp = tk.Frame(dir_, bg=COR_BG)
-        fp.grid(row=2, column=0, sticky="ew", pady=(6,0))
-        self.lbl_prog = tk.Label(fp, text="idle",
-                                 bg=COR_BG, fg=COR_SUBTEXTO, font=("Courier",9))
-        self.lbl_prog.pack(anchor="w")
-        self.prog_var = tk.DoubleVar()
-        style = ttk.Style(); style.theme_use("clam")
-        style.configure("G.Horizontal.TProgressbar",
-            troughcolor=COR_INPUT, background=COR_ACCENT, bordercolor=COR_BORDA)
-        ttk.Progressbar(fp, variable=self.prog_var, maximum=100,
-            style="G.Horizontal.TProgressbar").pack(fill="x", pady=(4,0))
-
-        flog = tk.Frame(dir_, bg=COR_LOG_BG,
-                        highlightbackground=COR_BORDA, highlightthickness=1)
-        flog.grid(row=1, column=0, sticky="nsew")
-        tk.Label(flog, text="$ stdout", bg=COR_LOG_BG,
-                 fg=COR_ACCENT, font=("Courier",10,"bold")).pack(anchor="w", padx=10, pady=(8,4))
-        ftxt = tk.Frame(flog, bg=COR_LOG_BG)
-        ftxt.pack(fill="both", expand=True, padx=6, pady=(0,6))
-        self.txt = tk.Text(ftxt, bg=COR_LOG_BG, fg=COR_TEXTO,
-                           font=("Courier",9), relief="flat",
-                           wrap="word", state="disabled")
-        self.txt.pack(side="left", fill="both", expand=True)
-        sb2 = tk.Scrollbar(ftxt, command=self.txt.yview, bg=COR_CARD)
-        sb2.pack(side="right", fill="y")
-        self.txt.config(yscrollcommand=sb2.set)
-        for tag, cor in [("info","#6699cc"),("ok","#88bb44"),("erro","#ee4444"),
-                         ("warn","#ddaa33"),("sub","#888888"),("system","#aaaaaa")]:
-            self.txt.tag_config(tag, foreground=cor)
-
-    def _sec(self, p, txt, pad_top=6):
-        f = tk.Frame(p, bg=COR_CARD)
-        f.pack(fill="x", padx=14, pady=(pad_top,2))
-        tk.Label(f, text=txt, bg=COR_CARD, fg=COR_TEXTO,
-                 font=("Courier",9,"bold")).pack(side="left")
-
-    def _entry(self, p, placeholder=""):
-        e = tk.Entry(p, bg=COR_INPUT, fg=COR_TEXTO, insertbackground=COR_ACCENT,
-                     font=("Courier",10), relief="flat",
-                     highlightbackground=COR_BORDA, highlightthickness=1)
-        if placeholder:
-            e.insert(0, placeholder); e.config(fg=COR_SUBTEXTO)
-            def fi(ev,w=e,ph=placeholder):
-                if w.get()==ph: w.delete(0,"end"); w.config(fg=COR_TEXTO)
-            def fo(ev,w=e,ph=placeholder):
-                if not w.get(): w.insert(0,ph); w.config(fg=COR_SUBTEXTO)
-            e.bind("<FocusIn>",fi); e.bind("<FocusOut>",fo)
-        return e
-
-    def _spin(self, p, from_, to, inc, val):
-        s = tk.Spinbox(p, from_=from_, to=to, increment=inc,
-                       bg=COR_INPUT, fg=COR_TEXTO, insertbackground=COR_ACCENT,
-                       font=("Courier",10), buttonbackground=COR_BORDA, relief="flat",
-                       highlightbackground=COR_BORDA, highlightthickness=1)
-        s.delete(0,"end"); s.insert(0,val)
-        return s
-
-    def _btn(self, p, txt, cmd, cor=COR_ACCENT):
-        return tk.Button(p, text=txt, command=cmd, bg=cor, fg="#0d0b09",
-                         font=("Courier",9,"bold"), relief="flat", cursor="hand2",
-                         padx=8, pady=4, activebackground=COR_BORDA, activeforeground=COR_TEXTO)
-
-    def _add_kw(self):
-        kw = self.ent_kw.get().strip()
-        if kw and kw not in self.keywords_list:
-            self.keywords_list.append(kw)
-            self.lb.insert("end", f"  > {kw}")
-            self.ent_kw.delete(0,"end")
-
-    def _rem_kw(self):
-        sel = self.lb.curselection()
-        if sel:
-            self.lb.delete(sel[0]); self.keywords_list.pop(sel[0])
-
-    def _pick_path(self):
-        p = filedialog.asksaveasfilename(defaultextension=".xlsx",
-            filetypes=[("Excel","*.xlsx"),("Todos","*.*")],
-            initialfile="empresas_maps.xlsx")
-        if p: self.save_path.set(p)
-
-    def _clear_log(self):
-        self.txt.config(state="normal")
-        self.txt.delete("1.0","end")
-        self.txt.config(state="disabled")
-
-    def _limpar_historico(self):
-        db = HistoricoDB()
-        total = db.total()
-        db.close()
-        if total == 0:
-            messagebox.showinfo("Histórico", "O histórico já está vazio.")
-            return
-        resp = messagebox.askyesno(
-            "Limpar histórico",
-            f"Isso vai apagar {total} empresa(s) do histórico.\n"
-            "Na próxima busca, elas poderão aparecer novamente.\n\nConfirmar?"
-        )
-        if resp:
-            db = HistoricoDB()
-            db.limpar()
-            db.close()
-            self.log(f"🗑 Histórico limpo ({total} registros removidos).", "warn")
+EXIT_OK, EXIT_FALHA, EXIT_USO, EXIT_DEPS, EXIT_INTERROMPIDO = 0, 1, 2, 3, 130
+
+
+class ProgressoJSON:
+    """
+    Um objeto JSON por linha no stdout: {"evento": ..., "ts": ..., "job": n, ...}.
+    Eventos: log, progresso, job_inicio, job_fim, fim.
+    """
+
+    def __init__(self, saida=None, logs=True):
+        self.saida = saida or sys.stdout
+        self.logs  = logs
+        self.job   = None
+        self._lock = threading.Lock()
+
+    def emitir(self, evento, **campos):
+        obj = {"evento": evento, "ts": round(time.time(), 3)}
+        if self.job is not None:
+            obj["job"] = self.job
+        obj.update(campos)
+        linha = json.dumps(obj, ensure_ascii=False, default=str)
+        with self._lock:
+            self.saida.write(linha + "\n")
+            self.saida.flush()
 
     def log(self, msg, tag="info"):
-        ts = datetime.now().strftime("%H:%M:%S")
-        self.txt.config(state="normal")
-        self.txt.insert("end", f"[{ts}] {msg}\n", tag)
-        self.txt.see("end")
-        self.txt.config(state="disabled")
-
-    def set_progress(self, val, texto=""):
-        self.prog_var.set(val)
-        if texto: self.lbl_prog.config(text=texto)
-
-    def _iniciar(self):
-        if not self.keywords_list:
-            messagebox.showwarning("Atenção","Adicione pelo menos uma palavra-chave!")
-            return
-        ph  = "Ex: Ceará, Tokyo Japan, New York USA, Caçapava SP"
-        reg = self.ent_reg.get().strip()
-        if not reg or reg == ph:
-            messagebox.showwarning("Atenção","Digite a região para a busca!")
-            return
-        try:
-            min_stars = float(self.sp_stars.get())
-            min_revs  = int(self.sp_rev.get())
-            meta      = int(self.sp_max.get())
-            workers   = int(self.sp_workers.get())
-        except ValueError:
-            messagebox.showerror("Erro","Valores inválidos nos filtros."); return
-        headless = self.var_headless.get()
-
-        self.btn_start.config(state="disabled")
-        self.btn_stop.config(state="normal")
-        self.prog_var.set(0)
-        self.lbl_prog.config(text="Iniciando Chrome...")
-
-        self.log("═"*55, "system")
-        self.log(f"🚀 {len(self.keywords_list)} keyword(s) | Região: {reg}", "system")
-        self.log(f"   Filtros: ≥{min_stars}⭐ | ≥{min_revs} aval. | Meta: {meta}/kw | Workers: {workers}{'  headless' if headless else ''}", "system")
-        self.log("═"*55, "system")
-
-        self.scraper = MapsScraper(
-            log_cb      = lambda m, t="info": self.after(0, self.log, m, t),
-            progress_cb = lambda v, t: self.after(0, self.set_progress, v, t),
-        )
+        if self.logs or tag == "erro":
+            self.emitir("log", nivel=tag, msg=str(msg).strip())
 
-        def run():
-            self.scraper.scrape(
-                keywords    = self.keywords_list[:],
-                regiao      = reg,
-                min_stars   = min_stars,
-                min_reviews = min_revs,
-                meta_por_kw = meta,
-                save_path   = self.save_path.get(),
-                num_workers = workers,
-                headless    = headless,
-            )
-            self.after(0, self._done)
-
-        self.thread = threading.Thread(target=run, daemon=True)
-        self.thread.start()
-
-    def _parar(self):
-        if self.scraper:
-            self.scraper.stop()
-            self.log("⏹ Parando após empresa atual...", "warn")
-            self.btn_stop.config(state="disabled")
-
-    def _done(self):
-        self.btn_start.config(state="normal")
-        self.btn_stop.config(state="disabled")
-        n = len(self.scraper.results) if self.scraper else 0
-        self.log("═"*55, "system")
-        self.log(f"🎉 Concluído! {n} empresas aprovadas na planilha.", "ok")
-        if n > 0:
-            self.log(f"📁 {self.save_path.get()}", "ok")
-            messagebox.showinfo("Pronto!",
-                f"✅ {n} empresas aprovadas!\n\n📁 Salvo em:\n{self.save_path.get()}")
-
-    def _check_deps(self):
-        if MISSING:
-            self.log("⚠  DEPENDÊNCIAS FALTANDO:", "erro")
-            self.log(f"   pip install {' '.join(MISSING)}", "warn")
-        else:
-            self.log("✅ Dependências OK.", "ok")
-            self.log("💡 O número que você define é a META de aprovados na planilha.", "sub")
-            self.log("   O programa vasculha quantos estabelecimentos forem necessários.", "sub")
+    def progresso(self, pct, texto=""):
+        self.emitir("progresso", pct=round(pct, 1), texto=texto)
+
+
+def carregar_jobs(caminho, headless=True):
+    """
+    Lê o arquivo de jobs (JSON) e expande keywords × regiões em chamadas de
+    scrape(). Formatos aceitos: uma lista de jobs, um job só, ou
+    {"padrao": {...}, "jobs": [...]}. Cada job usa os nomes dos parâmetros
+    de MapsScraper.scrape, mais:
+      - "regioes": lista — vira um job por região
+      - "saida":   alias de save_path; aceita {regiao} e {n} no nome
+    Levanta ValueError com a mensagem do primeiro problema encontrado.
+    """
+    dados = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    if isinstance(dados, list):
+        padrao, jobs = {}, dados
+    elif isinstance(dados, dict) and "jobs" in dados:
+        padrao, jobs = dados.get("padrao") or {}, dados["jobs"]
+    else:
+        padrao, jobs = {}, [dados]
+
+    import inspect
+
+    validos = set(inspect.signature(MapsScraper.scrape).parameters) - {"self", "retomar"}
+    expandidos = []
+    for i, job in enumerate(jobs, 1):
+        job = {"headless": headless, **padrao, **job}
+        regioes = job.pop("regioes", None) or [job.pop("regiao", None)]
+        job.pop("regiao", None)
+        saida = job.pop("saida", None) or job.pop("save_path", None) or "resultado_{regiao}.xlsx"
+        desconhecidos = set(job) - validos
+        if desconhecidos:
+            raise ValueError(f"job {i}: campo(s) desconhecido(s): {', '.join(sorted(desconhecidos))}")
+        if not job.get("keywords") or not isinstance(job["keywords"], list):
+            raise ValueError(f"job {i}: 'keywords' deve ser uma lista não vazia")
+        ritmo = job.get("ritmo")
+        if ritmo is not None and (isinstance(ritmo, bool) or not isinstance(ritmo, (int, float)) or ritmo < 0):
+            raise ValueError(f"job {i}: 'ritmo' deve ser um número ≥ 0")
+        if job.get("navegacao") not in (None, *MapsScraper.NAVEGACOES):
+            raise ValueError(f"job {i}: 'navegacao' deve ser um de: {', '.join(MapsScraper.NAVEGACOES)}")
+        if job.get("bloqueio") not in (None, "auto", *PERFIS_BLOQUEIO):
+            raise ValueError(f"job {i}: 'bloqueio' deve ser um de: auto, {', '.join(PERFIS_BLOQUEIO)}")
+        for regiao in regioes:
+            if not regiao:
+                raise ValueError(f"job {i}: informe 'regiao' ou 'regioes'")
+            slug = re.sub(r"\W+", "_", MapsScraper._norm(regiao)).strip("_")
+            expandidos.append({
+                "min_stars": 0, "min_reviews": 0, "meta_por_kw": 50,
+                **job, "regiao": regiao,
+                "save_path": str(saida).format(regiao=slug, n=len(expandidos) + 1),
+            })
+    return expandidos
+
+
+def executar_jobs(jobs, progresso, scraper=None, rodar=None):
+    """
+    Roda os jobs em sequência no mesmo processo e no mesmo MapsScraper:
+    o pool de Chromes, o chromedriver resolvido e os caches (histórico,
+    geocodificação, e-mail) passam de um job para o outro.
+    SIGINT/SIGTERM param o job atual de forma limpa (saída e diário em dia).
+    rodar(scraper, job) troca o scrape local (ex.: coordenar na FilaLeases).
+    """
+    scraper = scraper or MapsScraper(log_cb=progresso.log, progress_cb=progresso.progresso)
+    falhas = 0
+
+    def parar(signum, frame):
+        progresso.emitir("sinal", sinal=signum)
+        scraper.stop()
+
+    anteriores = {sig: signal.signal(sig, parar)
+                  for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for i, job in enumerate(jobs, 1):
+            progresso.job = i
+            progresso.emitir("job_inicio", total=len(jobs), keywords=job["keywords"],
+                             regiao=job["regiao"], save_path=job["save_path"])
+            t0 = time.time()
             try:
-                db = HistoricoDB()
-                total = db.total()
-                db.close()
-                self.log(f"📦 Histórico: {total} empresa(s) já capturadas (não serão repetidas).", "sub")
-            except Exception:
-                pass
+                if rodar is not None:
+                    rodar(scraper, job)
+                elif "retomar" in job:
+                    scraper.retomar(job["retomar"], **{k: v for k, v in job.items() if k != "retomar"})
+                else:
+                    scraper.scrape(**job)
+                progresso.emitir("job_fim", ok=True, execucao=scraper.execucao,
+                                 aprovados=scraper.emitidos, interrompido=scraper.stop_flag,
+                                 segundos=round(time.time() - t0, 1))
+            except Exception as e:
+                falhas += 1
+                progresso.emitir("job_fim", ok=False, erro=str(e),
+                                 segundos=round(time.time() - t0, 1))
+            if scraper.stop_flag:
+                break
+    finally:
+        for sig, handler in anteriores.items():
+            signal.signal(sig, handler)
+        progresso.job = None
+
+    if scraper.stop_flag:
+        codigo = EXIT_INTERROMPIDO
+    else:
+        codigo = EXIT_FALHA if falhas else EXIT_OK
+    progresso.emitir("fim", jobs=len(jobs), falhas=falhas, codigo=codigo)
+    return codigo
+
+
+def main(argv=None):
+    """
+    Sem argumentos abre a interface gráfica, como antes. Subcomandos:
+      jobs ARQUIVO.json     roda os jobs (headless por padrão; --janela mostra o Chrome)
+      retomar RUN_ID        continua uma execução interrompida
+      execucoes             lista as execuções do diário
+      exportar JSONL DEST   gera .xlsx/.parquet/.arrow/.csv.gz a partir da saída
+      coordenador FILA.db ARQUIVO.json   publica os jobs na fila de leases
+      trabalhador FILA.db                processa itens da fila (rode vários)
+    --historico aponta o histórico para outro arquivo (compartilhado entre nós).
+    --metricas PORTA serve /metrics (Prometheus) e /metrics.json em 127.0.0.1.
+    Códigos de saída: 0 ok, 1 algum job falhou, 2 uso/arquivo inválido,
+    3 dependências faltando, 130 interrompido.
+    """
+    import argparse
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        if MISSING:
+            print(f"Instale: pip install {' '.join(MISSING)}")
+        # rodando como script este módulo é __main__; o da GUI importa o mesmo
+        sys.modules.setdefault("maps_scraper_v2", sys.modules[__name__])
+        from maps_scraper_gui import App
+        App().mainloop()
+        return EXIT_OK
+
+    ap  = argparse.ArgumentParser(prog="maps_scraper_v2",
+                                  description="Google Maps Scraper — modo linha de comando")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_jobs = sub.add_parser("jobs", help="roda um arquivo de jobs")
+    p_jobs.add_argument("arquivo")
+    p_ret = sub.add_parser("retomar", help="continua uma execução interrompida")
+    p_ret.add_argument("run_id")
+    for p in (p_jobs, p_ret):
+        p.add_argument("--janela", action="store_true", help="mostra o Chrome (padrão: headless)")
+        p.add_argument("--sem-log", action="store_true", help="só eventos de progresso e erros")
+    p_coord = sub.add_parser("coordenador", help="modo distribuído: publica os jobs e recolhe")
+    p_coord.add_argument("fila")
+    p_coord.add_argument("arquivo")
+    p_trab = sub.add_parser("trabalhador", help="modo distribuído: processa itens da fila")
+    p_trab.add_argument("fila")
+    p_trab.add_argument("--nome", default=None)
+    p_trab.add_argument("--tipos", default="keyword,ficha")
+    p_trab.add_argument("--lease", type=float, default=120, help="segundos de lease")
+    p_trab.add_argument("--ocioso", type=float, default=0,
+                        help="encerra após N s sem itens (0 = nunca)")
+    for p in (p_jobs, p_ret, p_coord, p_trab):
+        p.add_argument("--historico", default=None, help="arquivo SQLite do histórico")
+        p.add_argument("--metricas", type=int, default=None, metavar="PORTA",
+                       help="serve /metrics e /metrics.json nesta porta (0 = livre)")
+    for p in (p_coord, p_trab):
+        p.add_argument("--janela", action="store_true", help="mostra o Chrome (padrão: headless)")
+        p.add_argument("--sem-log", action="store_true", help="só eventos de progresso e erros")
+    sub.add_parser("execucoes", help="lista as execuções do diário")
+    p_exp = sub.add_parser("exportar", help="gera planilha/colunar a partir do .jsonl de saída")
+    p_exp.add_argument("jsonl")
+    p_exp.add_argument("destino")
+    p_exp.add_argument("--execucao", default=None)
+    args = ap.parse_args(argv)
+
+    progresso = ProgressoJSON(logs=not getattr(args, "sem_log", False))
+    if getattr(args, "historico", None):
+        HistoricoDB.DB_FILE = Path(args.historico)
+    metricas = None
+    if getattr(args, "metricas", None) is not None:
+        metricas = Metricas()
+        try:
+            servidor = ServidorMetricas(metricas, args.metricas)
+        except OSError as e:
+            progresso.emitir("fim", ok=False, erro=f"métricas: {e}", codigo=EXIT_USO)
+            return EXIT_USO
+        progresso.emitir("metricas", url=f"http://127.0.0.1:{servidor.porta}/metrics")
+    novo_scraper = lambda: MapsScraper(log_cb=progresso.log, progress_cb=progresso.progresso,
+                                       metricas=metricas)
+
+    if args.cmd == "trabalhador":
+        if MISSING:
+            progresso.emitir("fim", ok=False, erro=f"pip install {' '.join(MISSING)}", codigo=EXIT_DEPS)
+            return EXIT_DEPS
+        fila    = FilaLeasesSQLite(args.fila)
+        scraper = novo_scraper()
+        anteriores = {sig: signal.signal(sig, lambda signum, frame: scraper.stop())
+                      for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            n = scraper.trabalhar(fila, nome=args.nome, tipos=tuple(args.tipos.split(",")),
+                                  headless=not args.janela, duracao=args.lease,
+                                  ocioso_max=args.ocioso)
+        finally:
+            for sig, handler in anteriores.items():
+                signal.signal(sig, handler)
+        codigo = EXIT_INTERROMPIDO if scraper.stop_flag else EXIT_OK
+        progresso.emitir("fim", itens=n, fila=fila.contagem(), codigo=codigo)
+        return codigo
+
+    if args.cmd == "execucoes":
+        for run_id, estado, criado, atualizado in DiarioExecucao(HistoricoDB.compartilhado()).listar():
+            progresso.emitir("execucao", run_id=run_id, estado=estado,
+                             criado=criado, atualizado=atualizado)
+        return EXIT_OK
+
+    if args.cmd == "exportar":
+        try:
+            n = MapsScraper(log_cb=progresso.log).exportar_saida(args.jsonl, args.destino, args.execucao)
+        except Exception as e:
+            progresso.emitir("fim", ok=False, erro=str(e), codigo=EXIT_FALHA)
+            return EXIT_FALHA
+        progresso.emitir("fim", ok=True, linhas=n, destino=args.destino, codigo=EXIT_OK)
+        return EXIT_OK
+
+    if args.cmd == "retomar":
+        spec = DiarioExecucao(HistoricoDB.compartilhado()).spec(args.run_id)
+        if spec is None:
+            progresso.emitir("fim", ok=False, erro=f"execução {args.run_id!r} não encontrada",
+                             codigo=EXIT_USO)
+            return EXIT_USO
+        if spec.get("distribuido"):
+            progresso.emitir("fim", ok=False, codigo=EXIT_USO,
+                             erro=f"execução {args.run_id!r} é distribuída — rode o coordenador de novo")
+            return EXIT_USO
+        jobs = [{"retomar": args.run_id, "keywords": spec["keywords"], "regiao": spec["regiao"],
+                 "save_path": spec["save_path"], "headless": not args.janela}]
+    else:
+        try:
+            jobs = carregar_jobs(args.arquivo, headless=not args.janela)
+        except (OSError, ValueError) as e:
+            progresso.emitir("fim", ok=False, erro=str(e), codigo=EXIT_USO)
+            return EXIT_USO
 
+    if args.cmd == "coordenador":
+        # Coordenador não abre Chrome — só publica, recolhe e exporta
+        fila = FilaLeasesSQLite(args.fila)
+        return executar_jobs(jobs, progresso, novo_scraper(),
+                             rodar=lambda sc, job: sc.coordenar(fila, **job))
 
-if __name__ == "__main__":
     if MISSING:
-        print(f"Instale: pip install {' '.join(MISSING)}")
-    App().mainloop()
\ No newline at end of file
+        progresso.emitir("fim", ok=False, erro=f"pip install {' '.join(MISSING)}", codigo=EXIT_DEPS)
+        return EXIT_DEPS
+    return executar_jobs(jobs, progresso, novo_scraper())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
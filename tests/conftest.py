@@ -0,0 +1,95 @@
+"""
+Ambiente comum dos testes: o módulo da raiz no sys.path, um histórico
+temporário (nenhum teste toca o scraper_historico.db versionado), as
+páginas de tests/fixtures servidas por HTTP local e um Chrome headless
+opcional — os testes de navegador são pulados se ele não subir.
+
+Chrome/chromedriver fora do PATH: MAPS_SCRAPER_CHROME aponta o binário do
+navegador e MAPS_SCRAPER_CHROMEDRIVER o do driver (a mesma variável do app).
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+RAIZ     = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(RAIZ))
+
+import maps_scraper_v2 as ms  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def historico_temporario(tmp_path, monkeypatch):
+    monkeypatch.setattr(ms.HistoricoDB, "DB_FILE", tmp_path / "historico.db")
+    monkeypatch.setattr(ms.HistoricoDB, "_compartilhado", None)
+    yield
+    if ms.HistoricoDB._compartilhado is not None:
+        ms.HistoricoDB._compartilhado.close()
+
+
+@pytest.fixture(scope="session")
+def esperado():
+    """{pagina: {"feature_id": ..., "ficha": dict de _extrair_ficha}}."""
+    return json.loads((FIXTURES / "fichas_esperadas.json").read_text(encoding="utf-8"))
+
+
+class _Silencioso(SimpleHTTPRequestHandler):
+    pedidos = []                 # (caminho com query, time.time()) de cada GET
+
+    def do_GET(self):
+        _Silencioso.pedidos.append((self.path, time.time()))
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def servidor_fixtures():
+    """
+    URL base (http://127.0.0.1:PORTA/) servindo tests/fixtures. A query é
+    ignorada na hora de achar o arquivo; os GETs ficam em pedidos_fixtures.
+    """
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Silencioso, directory=str(FIXTURES)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def pedidos_fixtures():
+    """Lista (caminho, instante) dos GETs feitos ao servidor_fixtures neste teste."""
+    _Silencioso.pedidos.clear()
+    return _Silencioso.pedidos
+
+
+@pytest.fixture(scope="session")
+def chrome():
+    if ms.MISSING:
+        pytest.skip(f"faltam dependências: {' '.join(ms.MISSING)}")
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    opts = webdriver.ChromeOptions()
+    for arg in ("--headless=new", "--no-sandbox", "--disable-dev-shm-usage",
+                "--disable-gpu", f"--user-data-dir={tempfile.mkdtemp(prefix='maps-teste-')}"):
+        opts.add_argument(arg)
+    if os.environ.get("MAPS_SCRAPER_CHROME"):
+        opts.binary_location = os.environ["MAPS_SCRAPER_CHROME"]
+    driver_fixo = os.environ.get(ms.ResolvedorChromedriver.ENV_FIXO)
+    try:
+        driver = webdriver.Chrome(service=Service(driver_fixo) if driver_fixo else None, options=opts)
+    except Exception as e:
+        pytest.skip(f"Chrome indisponível: {str(e).splitlines()[0]}")
+    driver.set_script_timeout(30)
+    yield driver
+    driver.quit()
@@ -0,0 +1,73 @@
+"""DiarioExecucao: o detalhe de retomada não fica para sempre no histórico."""
+import maps_scraper_v2 as ms
+
+REGISTRO = {"URL Maps": "https://www.google.com/maps/place/a", "Nome": "A"}
+
+
+def diario_com_execucao(run_id="r1"):
+    diario = ms.DiarioExecucao(ms.HistoricoDB.compartilhado())
+    diario.iniciar(run_id, {"keywords": ["padaria"]})
+    diario.varrido(run_id, "padaria", "z15", 3)
+    diario.enfileirados(run_id, "padaria", [("https://www.google.com/maps/place/b", 1.0, {})])
+    diario.aprovado(run_id, "padaria", REGISTRO)
+    return diario
+
+
+def linhas(diario, run_id="r1"):
+    return [diario._consultar(f"SELECT COUNT(*) FROM {t} WHERE run_id = ?", (run_id,))[0][0]
+            for t in diario.DETALHE]
+
+
+def test_concluida_apaga_o_detalhe():
+    diario = diario_com_execucao()
+    diario.finalizar("r1", "concluida")
+    assert linhas(diario) == [0, 0, 0]
+    assert [r[:2] for r in diario.listar()] == [("r1", "concluida")]
+
+
+def test_interrompida_mantem_o_detalhe():
+    diario = diario_com_execucao()
+    diario.finalizar("r1", "interrompida")
+    assert linhas(diario) == [1, 1, 1]
+    kws, pendentes = diario.estado("r1")
+    assert pendentes == [REGISTRO] and kws["padaria"]["varreduras"] == {"z15": 3}
+
+
+def test_interrompida_antiga_expira():
+    db = ms.HistoricoDB.compartilhado()
+    diario = diario_com_execucao()
+    diario.finalizar("r1", "interrompida")
+    diario.iniciar("r2", {})
+    db.descarregar()
+    with db._lock:
+        db.conn.execute("UPDATE execucoes SET atualizado = '2000-01-01 00:00:00' WHERE run_id = 'r1'")
+        db.conn.commit()
+
+    diario = ms.DiarioExecucao(db)
+    assert linhas(diario) == [0, 0, 0]
+    assert diario.situacao("r1") == "expirada"
+    assert diario.situacao("r2") == "rodando"
+
+
+def test_retomar_concluida_nao_refaz():
+    diario_com_execucao().finalizar("r1", "concluida")
+    logs = []
+    scraper = ms.MapsScraper(log_cb=lambda m, t="info": logs.append(m))
+    assert scraper.retomar("r1") == []
+    assert "nada a retomar" in logs[-1]
+
+
+def test_retomar_distribuida_recusa(capsys):
+    # spec do coordenar: tem "distribuido", que scrape() não aceita
+    diario = ms.DiarioExecucao(ms.HistoricoDB.compartilhado())
+    diario.iniciar("d1", {"keywords": ["padaria"], "regiao": "Centro, SP", "min_stars": 0,
+                          "min_reviews": 0, "meta_por_kw": 5, "save_path": "",
+                          "distribuido": True})
+    diario.finalizar("d1", "interrompida")
+    logs = []
+    scraper = ms.MapsScraper(log_cb=lambda m, t="info": logs.append(m))
+    assert scraper.retomar("d1") == []
+    assert "distribuída" in logs[-1]
+
+    assert ms.main(["retomar", "d1"]) == ms.EXIT_USO
+    assert "distribuída" in capsys.readouterr().out
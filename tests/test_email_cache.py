@@ -0,0 +1,71 @@
+"""Cache de e-mail por domínio: o que vira negativo e contadores por execução."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+pytestmark = pytest.mark.skipif(bool(ms.MISSING), reason="requests/bs4 não instalados")
+
+
+class Site(BaseHTTPRequestHandler):
+    status = 200
+    visitas = 0
+
+    def do_GET(self):
+        Site.visitas += 1
+        corpo = b'<a href="mailto:contato@loja.com.br">fale conosco</a>' if self.status == 200 else b""
+        self.send_response(self.status)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    Site.visitas = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Site)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def buscar_duas_vezes(url, status):
+    Site.status = status
+    scraper = ms.MapsScraper(log_cb=lambda *a: None)
+    primeira = scraper._email_do_site(url)
+    scraper.db.descarregar()
+    segunda = scraper._email_do_site(url)
+    return primeira, segunda, scraper
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_erro_passageiro_nao_vira_negativo(site, status):
+    assert buscar_duas_vezes(site, status)[:2] == ("", "")
+    assert Site.visitas == 2
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_pagina_inexistente_vira_negativo(site, status):
+    assert buscar_duas_vezes(site, status)[:2] == ("", "")
+    assert Site.visitas == 1
+
+
+def test_email_achado_fica_em_cache(site):
+    primeira, segunda, scraper = buscar_duas_vezes(site, 200)
+    assert primeira == segunda == "contato@loja.com.br"
+    assert Site.visitas == 1
+    assert (scraper.email_hits, scraper.email_misses) == (1, 1)
+
+
+def test_contadores_sao_do_scraper(site):
+    _, _, primeiro = buscar_duas_vezes(site, 200)
+    segundo = ms.MapsScraper(log_cb=lambda *a: None)
+    segundo._email_do_site(site)
+    assert (segundo.email_hits, segundo.email_misses) == (1, 0)
+    assert (primeiro.email_hits, primeiro.email_misses) == (1, 1)
@@ -0,0 +1,72 @@
+"""exportar_colunar: CSV.gz, Parquet e Arrow com Estrelas float e Avaliações int."""
+import csv
+import gzip
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+REGISTROS = [
+    {"Nome": "Padaria", "Estrelas": 4.6, "Avaliações": 120, "URL Maps": "https://www.google.com/maps/place/a"},
+    {"Nome": "Oficina", "Estrelas": "4.1", "Avaliações": "7", "Telefone": "(11) 3285-1234"},
+    {"Nome": "Salão", "Estrelas": "", "Avaliações": None},
+]
+
+
+def test_csv_gz(tmp_path):
+    destino = tmp_path / "saida.csv.gz"
+    assert ms.exportar_colunar(iter(REGISTROS), destino) == 3
+
+    with gzip.open(destino, "rt", encoding="utf-8", newline="") as arq:
+        cab, *linhas = list(csv.reader(arq))
+    assert cab == ms.COLUNAS_SAIDA
+    col = {c: [l[i] for l in linhas] for i, c in enumerate(cab)}
+    assert col["Estrelas"] == ["4.6", "4.1", ""]
+    assert col["Avaliações"] == ["120", "7", ""]          # int, não "7.0"
+    assert col["Nome"] == ["Padaria", "Oficina", "Salão"]
+
+
+@pytest.mark.parametrize("nome, compressao", [
+    ("saida.parquet", "zstd"),
+    ("saida.parquet", None),
+    ("saida.arrow", "lz4"),
+    ("saida.feather", None),
+])
+def test_pyarrow(tmp_path, nome, compressao):
+    pa = pytest.importorskip("pyarrow")
+    destino = tmp_path / nome
+    # lote=2: o último lote sai incompleto no fechamento
+    assert ms.exportar_colunar(iter(REGISTROS), destino, compressao=compressao, lote=2) == 3
+
+    if destino.suffix == ".parquet":
+        tabela = pytest.importorskip("pyarrow.parquet").read_table(destino)
+    else:
+        with pa.memory_map(str(destino)) as fonte:
+            tabela = pa.ipc.open_file(fonte).read_all()
+    assert tabela.column_names == ms.COLUNAS_SAIDA
+    assert tabela.schema.field("Estrelas").type == pa.float64()
+    assert tabela.schema.field("Avaliações").type == pa.int64()
+    assert tabela.schema.field("Nome").type == pa.string()
+    assert tabela.column("Estrelas").to_pylist() == [4.6, 4.1, None]
+    assert tabela.column("Avaliações").to_pylist() == [120, 7, None]
+    assert tabela.column("Telefone").to_pylist() == ["", "(11) 3285-1234", ""]
+
+
+def test_vazio(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    destino = tmp_path / "saida.arrow"
+    assert ms.exportar_colunar(iter([]), destino) == 0
+    with pa.memory_map(str(destino)) as fonte:
+        assert pa.ipc.open_file(fonte).read_all().num_rows == 0
+
+
+def test_arrow_compressao_invalida(tmp_path):
+    # Arrow IPC não tem gzip: antes gravava sem compressão, calado
+    with pytest.raises(ValueError, match="gzip"):
+        ms.exportar_colunar(iter(REGISTROS), tmp_path / "saida.arrow", compressao="gzip")
+    assert not (tmp_path / "saida.arrow").exists()
+
+
+def test_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="formato desconhecido"):
+        ms.exportar_colunar(iter(REGISTROS), tmp_path / "saida.txt")
@@ -0,0 +1,32 @@
+"""Planilha write-only: links como fórmulas =HYPERLINK, não objetos Hyperlink."""
+import pytest
+
+import maps_scraper_v2 as ms
+
+openpyxl = pytest.importorskip("openpyxl")
+
+link = ms.MapsScraper._link_excel
+
+
+def test_link_excel():
+    assert link("https://a.com.br/", "https://a.com.br/") == '=HYPERLINK("https://a.com.br/")'
+    assert link("mailto:x@a.com", "x@a.com") == '=HYPERLINK("mailto:x@a.com","x@a.com")'
+    assert link('https://a.com/?q="x"', "t") == '=HYPERLINK("https://a.com/?q=""x""","t")'
+    longo = "https://a.com/" + "x" * 250
+    assert link(longo, longo) == longo
+
+
+def test_planilha(tmp_path):
+    scraper = ms.MapsScraper.__new__(ms.MapsScraper)
+    scraper.log = lambda *a, **k: None
+    registro = {"Nome": "Padaria", "E-mail": "contato@padaria.com.br", "Telefone": "(11) 3285-1234",
+                "Site": "https://padaria.com.br/", "Estrelas": 4.6, "Avaliações": 10,
+                "URL Maps": "https://www.google.com/maps/place/Padaria"}
+    assert scraper._exportar_excel(tmp_path / "s.xlsx", iter([registro])) == 1
+
+    ws = openpyxl.load_workbook(tmp_path / "s.xlsx")["Empresas"]
+    linha = {cab.value: cel for cab, cel in zip(ws[1], ws[2])}
+    assert linha["Site"].value == '=HYPERLINK("https://padaria.com.br/")'
+    assert linha["E-mail"].value == '=HYPERLINK("mailto:contato@padaria.com.br","contato@padaria.com.br")'
+    assert linha["Nome"].value == "Padaria" and linha["Nome"].hyperlink is None
+    assert not ws._hyperlinks
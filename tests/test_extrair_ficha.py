@@ -0,0 +1,132 @@
+"""
+Paridade do extrator de ficha em um execute_script (JS_FICHA +
+_interpretar_ficha) com o extrator antigo, que fazia uma chamada
+find_element/get_attribute por campo. Roda nas páginas salvas em
+tests/fixtures; precisa de Chrome (pulado sem ele).
+"""
+import re
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+PAGINAS = ["padaria", "oficina", "salao"]
+
+
+def extrator_antigo(d):
+    """_extrair_ficha de antes do JS_FICHA (esperas removidas — página estática)."""
+    By = ms.By
+    page_text = d.find_element(By.TAG_NAME, "body").text
+
+    nome = ""
+    for sel in ["h1", "h1.DUwDvf", "h1.fontHeadlineLarge"]:
+        for el in d.find_elements(By.CSS_SELECTOR, sel):
+            t = el.text.strip()
+            if t and len(t) > 1:
+                nome = t
+                break
+        if nome:
+            break
+
+    categoria = ""
+    for sel in ["button.DkEaL", "button[jsaction*='category']",
+                "span.mgr77e", ".fontBodyMedium button"]:
+        for el in d.find_elements(By.CSS_SELECTOR, sel):
+            t = el.text.strip()
+            if t and len(t) < 80:
+                categoria = t
+                break
+        if categoria:
+            break
+
+    stars = 0.0
+    for sel in ['[aria-label*="estrela"]', '[aria-label*="star"]',
+                '[aria-label*="rating"]', '[aria-label*="nota"]']:
+        for el in d.find_elements(By.CSS_SELECTOR, sel):
+            m = re.search(r'(\d[,.]\d|[1-5])', el.get_attribute("aria-label") or "")
+            if m:
+                v = float(m.group(1).replace(",", "."))
+                if 1.0 <= v <= 5.0:
+                    stars = v
+                    break
+        if stars:
+            break
+    if not stars:
+        m = re.search(r'\b([1-5][,.]\d)\s*\(', page_text)
+        if m:
+            stars = float(m.group(1).replace(",", "."))
+
+    reviews = 0
+    for sel in ['[aria-label*="avalia"]', '[aria-label*="review"]', '[aria-label*="opini"]']:
+        for el in d.find_elements(By.CSS_SELECTOR, sel):
+            lbl = el.get_attribute("aria-label") or ""
+            m = re.search(r'([\d.,]+)\s*(?:avalia|review|opini)', lbl, re.I)
+            if m:
+                v = int(re.sub(r"\D", "", m.group(1)))
+                if v > 0:
+                    reviews = v
+                    break
+        if reviews:
+            break
+    if not reviews:
+        m = re.search(r'\b[1-5][,.]\d\s*\(([\d.,]+)\)', page_text)
+        if not m:
+            m = re.search(r'([\d.]+)\s+avalia', page_text, re.I)
+        if m:
+            reviews = int(re.sub(r"\D", "", m.group(1)))
+
+    endereco = ""
+    els = d.find_elements(By.CSS_SELECTOR, '[data-item-id="address"]')
+    if els:
+        endereco = (els[0].get_attribute("aria-label") or els[0].text).strip()
+        endereco = re.sub(r"(?i)^endere[çc]o[:\s]*", "", endereco).strip()
+    if not endereco:
+        m = re.search(r'(?:Rua|Av(?:enida)?|Al(?:ameda)?|R\.|Estrada|Rod(?:ovia)?|Praça)[^\n]{5,80}',
+                      page_text, re.I)
+        if m:
+            endereco = m.group(0).strip()
+
+    telefone = ""
+    els = d.find_elements(By.CSS_SELECTOR, '[data-item-id^="phone"]')
+    if els:
+        telefone = (els[0].get_attribute("aria-label") or els[0].text).strip()
+        telefone = re.sub(r"(?i)^telefone[:\s]*", "", telefone).strip()
+    if not telefone:
+        m = re.search(r'(?:\+\d{1,3}[\s\-]?)?\(?\d{2,3}\)?[\s\-]?\d{4,5}[\s\-]\d{4}', page_text)
+        if m:
+            telefone = m.group(0).strip()
+
+    site = ""
+    els = d.find_elements(By.CSS_SELECTOR, '[data-item-id="authority"]')
+    if els:
+        site = els[0].get_attribute("href") or ""
+    if not site:
+        for el in d.find_elements(By.CSS_SELECTOR, "a[href^='http']"):
+            href = el.get_attribute("href") or ""
+            if href.startswith("http") and "google" not in href and "maps" not in href:
+                site = href
+                break
+
+    return dict(nome=nome, categoria=categoria, endereco=endereco,
+                telefone=telefone, site=site, stars=stars, reviews=reviews)
+
+
+@pytest.fixture
+def scraper(chrome):
+    w = ms.MapsScraper(log_cb=lambda *a: None, captura=False)
+    w.driver = chrome
+    return w
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_paridade_com_extrator_antigo(scraper, servidor_fixtures, esperado, pagina):
+    scraper.driver.get(f"{servidor_fixtures}ficha_{pagina}.html")
+    novo = scraper._extrair_ficha()
+    assert novo == extrator_antigo(scraper.driver)
+    assert novo == esperado[pagina]["ficha"]
+
+
+def test_site_de_elemento_que_nao_e_link(scraper, servidor_fixtures):
+    # authority num <div href=...>: .href é undefined, getAttribute("href") não
+    scraper.driver.get(f"{servidor_fixtures}ficha_oficina.html")
+    assert scraper._extrair_ficha()["site"] == "https://oficinadojoao.com.br/"
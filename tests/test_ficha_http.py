@@ -0,0 +1,39 @@
+"""
+Backend de ficha "http" (_ficha_http → PayloadMaps.pagina) nas páginas
+salvas em tests/fixtures, servidas por HTTP local: tem de devolver o mesmo
+dict que o backend de navegador (_extrair_ficha) lê do DOM da mesma página.
+"""
+import pytest
+
+import maps_scraper_v2 as ms
+
+pytestmark = pytest.mark.skipif(bool(ms.MISSING), reason="requests não instalado")
+
+PAGINAS = ["padaria", "oficina", "salao"]
+
+
+@pytest.fixture
+def scraper():
+    return ms.MapsScraper(log_cb=lambda *a: None, captura=False)
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_ficha_http(scraper, servidor_fixtures, esperado, pagina):
+    assert scraper._ficha_http(f"{servidor_fixtures}ficha_{pagina}.html") == esperado[pagina]["ficha"]
+
+
+def test_pagina_inexistente(scraper, servidor_fixtures):
+    assert scraper._ficha_http(f"{servidor_fixtures}ficha_nao_existe.html") is None
+
+
+def test_pagina_sem_estado_embutido(scraper, servidor_fixtures):
+    # fichas_esperadas.json não tem APP_INITIALIZATION_STATE → cai para o navegador
+    assert scraper._ficha_http(f"{servidor_fixtures}fichas_esperadas.json") is None
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_igual_ao_backend_navegador(scraper, chrome, servidor_fixtures, pagina):
+    link = f"{servidor_fixtures}ficha_{pagina}.html"
+    scraper.driver = chrome
+    chrome.get(link)
+    assert scraper._ficha_http(link) == scraper._extrair_ficha()
@@ -0,0 +1,111 @@
+"""
+FilaLeasesSQLite com processos de verdade na mesma fila: cada item é
+concluído uma vez só, lease vencido volta para outro trabalhador e o
+item de um trabalhador que morreu é refeito (ou fica "morto" após
+max_tentativas).
+"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+import maps_scraper_v2 as ms
+from conftest import RAIZ
+
+# Processo trabalhador: argv = fila, nome, modo ("drenar" | "morrer"), duração do lease
+TRABALHADOR = """
+import os, sys, time
+sys.path.insert(0, sys.argv[1])
+import maps_scraper_v2 as ms
+fila = ms.FilaLeasesSQLite(sys.argv[2])
+nome, modo, duracao = sys.argv[3], sys.argv[4], float(sys.argv[5])
+if modo == "morrer":
+    item = fila.arrendar(nome, ("ficha",), duracao)
+    print(item["id"], flush=True)
+    os._exit(1)                 # sem concluir, falhar nem fechar a conexão
+feitos = 0
+while (item := fila.arrendar(nome, ("ficha",), duracao)) is not None:
+    time.sleep(0.005)
+    feitos += fila.concluir(item["id"], nome, {"por": nome})
+print(feitos)
+"""
+
+
+def trabalhador(caminho, nome, modo="drenar", duracao=30):
+    return subprocess.Popen([sys.executable, "-c", TRABALHADOR, str(RAIZ), str(caminho), nome, modo,
+                             str(duracao)], stdout=subprocess.PIPE, text=True)
+
+
+@pytest.fixture
+def fila(tmp_path):
+    f = ms.FilaLeasesSQLite(tmp_path / "fila.db")
+    yield f
+    f.close()
+
+
+def publicar(fila, n):
+    for i in range(n):
+        assert fila.publicar("ficha", {"i": i}, f"ficha:{i}", grupo="run:kw")
+
+
+def test_dois_processos_cada_item_uma_vez(fila):
+    publicar(fila, 200)
+    procs = [trabalhador(fila.caminho, nome) for nome in ("a", "b")]
+    feitos = [int(p.communicate(timeout=60)[0]) for p in procs]
+
+    assert sum(feitos) == 200
+    res = fila.resultados()
+    assert sorted(carga["i"] for _, _, _, carga, _ in res) == list(range(200))
+    assert {r["por"] for *_, r in res} == {"a", "b"}          # os dois trabalharam
+    assert fila.contagem() == {"feito": 200}
+    assert fila.abertos("run:") == 0
+
+
+def test_lease_vencido_volta_para_outro(fila):
+    publicar(fila, 1)
+    item = fila.arrendar("a", ("ficha",), duracao=0.2)
+    assert fila.arrendar("b", ("ficha",)) is None
+    time.sleep(0.3)
+
+    de_novo = fila.arrendar("b", ("ficha",))
+    assert (de_novo["id"], de_novo["tentativas"]) == (item["id"], 2)
+    assert not fila.renovar(item["id"], "a")
+    assert not fila.concluir(item["id"], "a", {"por": "a"})
+    assert fila.concluir(item["id"], "b", {"por": "b"})
+    assert [r for *_, r in fila.resultados()] == [{"por": "b"}]
+
+
+def test_trabalhador_que_morre(fila):
+    publicar(fila, 1)
+    p = trabalhador(fila.caminho, "morto", modo="morrer", duracao=0.3)
+    p.communicate(timeout=60)
+    assert p.returncode == 1
+    assert fila.contagem() == {"arrendado": 1}
+
+    time.sleep(0.4)
+    sobrevivente = trabalhador(fila.caminho, "vivo")
+    assert int(sobrevivente.communicate(timeout=60)[0]) == 1
+    assert [(carga["i"], r) for _, _, _, carga, r in fila.resultados()] == [(0, {"por": "vivo"})]
+    assert fila.arrendar("x", ("ficha",)) is None
+
+
+def test_morre_sempre_vira_morto(fila):
+    publicar(fila, 1)
+    for _ in range(fila.max_tentativas):
+        p = trabalhador(fila.caminho, "morto", modo="morrer", duracao=0.1)
+        p.communicate(timeout=60)
+        time.sleep(0.15)
+    assert fila.arrendar("vivo", ("ficha",)) is None
+    assert fila.contagem() == {"morto": 1}
+
+
+def test_backend_incompleto_nao_instancia():
+    class SoPublica(ms.FilaLeases):
+        def publicar(self, tipo, carga, chave, grupo="", prioridade=0.0):
+            return True
+
+    with pytest.raises(TypeError, match="abstract"):
+        SoPublica()
+    with pytest.raises(TypeError):
+        ms.FilaLeases()
@@ -0,0 +1,64 @@
+"""
+Geocodificador contra um Nominatim local (tests/fixtures/nominatim.json):
+memória do processo, geocache no histórico e o intervalo entre requisições.
+NOMINATIM_URL é lido na importação, então o servidor entra pelo url=.
+"""
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+pytestmark = pytest.mark.skipif(bool(ms.MISSING), reason="requests não instalado")
+
+SE = {"lat": -23.5506507, "lon": -46.6333824,
+      "bbox": [-23.5606507, -23.5406507, -46.6433824, -46.6233824],
+      "display_name": "Sé, São Paulo, Região Metropolitana de São Paulo, Brasil"}
+
+
+@pytest.fixture(autouse=True)
+def memoria_limpa(monkeypatch):
+    # memória e relógio da rede são do processo (atributos de classe)
+    monkeypatch.setattr(ms.Geocodificador, "_memo", {})
+    monkeypatch.setattr(ms.Geocodificador, "_ultima_req", 0.0)
+
+
+@pytest.fixture
+def nominatim(servidor_fixtures):
+    return servidor_fixtures + "nominatim.json"
+
+
+def consultas(pedidos):
+    return [parse_qs(urlsplit(c).query)["q"][0] for c, _ in pedidos if c.startswith("/nominatim.json")]
+
+
+def test_memoria_evita_segunda_requisicao(nominatim, pedidos_fixtures):
+    geo = ms.Geocodificador(ms.HistoricoDB.compartilhado(), url=nominatim)
+    assert geo.geocodificar("Sé, São Paulo") == SE
+    # mesma chave normalizada: sem acento, minúsculo, espaços uniformes
+    assert geo.geocodificar("  se ,  SAO   paulo") == SE
+    assert consultas(pedidos_fixtures) == ["Sé, São Paulo"]
+
+
+def test_geocache_persiste_entre_instancias(nominatim, pedidos_fixtures, monkeypatch):
+    db = ms.HistoricoDB.compartilhado()
+    ms.Geocodificador(db, url=nominatim).geocodificar("Sé, São Paulo")
+    db.close()
+
+    # outro processo: memória vazia, histórico reaberto do disco
+    monkeypatch.setattr(ms.Geocodificador, "_memo", {})
+    monkeypatch.setattr(ms.HistoricoDB, "_compartilhado", None)
+    geo = ms.Geocodificador(ms.HistoricoDB.compartilhado(), url=nominatim)
+    assert geo.geocodificar("Sé, São Paulo") == SE
+    assert len(consultas(pedidos_fixtures)) == 1
+
+
+def test_uma_requisicao_por_segundo(nominatim, pedidos_fixtures):
+    geo = ms.Geocodificador(ms.HistoricoDB.compartilhado(), url=nominatim)
+    regioes = ["Sé, São Paulo", "Moema, São Paulo", "Centro, Campinas"]
+    assert all(v == SE for v in geo.geocodificar_lote(regioes).values())
+
+    instantes = [t for c, t in pedidos_fixtures if c.startswith("/nominatim.json")]
+    assert consultas(pedidos_fixtures) == regioes
+    # o intervalo conta do fim da requisição anterior, então o servidor vê >= 1 s
+    assert all(b - a >= 0.99 for a, b in zip(instantes, instantes[1:]))
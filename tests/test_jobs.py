@@ -0,0 +1,41 @@
+"""Arquivo de jobs da linha de comando (carregar_jobs): campos de execução."""
+import json
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+
+def carregar(tmp_path, **campos):
+    arquivo = tmp_path / "jobs.json"
+    arquivo.write_text(json.dumps({"keywords": ["padaria"], "regiao": "Centro, SP", **campos}),
+                       encoding="utf-8")
+    return ms.carregar_jobs(arquivo)
+
+
+def test_ritmo_chega_ao_scrape(tmp_path):
+    assert carregar(tmp_path, ritmo=0.5)[0]["ritmo"] == 0.5
+    assert "ritmo" not in carregar(tmp_path)[0]
+
+
+@pytest.mark.parametrize("ritmo", [-1, "rapido", True])
+def test_ritmo_invalido(tmp_path, ritmo):
+    with pytest.raises(ValueError, match="ritmo"):
+        carregar(tmp_path, ritmo=ritmo)
+
+
+def test_campo_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="desconhecido"):
+        carregar(tmp_path, velocidade=2)
+
+
+def test_navegacao(tmp_path):
+    assert carregar(tmp_path, navegacao="historico")[0]["navegacao"] == "historico"
+    with pytest.raises(ValueError, match="navegacao"):
+        carregar(tmp_path, navegacao="voltar")
+
+
+def test_bloqueio(tmp_path):
+    assert carregar(tmp_path, bloqueio="sem_mapa")[0]["bloqueio"] == "sem_mapa"
+    with pytest.raises(ValueError, match="bloqueio"):
+        carregar(tmp_path, bloqueio="tudo")
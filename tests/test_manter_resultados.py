@@ -0,0 +1,35 @@
+"""scrape(manter_resultados=None): registros em memória só sem arquivo de saída."""
+import pytest
+
+import maps_scraper_v2 as ms
+
+pytestmark = pytest.mark.skipif(bool(ms.MISSING), reason="dependências não instaladas")
+
+
+@pytest.fixture(autouse=True)
+def sem_geocodificacao(monkeypatch):
+    # scrape() geocodifica a região antes de olhar as keywords — nada de Nominatim
+    monkeypatch.setattr(ms.MapsScraper, "_geocodificar", lambda self, regiao: None)
+
+
+def rodar(tmp_path, save_path, **kw):
+    # sem keywords o scrape não abre o Chrome — só prepara saída e diário
+    scraper = ms.MapsScraper(log_cb=lambda *a: None)
+    scraper.scrape([], "Centro, SP", 0, 0, 1, save_path=save_path and str(tmp_path / save_path), **kw)
+    return scraper
+
+
+@pytest.mark.parametrize("save_path, manter, esperado", [
+    ("saida.xlsx", None, False),
+    ("",           None, True),
+    ("saida.xlsx", True, True),
+    ("",           False, False),
+])
+def test_padrao_depende_da_saida(tmp_path, save_path, manter, esperado):
+    assert rodar(tmp_path, save_path, manter_resultados=manter).manter_resultados is esperado
+
+
+def test_com_saida_nao_acumula(tmp_path):
+    scraper = rodar(tmp_path, "saida.xlsx")
+    scraper._emitir({"URL Maps": "https://www.google.com/maps/place/x"})
+    assert scraper.emitidos == 1 and scraper.results == []
@@ -0,0 +1,105 @@
+"""Metricas (texto Prometheus e JSON), MetricasNulas e o ServidorMetricas."""
+import inspect
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import maps_scraper_v2 as ms
+
+P = ms.Metricas.PREFIXO
+
+
+@pytest.fixture
+def metricas():
+    m = ms.Metricas()
+    m.inc("aprovados_total", keyword="padaria")
+    m.inc("aprovados_total", 2, keyword="padaria")
+    m.inc("rejeicoes_total", motivo="regiao", keyword='a "b"')
+    m.definir("fila_links", 7, keyword="padaria")
+    m.observar("etapa_segundos", 0.03, etapa="extrair", worker="W1")
+    m.observar("etapa_segundos", 0.2, etapa="extrair", worker="W1")
+    m.observar("etapa_segundos", 99.0, etapa="extrair", worker="W1")
+    return m
+
+
+def test_prometheus(metricas):
+    linhas = metricas.prometheus().splitlines()
+    assert f"# TYPE {P}aprovados_total counter" in linhas
+    assert f'{P}aprovados_total{{keyword="padaria"}} 3' in linhas
+    assert f'{P}rejeicoes_total{{keyword="a \\"b\\"",motivo="regiao"}} 1' in linhas
+    assert f"# TYPE {P}fila_links gauge" in linhas
+    assert f'{P}fila_links{{keyword="padaria"}} 7' in linhas
+
+    assert f"# TYPE {P}etapa_segundos histogram" in linhas
+    rot = 'etapa="extrair",worker="W1"'
+    assert f'{P}etapa_segundos_bucket{{{rot},le="0.01"}} 0' in linhas
+    assert f'{P}etapa_segundos_bucket{{{rot},le="0.05"}} 1' in linhas
+    assert f'{P}etapa_segundos_bucket{{{rot},le="0.25"}} 2' in linhas
+    assert f'{P}etapa_segundos_bucket{{{rot},le="30.0"}} 2' in linhas
+    assert f'{P}etapa_segundos_bucket{{{rot},le="+Inf"}} 3' in linhas
+    assert f"{P}etapa_segundos_sum{{{rot}}} 99.230000" in linhas
+    assert f"{P}etapa_segundos_count{{{rot}}} 3" in linhas
+    # buckets cumulativos, do menor para o +Inf
+    cont = [int(l.rsplit(" ", 1)[1]) for l in linhas if l.startswith(f"{P}etapa_segundos_bucket")]
+    assert len(cont) == len(ms.Metricas.BUCKETS) + 1 and cont == sorted(cont)
+    # um HELP/TYPE por métrica, não por série
+    assert sum(l.startswith(f"# TYPE {P}aprovados_total") for l in linhas) == 1
+
+
+def test_instantaneo(metricas):
+    foto = json.loads(json.dumps(metricas.instantaneo()))
+    (aprov,) = [c for c in foto["contadores"] if c["nome"] == "aprovados_total"]
+    assert aprov["rotulos"] == {"keyword": "padaria"} and aprov["valor"] == 3
+    assert aprov["por_minuto"] > 0
+    assert foto["medidores"] == [{"nome": "fila_links", "rotulos": {"keyword": "padaria"}, "valor": 7}]
+    (h,) = foto["histogramas"]
+    assert (h["n"], h["soma"]) == (3, 99.23)
+    assert h["buckets"]["0.05"] == 1 and h["buckets"]["+Inf"] == 3
+
+
+def test_medir_e_travar():
+    m, lock = ms.Metricas(), threading.Lock()
+    with m.medir("pausa", worker="W1"):
+        pass
+    with m.travar(lock, recurso="resultados"):
+        assert lock.locked()
+    assert not lock.locked()
+    nomes = {h["nome"] for h in m.instantaneo()["histogramas"]}
+    assert nomes == {"etapa_segundos", "espera_lock_segundos"}
+    assert m.resumo().startswith("pausa ")
+
+
+def test_metricas_nulas_mesma_interface():
+    nulas, lock = ms.MetricasNulas(), threading.Lock()
+    for nome in ("inc", "definir", "observar", "medir", "travar"):
+        assert inspect.signature(getattr(nulas, nome)) == inspect.signature(getattr(ms.Metricas(), nome))
+    assert nulas.ativa is False and ms.Metricas.ativa is True
+    assert nulas.inc("x", 1, a=1) is None and nulas.definir("x", 1) is None
+    assert nulas.observar("x", 0.1) is None
+    with nulas.medir("extrair", worker="W1"):
+        pass
+    with nulas.travar(lock, recurso="resultados"):
+        assert lock.locked()
+    assert not lock.locked()
+    assert isinstance(ms.MapsScraper(log_cb=lambda *a: None).metricas, ms.MetricasNulas)
+
+
+def test_servidor(metricas):
+    srv = ms.ServidorMetricas(metricas, porta=0)
+    base = f"http://127.0.0.1:{srv.porta}"
+    try:
+        with urllib.request.urlopen(base + "/metrics", timeout=5) as r:
+            assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert f'{P}aprovados_total{{keyword="padaria"}} 3' in r.read().decode()
+        metricas.inc("aprovados_total", keyword="padaria")          # lido a cada GET
+        with urllib.request.urlopen(base + "/metrics.json", timeout=5) as r:
+            foto = json.loads(r.read())
+        assert [c["valor"] for c in foto["contadores"] if c["nome"] == "aprovados_total"] == [4]
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(base + "/outra", timeout=5)
+        assert erro.value.code == 404
+    finally:
+        srv.fechar()
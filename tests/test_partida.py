@@ -0,0 +1,23 @@
+"""Importar o módulo (CLI, trabalhadores) não carrega dependências pesadas nem o tkinter."""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import RAIZ
+
+PESADOS = ("selenium", "webdriver_manager", "openpyxl", "requests", "bs4", "pyarrow", "tkinter")
+
+
+def test_import_sem_dependencias_pesadas():
+    codigo = f"import sys, maps_scraper_v2; print(','.join(m for m in {PESADOS!r} if m in sys.modules))"
+    r = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert r.stdout.strip() == ""
+
+
+def test_app_continua_acessivel():
+    pytest.importorskip("tkinter")
+    import maps_scraper_gui
+    import maps_scraper_v2 as ms
+    assert ms.App is maps_scraper_gui.App
+    assert maps_scraper_gui.MapsScraper is ms.MapsScraper
@@ -0,0 +1,74 @@
+"""
+PayloadMaps nos payloads gravados em tests/fixtures: os dois layouts da
+busca (/search?tbm=map) e o preview da ficha (/maps/preview/place). Sem
+Chrome — só os índices de lugar()/interpretar() contra o esperado.
+"""
+import json
+
+import pytest
+
+import maps_scraper_v2 as ms
+from conftest import FIXTURES
+
+PM = ms.PayloadMaps
+URL_BUSCA = "https://www.google.com/search?tbm=map&authuser=0&hl=pt-BR&q=padaria"
+URL_FICHA = "https://www.google.com/maps/preview/place?authuser=0&hl=pt-BR&pb=!1m17"
+
+
+def payload(nome):
+    return (FIXTURES / nome).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("arquivo", ["busca_antiga.txt", "busca_nova.txt"])
+def test_busca(esperado, arquivo):
+    lidos = PM.interpretar(URL_BUSCA, payload(arquivo))
+    assert lidos == {e["feature_id"]: e["ficha"] for e in esperado.values()}
+
+
+def test_preview_da_ficha(esperado):
+    e = esperado["padaria"]
+    assert PM.interpretar(URL_FICHA, payload("preview_padaria.txt")) == {e["feature_id"]: e["ficha"]}
+
+
+def test_endereco_sem_p39_usa_p18_sem_o_nome(esperado):
+    # oficina não tem p[39]; p[18] é "Nome, endereço"
+    assert "Oficina Mecânica do João, Av. Paulista" in payload("busca_antiga.txt")
+    e = esperado["oficina"]
+    assert PM.interpretar(URL_BUSCA, payload("busca_antiga.txt"))[e["feature_id"]]["endereco"] \
+        == e["ficha"]["endereco"]
+
+
+def test_site_por_redirecionamento(esperado):
+    assert "/url?q=https://salaobelavista.com.br/" in payload("busca_antiga.txt")
+    e = esperado["salao"]
+    assert PM.interpretar(URL_BUSCA, payload("busca_antiga.txt"))[e["feature_id"]]["site"] \
+        == "https://salaobelavista.com.br/"
+
+
+def test_feature_id_da_url_do_card(esperado):
+    url = ("https://www.google.com/maps/place/Padaria+Estrela+do+Sul/data=!4m7!3m6"
+           "!1s0x94CE59C8DA0AA315:0xD59F9431F2C9776A!8m2!3d-23.55!4d-46.66!16s%2Fg%2F11b")
+    assert PM.feature_id(url) == esperado["padaria"]["feature_id"]
+    assert PM.feature_id("https://www.google.com/maps/search/padaria") == ""
+
+
+def test_interessa():
+    assert PM.interessa(URL_BUSCA) and PM.interessa(URL_FICHA)
+    assert not PM.interessa("https://www.google.com/maps/vt?pb=!1m5")
+
+
+@pytest.mark.parametrize("texto", ["", "<html>erro</html>", ")]}'\n[1,2", '{"c":0,"d":null}/*""*/'])
+def test_corpo_invalido_nao_levanta(texto):
+    assert PM.interpretar(URL_BUSCA, texto) == {}
+
+
+def test_layout_mudou_vira_campo_vazio(esperado):
+    # sem p[4] (nota) e p[178] (telefone): campos zerados, não exceção
+    data = json.loads(payload("preview_padaria.txt")[len(PM.PREFIXO):])
+    p = data[6]
+    p[4] = None
+    del p[178:]
+    fid, ficha = PM.lugar(p)
+    assert fid == esperado["padaria"]["feature_id"]
+    assert (ficha["stars"], ficha["reviews"], ficha["telefone"]) == (0.0, 0, "")
+    assert ficha["nome"] == esperado["padaria"]["ficha"]["nome"]
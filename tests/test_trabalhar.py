@@ -0,0 +1,114 @@
+"""
+Dois processos `trabalhar` ao mesmo tempo na mesma fila e no mesmo
+histórico: cada ficha sai uma vez só, o registro volta ao coordenador
+pela fila (o diário da execução não é tocado pelos trabalhadores) e, com
+Chrome, cada processo usa a própria pasta de perfis — sem ela os dois
+abririam chrome_profile_w0 e o segundo não subiria.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import maps_scraper_v2 as ms
+from conftest import RAIZ
+
+pytestmark = pytest.mark.skipif(bool(ms.MISSING), reason="dependências não instaladas")
+
+# argv: raiz, fila, histórico, nome. E-mail fica de fora (sem rede externa);
+# MAPS_SCRAPER_CHROME aponta o binário do navegador, como no conftest. Imprime
+# quantos itens fez e os --user-data-dir dos Chromes que abriu.
+TRABALHADOR = """
+import json, os, sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import maps_scraper_v2 as ms
+ms.HistoricoDB.DB_FILE = Path(sys.argv[3])
+ms.MapsScraper._email_do_site = lambda self, url: ""
+criadas = []
+def opcoes(Opcoes=ms.Options._carregar()):
+    o = Opcoes()
+    if os.environ.get("MAPS_SCRAPER_CHROME"):
+        o.binary_location = os.environ["MAPS_SCRAPER_CHROME"]
+    criadas.append(o)
+    return o
+ms.Options = opcoes
+scraper = ms.MapsScraper(log_cb=lambda *a: None, ritmo=0, captura=False)
+n = scraper.trabalhar(ms.FilaLeasesSQLite(sys.argv[2]), nome=sys.argv[4], tipos=("ficha",),
+                      duracao=60, ocioso_max=2)
+perfis = [a.split("=", 1)[1] for o in criadas for a in o.arguments if a.startswith("--user-data-dir=")]
+print(json.dumps({"feitos": n, "perfis": perfis}), flush=True)
+"""
+
+PAGINAS = ["padaria", "oficina", "salao"]
+
+
+def publicar_fichas(fila, base, backend, copias=1):
+    links = [f"{base}ficha_{p}.html?c={c}" for c in range(copias) for p in PAGINAS]
+    for link in links:
+        fila.publicar("ficha", dict(
+            run="r1", grupo="r1:padaria", keyword="padaria", regiao="São Paulo",
+            min_stars=0, min_reviews=0, meta=100, backend_ficha=backend,
+            bloqueio="nenhum", ritmo=0, link=link, card={},
+        ), chave=f"r1|{link}", grupo="r1:padaria")
+    return links
+
+
+def rodar_dois(fila):
+    historico = ms.HistoricoDB.DB_FILE
+    procs = [subprocess.Popen([sys.executable, "-c", TRABALHADOR, str(RAIZ), fila.caminho,
+                               str(historico), nome], stdout=subprocess.PIPE, text=True)
+             for nome in ("t1", "t2")]
+    return [json.loads(p.communicate(timeout=180)[0].splitlines()[-1]) for p in procs]
+
+
+@pytest.fixture
+def fila(tmp_path):
+    f = ms.FilaLeasesSQLite(tmp_path / "fila.db")
+    yield f
+    f.close()
+
+
+def registros(fila):
+    return [r["registro"] for *_, r in fila.resultados()]
+
+
+def test_dois_trabalhadores_http(fila, servidor_fixtures, esperado):
+    links = publicar_fichas(fila, servidor_fixtures, "http")
+
+    assert sum(r["feitos"] for r in rodar_dois(fila)) == len(links)
+    assert fila.contagem() == {"feito": len(links)}
+    regs = registros(fila)
+    assert sorted(r["URL Maps"] for r in regs) == sorted(links)
+    assert sorted(r["Nome"] for r in regs) == sorted(e["ficha"]["nome"] for e in esperado.values())
+
+    # só o coordenador escreve no diário da execução
+    diario = ms.DiarioExecucao(ms.HistoricoDB.compartilhado())
+    assert [diario._consultar(f"SELECT COUNT(*) FROM {t}")[0][0] for t in diario.DETALHE] == [0, 0, 0]
+
+
+def test_dois_trabalhadores_chrome(fila, servidor_fixtures, chrome):
+    # chrome (fixture) só garante que o navegador sobe aqui; os trabalhadores abrem os seus
+    links = publicar_fichas(fila, servidor_fixtures, "chrome", copias=2)
+
+    t1, t2 = rodar_dois(fila)
+    assert t1["feitos"] + t2["feitos"] == len(links)
+    assert t1["perfis"] and t2["perfis"] and not set(t1["perfis"]) & set(t2["perfis"])
+    assert not any(Path(p).parent == RAIZ for p in t1["perfis"] + t2["perfis"])
+    assert fila.contagem() == {"feito": len(links)}          # nenhum item falhou
+    assert len({r["URL Maps"] for r in registros(fila)}) == len(links)
+
+
+def test_pasta_de_perfis_do_processo(fila, monkeypatch):
+    usadas = []
+    scraper = ms.MapsScraper(log_cb=lambda *a: None)
+    monkeypatch.setattr(ms.FilaLeasesSQLite, "arrendar",
+                        lambda *a, **k: usadas.append(scraper.pasta_perfis) or None)
+    scraper.trabalhar(fila, nome="host/1", ocioso_max=-1)
+
+    pasta = usadas[0]
+    assert pasta is not None and pasta.name.startswith("maps-host_1-")
+    assert not pasta.exists() and scraper.pasta_perfis is None
+    assert isinstance(scraper.diario, ms.DiarioExecucao)